@@ -0,0 +1,251 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from benchmarks.synthetic import make_handwriting_pdf
+from src.html_gen.generate import HTMLGenerator
+from src.pdf_tools.extract_svg import PDFSVGExtractor
+from src.pdf_tools.svg_precision import optimize_svg_precision
+
+LETTER_NAME = "2025-01-01"
+
+
+def measure(function, repeat=3):
+    """Time ``function`` and record its peak Python memory use.
+
+    The fastest of ``repeat`` runs is kept, as the least disturbed by the
+    rest of the machine; memory is traced on one extra run so tracing does
+    not slow the timed ones. Memory allocated inside C libraries (MuPDF,
+    lxml) is not seen by ``tracemalloc``. ``function`` returns its output
+    size in bytes; anything it prints is discarded.
+    """
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output_bytes = function()
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "seconds": min(timings),
+        "peak_memory_bytes": peak,
+        "output_bytes": output_bytes,
+    }
+
+
+def import_time(module, repeat=3):
+    """Time importing ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Startup matters for short commands and watch-mode restarts. The fastest
+    of ``repeat`` imports is kept, in the same form as ``measure``.
+    """
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # The last line is the module itself, with its cumulative time
+        cumulative = result.stderr.splitlines()[-1].split("|")[1]
+        timings.append(int(cumulative) / 1e6)
+    return {"seconds": min(timings), "peak_memory_bytes": 0, "output_bytes": 0}
+
+
+def _size(paths):
+    return sum(Path(path).stat().st_size for path in paths)
+
+
+def run_benchmarks(workdir, pages, strokes, curve_density, links, repeat=3):
+    """Build a synthetic letter in ``workdir`` and time each build stage."""
+    workdir = Path(workdir)
+    pdf_dir = workdir / "pdfs"
+    svg_dir = workdir / "svg"
+    html_dir = workdir / "html"
+    pdf_path = make_handwriting_pdf(
+        pdf_dir / f"{LETTER_NAME}.pdf",
+        pages=pages,
+        strokes_per_page=strokes,
+        curve_density=curve_density,
+        links=links,
+    )
+
+    doc = fitz.open(pdf_path)
+    raw_svg = doc[0].get_svg_image()
+    doc.close()
+
+    extractor = PDFSVGExtractor(pdf_dir=pdf_dir, output_dir=svg_dir, use_cache=False)
+    generator = HTMLGenerator(
+        svg_dir=svg_dir,
+        html_dir=html_dir,
+        template_dir=workdir / "templates",
+        pdfs_dir=pdf_dir,
+        use_cache=False,
+        compress=False,
+    )
+
+    results = {"import_cli": import_time("src.cli", repeat)}
+    results["optimize_svg_precision"] = measure(
+        lambda: len(optimize_svg_precision(raw_svg, compact_paths=True)), repeat
+    )
+    results["extract_svg_from_pdf"] = measure(
+        lambda: _size(extractor.extract_svg_from_pdf(pdf_path)), repeat
+    )
+    drawings_extractor = PDFSVGExtractor(
+        pdf_dir=pdf_dir,
+        output_dir=workdir / "svg-drawings",
+        use_cache=False,
+        backend="drawings",
+    )
+    results["extract_drawings"] = measure(
+        lambda: _size(drawings_extractor.extract_svg_from_pdf(pdf_path)), repeat
+    )
+
+    first_page = svg_dir / f"{LETTER_NAME}_page_1.svg"
+    page_svg = first_page.read_text(encoding="utf-8")
+    results["process_svg"] = measure(
+        lambda: len(generator.process_svg(first_page)), repeat
+    )
+    results["apply_pdf_hyperlinks"] = measure(
+        lambda: len(generator.apply_pdf_hyperlinks(page_svg, first_page)), repeat
+    )
+    results["generate_all_html"] = measure(
+        lambda: _size(generator.generate_all_html()), repeat
+    )
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print each benchmark's time and size against a baseline run."""
+    print(f"{'benchmark':<24} {'seconds':>9} {'change':>8} {'bytes':>10} {'change':>8}")
+    for name, result in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        time_change = size_change = ""
+        if before:
+            time_change = f"{result['seconds'] / before['seconds'] - 1:+.0%}"
+            if before["output_bytes"]:
+                ratio = result["output_bytes"] / before["output_bytes"] - 1
+                size_change = f"{ratio:+.0%}"
+        print(
+            f"{name:<24} {result['seconds']:>9.3f} {time_change:>8} "
+            f"{result['output_bytes']:>10} {size_change:>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the build stages on a synthetic handwritten letter."
+    )
+    parser.add_argument("--pages", type=int, default=3, help="pages (default: 3)")
+    parser.add_argument(
+        "--strokes",
+        type=int,
+        default=600,
+        help="pen strokes per page (default: 600)",
+    )
+    parser.add_argument(
+        "--curve-density",
+        type=int,
+        default=8,
+        help="Bezier segments per stroke (default: 8)",
+    )
+    parser.add_argument(
+        "--links", type=int, default=3, help="URI links per page (default: 3)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="timed runs per benchmark; the fastest is kept (default: 3)",
+    )
+    parser.add_argument(
+        "--output",
+        help="JSON file for the results (default: benchmarks/results/<commit>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="RESULTS",
+        help="earlier results JSON file to compare against",
+    )
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    with tempfile.TemporaryDirectory() as workdir:
+        benchmarks = run_benchmarks(
+            workdir,
+            pages=args.pages,
+            strokes=args.strokes,
+            curve_density=args.curve_density,
+            links=args.links,
+            repeat=args.repeat,
+        )
+
+    results = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "parameters": {
+            "pages": args.pages,
+            "strokes": args.strokes,
+            "curve_density": args.curve_density,
+            "links": args.links,
+            "repeat": args.repeat,
+        },
+        "benchmarks": benchmarks,
+    }
+
+    output = Path(args.output or f"benchmarks/results/{commit or 'latest'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != results["parameters"]:
+            print("Warning: baseline was run with different parameters")
+        compare(results, baseline)
+    else:
+        for name, result in benchmarks.items():
+            print(
+                f"{name:<24} {result['seconds']:>9.3f}s "
+                f"{result['peak_memory_bytes'] / 2**20:>8.1f} MiB peak "
+                f"{result['output_bytes']:>10} bytes"
+            )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
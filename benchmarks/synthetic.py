@@ -0,0 +1,90 @@
+import math
+import random
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 40
+LINE_HEIGHT = 28
+
+
+def _stroke_points(rng, x, y, segments):
+    """Return the control points of a wobbly pen stroke starting at x, y.
+
+    Each segment is one cubic Bezier; consecutive segments share end points
+    the way tablet strokes do.
+    """
+    points = [fitz.Point(x, y)]
+    angle = rng.uniform(-0.6, 0.6)
+    for _ in range(segments):
+        length = rng.uniform(2, 6)
+        angle += rng.uniform(-1.2, 1.2)
+        end_x = x + length * math.cos(angle)
+        end_y = y + length * math.sin(angle) * 0.6
+        points.extend(
+            [
+                fitz.Point(x + rng.uniform(-2, 2) + length / 3, y + rng.uniform(-2, 2)),
+                fitz.Point(
+                    end_x + rng.uniform(-2, 2) - length / 3,
+                    end_y + rng.uniform(-2, 2),
+                ),
+                fitz.Point(end_x, end_y),
+            ]
+        )
+        x, y = end_x, end_y
+    return points
+
+
+def make_handwriting_pdf(
+    path, pages=2, strokes_per_page=400, curve_density=8, links=2, seed=0
+):
+    """Write a PDF of synthetic handwriting and return its path.
+
+    Strokes are laid out in lines of text across each page, each made of
+    ``curve_density`` Bezier segments with a slightly varying pen width, as
+    PDFs exported from a tablet are. ``links`` URI links per page are placed
+    over random stretches of writing. The same seed gives the same PDF.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        shape = page.new_shape()
+        x, y = MARGIN, MARGIN + LINE_HEIGHT
+        for _ in range(strokes_per_page):
+            points = _stroke_points(rng, x, y, curve_density)
+            for start in range(0, len(points) - 1, 3):
+                shape.draw_bezier(*points[start : start + 4])
+            shape.finish(
+                color=(0.1, 0.1, 0.2),
+                width=rng.uniform(0.8, 1.6),
+                closePath=False,
+                lineCap=1,
+                lineJoin=1,
+            )
+            x += rng.uniform(6, 14)
+            if x > PAGE_WIDTH - MARGIN:
+                x = MARGIN
+                y += LINE_HEIGHT
+                if y > PAGE_HEIGHT - MARGIN:
+                    y = MARGIN + LINE_HEIGHT
+        shape.commit()
+
+        for link_number in range(links):
+            x0 = rng.uniform(MARGIN, PAGE_WIDTH - 200)
+            y0 = rng.uniform(MARGIN, PAGE_HEIGHT - 60)
+            page.insert_link(
+                {
+                    "kind": fitz.LINK_URI,
+                    "from": fitz.Rect(x0, y0, x0 + 160, y0 + 30),
+                    "uri": f"https://example.com/{link_number}",
+                }
+            )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return path
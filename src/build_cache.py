@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump whenever a change to the build code alters its output, so that
+# manifests written by older versions are treated as stale.
+CACHE_VERSION = 2
+
+
+def hash_bytes(data):
+    """Return the hex SHA-256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(*parts):
+    """Combine build inputs (hashes, settings) into a single cache key."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def letter_key(letter):
+    """Return the build cache key of a letter, named like its PDF's stem.
+
+    ``dear-andy build`` and the standalone HTML generator keep letters in
+    the same manifest, so they must key them alike: a letter last built by
+    one then has a fingerprint the other does not match, and is rebuilt.
+    """
+    return f"letter:{letter}"
+
+
+class BuildCache:
+    """Persistent manifest mapping build targets to the inputs that made them.
+
+    Each entry records the fingerprint of a target's inputs and the files it
+    produced. A target is fresh when its fingerprint is unchanged and all of
+    its outputs are still on disk.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = Path(manifest_path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # A corrupt manifest just means a full rebuild
+                self.entries = {}
+
+    def _resolve(self, entry):
+        """Turn the manifest-relative outputs of an entry back into paths."""
+        base = self.manifest_path.parent
+        return [base / output for output in entry.get("outputs", [])]
+
+    def lookup(self, key, key_fingerprint):
+        """Return the cached outputs for ``key``, or ``None`` if stale."""
+        entry = self.entries.get(key)
+        if entry and entry.get("fingerprint") == key_fingerprint:
+            outputs = self._resolve(entry)
+            if all(output.exists() for output in outputs):
+                self.hits += 1
+                return outputs
+        self.misses += 1
+        return None
+
+    def previous_outputs(self, key):
+        """Return the outputs recorded for ``key`` by the last build."""
+        return self._resolve(self.entries.get(key, {}))
+
+    def store(self, key, key_fingerprint, outputs):
+        """Record the outputs produced for ``key`` from the given inputs."""
+        base = self.manifest_path.parent
+        self.entries[key] = {
+            "fingerprint": key_fingerprint,
+            # Stored relative to the manifest so the build tree can move
+            "outputs": [
+                Path(os.path.relpath(output, base)).as_posix() for output in outputs
+            ],
+        }
+
+    def prune(self, keys):
+        """Forget every entry whose key is not in ``keys``."""
+        keys = set(keys)
+        self.entries = {
+            key: entry for key, entry in self.entries.items() if key in keys
+        }
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def summary(self, label):
+        """Return a one-line cache-hit summary."""
+        total = self.hits + self.misses
+        return f"{label} cache: {self.hits}/{total} up to date, {self.misses} rebuilt"
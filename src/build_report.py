@@ -0,0 +1,155 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+REPORT_FILE = ".build-report.json"
+# Stages in the order a page passes through them
+STAGES = (
+    "render",
+    "simplify",
+    "precision",
+    "raster",
+    "ids",
+    "hyperlinks",
+    "serialize",
+    "images",
+    "template",
+    "write",
+)
+# Stages whose output is written to disk; a letter's HTML is streamed out
+# while the template renders, so both count towards the bytes written
+WRITTEN_STAGES = ("template", "write")
+
+
+def _add(totals, record):
+    totals["seconds"] += record["seconds"]
+    totals["bytes_in"] += record["bytes_in"] or 0
+    totals["bytes_out"] += record["bytes_out"] or 0
+    totals["count"] += 1
+
+
+def _new_totals():
+    return {"seconds": 0.0, "bytes_in": 0, "bytes_out": 0, "count": 0}
+
+
+class BuildReport:
+    """Time and size measurements for each stage of a build.
+
+    Each record is one stage applied to one page of a letter, or to the
+    whole letter (``page`` is ``None``) for stages such as the template.
+    Records are plain dicts so worker processes can send theirs back to be
+    merged with ``extend``.
+
+    Stages may nest, as page processing does inside a streamed template;
+    each record's ``seconds`` is the time spent in that stage itself, not
+    counting the stages nested inside it, so the totals add up.
+    """
+
+    def __init__(self):
+        self.records = []
+        # [record, seconds spent in nested stages] for each stage in progress
+        self._open_stages = []
+
+    @contextmanager
+    def stage(self, name, letter, page=None, bytes_in=None):
+        """Time the body of a ``with`` block as one stage.
+
+        Yields the record, so the block can fill in ``bytes_out`` once it
+        knows the size of what it produced.
+        """
+        record = {
+            "letter": letter,
+            "page": page,
+            "stage": name,
+            "seconds": 0.0,
+            "bytes_in": bytes_in,
+            "bytes_out": None,
+        }
+        self._open_stages.append([record, 0.0])
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - started
+            _, nested = self._open_stages.pop()
+            record["seconds"] = elapsed - nested
+            if self._open_stages:
+                self._open_stages[-1][1] += elapsed
+            self.records.append(record)
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def clear(self):
+        self.records = []
+
+    def stage_totals(self):
+        """Total time and bytes per stage, in pipeline order."""
+        totals = {}
+        for record in self.records:
+            _add(totals.setdefault(record["stage"], _new_totals()), record)
+        order = {name: index for index, name in enumerate(STAGES)}
+        return dict(sorted(totals.items(), key=lambda item: order.get(item[0], 99)))
+
+    def letter_totals(self):
+        """Total time per letter, with the bytes its pages were written as."""
+        totals = {}
+        for record in self.records:
+            letter = totals.setdefault(
+                record["letter"], {"seconds": 0.0, "pages": set(), "bytes_written": 0}
+            )
+            letter["seconds"] += record["seconds"]
+            if record["page"] is not None:
+                letter["pages"].add(record["page"])
+            if record["stage"] in WRITTEN_STAGES:
+                letter["bytes_written"] += record["bytes_out"] or 0
+        for letter in totals.values():
+            letter["pages"] = len(letter["pages"])
+        return totals
+
+    def to_dict(self):
+        return {
+            "stages": self.stage_totals(),
+            "letters": self.letter_totals(),
+            "records": self.records,
+        }
+
+    def write(self, path):
+        """Write the report as JSON, atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary(self, top=5):
+        """Return a table of time per stage and the slowest letters."""
+        stages = self.stage_totals()
+        total = sum(stage["seconds"] for stage in stages.values()) or 1.0
+        lines = [
+            f"{'Stage':<12} {'Seconds':>8} {'Share':>6} {'Bytes in':>11} "
+            f"{'Bytes out':>11}"
+        ]
+        for name, stage in stages.items():
+            lines.append(
+                f"{name:<12} {stage['seconds']:>8.2f} "
+                f"{stage['seconds'] / total:>6.0%} {stage['bytes_in']:>11} "
+                f"{stage['bytes_out']:>11}"
+            )
+
+        letters = sorted(
+            self.letter_totals().items(),
+            key=lambda item: item[1]["seconds"],
+            reverse=True,
+        )
+        lines.append("")
+        lines.append(f"{'Letter':<24} {'Seconds':>8} {'Pages':>6} {'Written':>11}")
+        for name, letter in letters[:top]:
+            lines.append(
+                f"{name:<24} {letter['seconds']:>8.2f} {letter['pages']:>6} "
+                f"{letter['bytes_written']:>11}"
+            )
+        return "\n".join(lines)
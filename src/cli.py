@@ -0,0 +1,162 @@
+import argparse
+import time
+from pathlib import Path
+
+from src import publish
+from src.pdf_tools.extract_svg import PDFSVGExtractor
+from src.pipeline import LetterPipeline, add_build_arguments, build_settings
+
+# Each build stage and the stages it needs to have run first. Coordinate
+# optimization happens as pages are extracted, so it is part of "extract".
+STAGES = {
+    "extract": (),
+    "generate": ("extract",),
+    "publish": ("generate",),
+}
+
+
+def plan_stages(targets):
+    """Return the stages needed to reach ``targets``, in the order to run them."""
+    planned = []
+
+    def visit(stage):
+        for dependency in STAGES[stage]:
+            visit(dependency)
+        if stage not in planned:
+            planned.append(stage)
+
+    for target in targets:
+        visit(target)
+    return planned
+
+
+def letter_pdfs(pdf_dir, letters):
+    """Map ``--only`` values (``2025-09-28`` or ``2025-09-28.pdf``) to PDFs.
+
+    Raises ``ValueError`` for a letter with no PDF.
+    """
+    pdf_files = set()
+    for letter in letters:
+        pdf_file = Path(pdf_dir) / f"{Path(letter).stem}.pdf"
+        if not pdf_file.exists():
+            raise ValueError(f"No PDF for letter '{letter}' in {pdf_dir}")
+        pdf_files.add(pdf_file)
+    return pdf_files
+
+
+def build(args):
+    """Run the planned stages in this process and return an exit status."""
+    started = time.perf_counter()
+    stages = plan_stages(args.stages or ["generate"])
+    output_dir = Path(args.output_dir)
+    settings = build_settings(args)
+
+    only = None
+    if args.only:
+        try:
+            only = letter_pdfs(args.pdf_dir, args.only)
+        except ValueError as error:
+            print(f"Error: {error}")
+            return 1
+
+    if "generate" in stages:
+        # Extract and generate together in one pass, with no SVG files between
+        pipeline = LetterPipeline(
+            pdf_dir=args.pdf_dir,
+            svg_dir=output_dir / "svg",
+            html_dir=output_dir / "html",
+            template_dir=args.template_dir,
+            **settings,
+        )
+        generated_files = pipeline.build_all(only=only)
+        print(f"Generated {len(generated_files)} HTML files")
+    else:
+        extractor = PDFSVGExtractor(
+            pdf_dir=args.pdf_dir,
+            output_dir=output_dir / "svg",
+            jobs=settings["jobs"],
+            precision=settings["precision"],
+            use_cache=settings["use_cache"],
+            simplify=settings["simplify"],
+            compact_paths=settings["compact_paths"],
+            fixed_point=settings["fixed_point"],
+            raster_dpi=settings["raster_dpi"],
+            backend=settings["backend"],
+            page_background=settings["page_background"],
+        )
+        extracted_files = extractor.extract_all_pdfs(only=only)
+        print(f"Extracted {len(extracted_files)} SVG files")
+
+    if "publish" in stages:
+        status = publish.main(
+            [
+                "--html-dir",
+                str(output_dir / "html"),
+                "--publish-dir",
+                args.publish_dir,
+            ]
+        )
+        if status:
+            return status
+
+    print(f"Built {', '.join(stages)} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="dear-andy",
+        description="Build handwritten letters into static HTML.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build",
+        help="build letters from PDFs in a single process",
+        description="Run the build stages up to STAGE (default: generate) in a "
+        "single process: extract pages from the PDFs, optimize them and "
+        "generate the HTML letters, then optionally publish.",
+    )
+    build_parser.add_argument(
+        "stages",
+        nargs="*",
+        metavar="STAGE",
+        help=f"stages to run, with the ones they depend on ({', '.join(STAGES)})",
+    )
+    build_parser.add_argument(
+        "--only",
+        action="append",
+        metavar="LETTER",
+        help="only rebuild this letter, e.g. 2025-09-28 (may be repeated); "
+        "the index still lists every letter",
+    )
+    build_parser.add_argument(
+        "--pdf-dir", default="pdfs", help="directory of PDFs (default: pdfs)"
+    )
+    build_parser.add_argument(
+        "--template-dir",
+        default="templates",
+        help="directory of templates (default: templates)",
+    )
+    build_parser.add_argument(
+        "--output-dir",
+        default="output",
+        help="directory for svg/ and html/ (default: output)",
+    )
+    build_parser.add_argument(
+        "--publish-dir",
+        default="publish",
+        help="website directory for the publish stage (default: publish)",
+    )
+    add_build_arguments(build_parser)
+    args = parser.parse_args(argv)
+
+    # Not argparse choices, which reject an empty list of stages
+    for stage in args.stages:
+        if stage not in STAGES:
+            build_parser.error(f"unknown stage '{stage}'")
+    return build(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+import json
+import os
+import re
+from pathlib import Path
+
+from src.lazy_import import lazy_import
+
+fitz = lazy_import("fitz")  # PyMuPDF
+
+CATALOG_FILE = ".catalog.json"
+LETTERS_PER_PAGE = 50
+THUMBNAIL_DIR = "thumbs"
+THUMBNAIL_WIDTH = 240
+# Letters are named after the day they were written
+DATED_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+INDEX_PAGE_NAME = re.compile(r"^index-(\d+)\.html$")
+
+
+def letter_date(name):
+    """Return the ISO date a letter's name starts with, or ``None``."""
+    match = DATED_NAME.match(name)
+    return match.group(1) if match else None
+
+
+def index_filename(page_number, page_count):
+    """Name of an index page; the newest page is always ``index.html``.
+
+    Pages are numbered from the oldest letters, so adding a letter only
+    changes the newest page (and, when a page fills up, its neighbour)
+    instead of shifting every letter along the archive.
+    """
+    if page_number == page_count:
+        return "index.html"
+    return f"index-{page_number}.html"
+
+
+def paginate(letters, per_page=LETTERS_PER_PAGE):
+    """Split oldest-first letters into index pages of at most ``per_page``."""
+    return [letters[i : i + per_page] for i in range(0, len(letters), per_page)]
+
+
+def render_thumbnail(pdf_path, output_path, width=THUMBNAIL_WIDTH):
+    """Render the first page of a PDF to a small greyscale PNG.
+
+    Returns the catalog fields learned from the PDF on the way: its page
+    count and the thumbnail's pixel size.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc[0]
+        zoom = width / page.rect.width
+        pixmap = page.get_pixmap(
+            matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        pixmap.save(str(output_path))
+        return {
+            "pages": doc.page_count,
+            "thumbnail_width": pixmap.width,
+            "thumbnail_height": pixmap.height,
+        }
+    finally:
+        doc.close()
+
+
+class LetterCatalog:
+    """Persisted summary of every letter, used to build the index pages.
+
+    Each letter records its date, title, page count, thumbnail and size, and
+    each index page the fingerprint of the content it was last rendered
+    with, so only index pages whose letters changed are written again.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.letters = {}
+        self.index_pages = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.letters = data.get("letters", {})
+                self.index_pages = data.get("index_pages", {})
+            except (OSError, ValueError, AttributeError):
+                # A corrupt catalog is rebuilt as letters are generated
+                self.letters = {}
+                self.index_pages = {}
+
+    def prune(self, names):
+        """Forget letters that are no longer built."""
+        names = set(names)
+        self.letters = {
+            name: entry for name, entry in self.letters.items() if name in names
+        }
+
+    def sorted_letters(self):
+        """Return letter entries oldest first, each with its ``name``."""
+        return [
+            dict(entry, name=name)
+            for name, entry in sorted(
+                self.letters.items(),
+                key=lambda item: (item[1].get("date") or "", item[0]),
+            )
+        ]
+
+    def save(self):
+        """Write the catalog atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"letters": self.letters, "index_pages": self.index_pages},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,132 @@
+import argparse
+import gzip
+import importlib.util
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from src.build_cache import BuildCache, fingerprint, hash_file
+from src.lazy_import import lazy_import
+
+# Optional: only gzip siblings are written without it
+brotli = lazy_import("brotli")
+
+COMPRESS_MANIFEST = ".compress-cache.json"
+# Generated files a static host can serve precompressed
+COMPRESSIBLE_SUFFIXES = {".html", ".svg"}
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+@lru_cache(maxsize=None)
+def brotli_available():
+    """Return whether brotli is installed, without importing it."""
+    return importlib.util.find_spec("brotli") is not None
+
+
+def gzip_bytes(data):
+    """Compress at the highest level, with no timestamp so output is stable."""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    """Compress at the highest brotli quality, tuned for text."""
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def compress_file(path):
+    """Write the ``.gz`` (and ``.br``) siblings of a file and return them."""
+    path = Path(path)
+    data = path.read_bytes()
+    gz_path = path.with_name(path.name + ".gz")
+    br_path = path.with_name(path.name + ".br")
+
+    _write_atomic(gz_path, gzip_bytes(data))
+    if not brotli_available():
+        # Don't leave a sibling from an earlier build serving old content
+        if br_path.exists():
+            br_path.unlink()
+        return [gz_path]
+    _write_atomic(br_path, brotli_bytes(data))
+    return [gz_path, br_path]
+
+
+def _remove_orphaned_siblings(html_dir):
+    for sibling in sorted(html_dir.rglob("*")):
+        if sibling.suffix not in COMPRESSED_SUFFIXES:
+            continue
+        source = sibling.with_suffix("")
+        if source.suffix in COMPRESSIBLE_SUFFIXES and not source.exists():
+            sibling.unlink()
+
+
+def precompress(html_dir, use_cache=True, sources=None):
+    """Write compressed siblings for every HTML and SVG file under a directory.
+
+    Files are only recompressed when their content hash changes, and
+    siblings whose source file has gone are removed. Pass ``sources`` to
+    only look at those files, leaving the rest of the directory to the next
+    full run. Returns the number of files compressed.
+    """
+    html_dir = Path(html_dir)
+    if not html_dir.exists():
+        return 0
+
+    full_run = sources is None
+    if full_run:
+        _remove_orphaned_siblings(html_dir)
+        sources = html_dir.rglob("*")
+    sources = sorted(
+        path
+        for path in map(Path, sources)
+        if path.suffix in COMPRESSIBLE_SUFFIXES and path.is_file()
+    )
+
+    cache = BuildCache(html_dir / COMPRESS_MANIFEST)
+    keys = []
+    compressed = 0
+    for source in sources:
+        key = source.relative_to(html_dir).as_posix()
+        keys.append(key)
+        key_fingerprint = fingerprint(hash_file(source), brotli_available())
+        if use_cache and cache.lookup(key, key_fingerprint) is not None:
+            continue
+        cache.store(key, key_fingerprint, compress_file(source))
+        compressed += 1
+
+    if full_run:
+        cache.prune(keys)
+    cache.save()
+    formats = "gzip and brotli" if brotli_available() else "gzip"
+    print(f"Precompressed {compressed}/{len(sources)} files with {formats}")
+    return compressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write .gz and .br siblings for generated HTML and SVG files."
+    )
+    parser.add_argument(
+        "html_dir",
+        nargs="?",
+        default="output/html",
+        help="directory of generated files (default: output/html)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="recompress every file, even if unchanged",
+    )
+    args = parser.parse_args(argv)
+
+    precompress(args.html_dir, use_cache=not args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,49 @@
+import argparse
 import json
 import re
-import shutil
+from functools import cached_property
 from pathlib import Path
 
-from bs4 import BeautifulSoup
-from jinja2 import Environment, FileSystemLoader
+from src.build_cache import BuildCache, fingerprint, hash_file, letter_key
+from src.build_report import REPORT_FILE, BuildReport
+from src.html_gen.catalog import (
+    CATALOG_FILE,
+    INDEX_PAGE_NAME,
+    LETTERS_PER_PAGE,
+    THUMBNAIL_DIR,
+    LetterCatalog,
+    index_filename,
+    letter_date,
+    paginate,
+    render_thumbnail,
+)
+from src.html_gen.compress import precompress
+from src.html_gen.images import ImageProcessor
+from src.html_gen.spatial_index import GridIndex, stroke_bbox
+from src.lazy_import import lazy_import
+from src.page_manifest import find_manifests, manifest_path, read_manifest
+
+# Loaded when first needed, so importing the generator stays cheap
+bs4 = lazy_import("bs4")
+jinja2 = lazy_import("jinja2")
+
+CACHE_MANIFEST = ".build-cache.json"
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
+URL_REFERENCE = re.compile(r"url\(#([^)]+)\)")
+STYLE_STROKE = re.compile(r"(?:^|;)\s*stroke\s*:([^;]*)")
+# How link highlighting repaints strokes: "use" references the page drawing
+# once per link, "clone" copies the paths under each link
+LINK_HIGHLIGHT_MODES = ("use", "clone")
+LINK_STROKE_PROPERTY = "--link-stroke"
+# Opening tag of a serialized page, for sizing and rewriting page assets
+SVG_START_TAG = re.compile(r"<svg\b[^>]*>")
+SVG_NAMESPACES = {
+    "xmlns": "http://www.w3.org/2000/svg",
+    "xmlns:xlink": "http://www.w3.org/1999/xlink",
+}
+PAGE_ASSETS_DIR = "pages"
+# One image cache manifest per letter, so parallel builds don't share one
+IMAGE_CACHE_DIR = ".image-cache"
 
 
 class HTMLGenerator:
@@ -14,16 +53,37 @@ class HTMLGenerator:
         html_dir="output/html",
         template_dir="templates",
         pdfs_dir="pdfs",
+        use_cache=True,
+        link_highlight="use",
+        lazy_pages=False,
+        compress=True,
+        letters_per_page=LETTERS_PER_PAGE,
+        report=None,
     ):
+        if link_highlight not in LINK_HIGHLIGHT_MODES:
+            raise ValueError(f"Unknown link highlight mode: {link_highlight}")
         self.svg_dir = Path(svg_dir)
         self.html_dir = Path(html_dir)
         self.template_dir = Path(template_dir)
         self.pdfs_dir = Path(pdfs_dir)
+        self.use_cache = use_cache
+        self.link_highlight = link_highlight
+        # Write every page after the first as its own lazily loaded SVG file
+        self.lazy_pages = lazy_pages
+        # Write .gz and .br siblings of the generated files for the web server
+        self.compress = compress
+        self.letters_per_page = letters_per_page
+        # Time and size of each stage, shared with the extractor in a pipeline
+        self.report = report if report is not None else BuildReport()
 
         self.html_dir.mkdir(parents=True, exist_ok=True)
         self.template_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = LetterCatalog(self.html_dir / CATALOG_FILE)
 
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
+    @cached_property
+    def env(self):
+        """The Jinja environment for the template directory, made on first use."""
+        return jinja2.Environment(loader=jinja2.FileSystemLoader(self.template_dir))
 
     def create_default_template(self):
         """Create a default HTML template if none exists."""
@@ -63,7 +123,9 @@ class HTMLGenerator:
             border-bottom: none;
             page-break-after: auto;
         }
-        .svg-container svg {
+        .svg-container svg,
+        .svg-container img,
+        .svg-container iframe {
             max-width: 100%;
             height: auto;
             display: block;
@@ -91,288 +153,210 @@ class HTMLGenerator:
                 f.write(template_content)
             print(f"Created default template: {template_path}")
 
-    def process_svg(self, svg_path):
-        """Process SVG file and return cleaned content with unique IDs."""
+    def create_default_index_template(self):
+        """Create a default index page template if none exists."""
+        template_path = self.template_dir / "index.html"
+        if not template_path.exists():
+            template_content = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>
+        {{ title }}
+        {% if page_count > 1 %}({{ page_number }}/{{ page_count }}){% endif %}
+    </title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+        }
+        .letters {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(240px, 1fr));
+            gap: 20px;
+            padding: 0;
+            list-style: none;
+        }
+        .letters a {
+            display: block;
+            background-color: white;
+            padding: 10px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            color: #333;
+            text-decoration: none;
+        }
+        .letters img {
+            width: 100%;
+            height: auto;
+        }
+        .details {
+            color: #666;
+            font-size: 0.9em;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>{{ title }}</h1>
+        <ul class="letters">
+            {% for letter in letters %}
+            <li>
+                <a href="{{ letter.name }}.html">
+                    {% if letter.thumbnail %}
+                    <img src="{{ letter.thumbnail }}" alt="" loading="lazy"
+                         width="{{ letter.thumbnail_width }}"
+                         height="{{ letter.thumbnail_height }}">
+                    {% endif %}
+                    <div>{{ letter.title }}</div>
+                    <div class="details">
+                        {{ letter.pages }} page{% if letter.pages != 1 %}s{% endif %},
+                        {{ (letter.bytes / 1024)|round|int }} KB
+                    </div>
+                </a>
+            </li>
+            {% endfor %}
+        </ul>
+        <nav>
+            {% if newer_page %}<a href="{{ newer_page }}">Newer letters</a>{% endif %}
+            {% if older_page %}<a href="{{ older_page }}">Older letters</a>{% endif %}
+        </nav>
+    </div>
+</body>
+</html>"""
+            with open(template_path, "w", encoding="utf-8") as f:
+                f.write(template_content)
+            print(f"Created default template: {template_path}")
+
+    def letter_title(self, output_name):
+        """Return the display title of a letter."""
+        return output_name.replace("_", " ").title()
+
+    def process_svg(self, svg_path, hyperlinks=None):
+        """Process SVG file and return cleaned content with unique IDs.
+
+        Pass the page's ``hyperlinks`` from its manifest entry to save
+        looking them up.
+        """
         svg_path = Path(svg_path)  # Ensure it's a Path object
         with open(svg_path, "r", encoding="utf-8") as f:
             svg_content = f.read()
 
-        soup = BeautifulSoup(svg_content, "xml")
-        svg_element = soup.find("svg")
+        soup = bs4.BeautifulSoup(svg_content, "xml")
+        if not soup.find("svg"):
+            return svg_content
 
-        if svg_element:
-            # Add data attributes to identify the source file
-            svg_element["data-source-file"] = svg_path.name
-            page_number = (
-                svg_path.stem.split("_page_")[1] if "_page_" in svg_path.stem else "1"
-            )
-            svg_element["data-page-number"] = page_number
+        page_number = (
+            svg_path.stem.split("_page_")[1] if "_page_" in svg_path.stem else "1"
+        )
+        if hyperlinks is None:
+            hyperlinks = self.load_hyperlink_metadata(svg_path)
+        return self.process_svg_tree(soup, svg_path.name, page_number, hyperlinks)
+
+    def process_svg_page(self, svg_page):
+        """Process an in-memory ``SVGPage`` from the extractor."""
+        return self.process_svg_tree(
+            svg_page.soup,
+            svg_page.file_name,
+            str(svg_page.page_number),
+            svg_page.hyperlinks,
+        )
 
-            # Make all IDs unique by adding page number suffix
-            page_suffix = f"_p{page_number}"
+    def process_svg_tree(self, soup, source_name, page_number, hyperlinks):
+        """Give a parsed page unique IDs, apply its hyperlinks and serialize it.
 
-            # Find all elements with id attributes and make them unique
-            for element in soup.find_all(attrs={"id": True}):
-                old_id = element["id"]
-                new_id = f"{old_id}{page_suffix}"
-                element["id"] = new_id
+        The tree is modified in place and serialized exactly once.
+        """
+        svg_element = soup.find("svg")
+        if not svg_element:
+            return str(soup)
 
-            # Update all url(#id) references to match the new IDs
-            svg_str = str(svg_element)
-            import re
+        letter = Path(source_name).stem.rsplit("_page_", 1)[0]
+        page = int(page_number)
 
-            # Find all url(#something) patterns and add the page suffix
-            def replace_url_ref(match):
-                ref_id = match.group(1)
-                return f"url(#{ref_id}{page_suffix})"
+        # Add data attributes to identify the source file
+        svg_element["data-source-file"] = source_name
+        svg_element["data-page-number"] = page_number
 
-            svg_str = re.sub(r"url\(#([^)]+)\)", replace_url_ref, svg_str)
+        # Make all IDs unique by adding page number suffix
+        page_suffix = f"_p{page_number}"
 
-            # Apply PDF hyperlinks if metadata exists
-            svg_str = self.apply_pdf_hyperlinks(svg_str, svg_path)
+        # Update all url(#id) references to match the new IDs
+        def replace_url_ref(match):
+            return f"url(#{match.group(1)}{page_suffix})"
 
-            return svg_str
+        with self.report.stage("ids", letter, page):
+            # Find all elements with id attributes and make them unique
+            for element in soup.find_all(attrs={"id": True}):
+                element["id"] = f"{element['id']}{page_suffix}"
+
+            for element in soup.find_all():
+                for attr, value in element.attrs.items():
+                    if "url(#" in value:
+                        element.attrs[attr] = URL_REFERENCE.sub(replace_url_ref, value)
+            for style in soup.find_all("style"):
+                if style.string and "url(#" in style.string:
+                    style.string = URL_REFERENCE.sub(replace_url_ref, style.string)
+
+        # Apply PDF hyperlinks if there are any
+        if hyperlinks:
+            with self.report.stage("hyperlinks", letter, page):
+                self.apply_hyperlinks_to_tree(soup, hyperlinks)
+
+        with self.report.stage("serialize", letter, page) as record:
+            svg_content = str(svg_element)
+            record["bytes_out"] = len(svg_content)
         return svg_content
 
     def load_hyperlink_metadata(self, svg_path):
-        """Load hyperlink metadata for an SVG file if it exists."""
+        """Load a page SVG file's hyperlinks from its PDF's page manifest."""
         svg_path = Path(svg_path)
-        metadata_file = svg_path.parent / f"{svg_path.stem}_links.json"
-
-        if metadata_file.exists():
-            with open(metadata_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+        pdf_name = svg_path.stem.rsplit("_page_", 1)[0]
+        manifest_file = manifest_path(svg_path.parent, pdf_name)
+        if not manifest_file.exists():
+            return []
+        manifest = read_manifest(manifest_file) or {"pages": []}
+        for page in manifest["pages"]:
+            if page["file"] == svg_path.name:
+                return page["links"]
         return []
 
-    def extract_path_bbox(self, path_d):
-        """Extract rough bounding box from SVG path data."""
-        if not path_d:
-            return None
-
-        # Skip full-page background/frame paths
-        if "M0 0H595V842H0Z" in path_d or "M 0 0 H 595 V 842 H 0 Z" in path_d:
-            return None
-
-        # Find all coordinate pairs in the path
-        coords = re.findall(r"[-+]?\d*\.?\d+", path_d)
-        if len(coords) < 2:
-            return None
-
-        # Convert to floats and pair them up
-        numbers = [float(c) for c in coords]
-        x_coords = numbers[::2]  # Every other starting with 0
-        y_coords = numbers[1::2]  # Every other starting with 1
-
-        if not x_coords or not y_coords:
-            return None
-
-        bbox = {
-            "x1": min(x_coords),
-            "y1": min(y_coords),
-            "x2": max(x_coords),
-            "y2": max(y_coords),
-        }
-
-        # Multi-criteria filtering for background/container elements
-        width = bbox["x2"] - bbox["x1"]
-        height = bbox["y2"] - bbox["y1"]
-
-        # 1. Skip very large paths (page-spanning backgrounds)
-        if width > 400 or height > 600:
-            return None
-
-        # 2. Skip geometric shapes that are likely backgrounds/containers
-        if self.is_likely_background_element(path_d, width, height):
-            return None
-
-        return bbox
-
-    def is_likely_background_element(self, path_d, width, height):
-        """Detect if a path is likely a background/container element."""
-        # Count different command types
-        h_v_count = len(re.findall(r"[HV]", path_d))  # Horizontal/Vertical lines
-        curve_count = len(re.findall(r"C", path_d))  # Curves
-        coords_count = len(re.findall(r"[-+]?\d*\.?\d+", path_d))
-
-        # Geometric shapes: mostly H/V commands, no curves, simple structure
-        is_geometric = h_v_count >= 2 and curve_count == 0
-
-        # Low coordinate density indicates simple geometric shapes
-        area = width * height
-        coord_density = coords_count / max(area, 1) if area > 0 else 0
-        is_simple = coord_density < 0.01  # Very few coordinates per pixel
-
-        # Wide elements are often containers/backgrounds
-        is_wide = width > 200
-
-        # Combine criteria: geometric OR (simple AND wide)
-        return is_geometric or (is_simple and is_wide)
-
-    def rect_intersects(self, rect1, rect2):
-        """Check if two rectangles intersect."""
-        return not (
-            rect1["x2"] < rect2["x1"]
-            or rect2["x2"] < rect1["x1"]
-            or rect1["y2"] < rect2["y1"]
-            or rect2["y2"] < rect1["y1"]
-        )
-
-    def path_intersects_rect(self, path_d, rect):
-        """Check if any part of an SVG path actually intersects with a rectangle."""
-        if not path_d:
-            return False
-
-        # Skip full-page background/frame paths
-        if "M0 0H595V842H0Z" in path_d or "M 0 0 H 595 V 842 H 0 Z" in path_d:
-            return False
-
-        # Apply existing background filtering first
-        path_bbox = self.extract_path_bbox(path_d)
-        if not path_bbox:
-            return False
-
-        # Removed debug logging - keeping for future debugging if needed
-        is_iso_case = False
-
-        # Parse path data to extract coordinates and check for intersections
-        import re
-
-        # Find all coordinate pairs in the path
-        coords = re.findall(r"[-+]?\d*\.?\d+", path_d)
-        if len(coords) < 2:
-            return False
-
-        # Convert to floats and pair them up
-        numbers = [float(c) for c in coords]
-        points = [(numbers[i], numbers[i + 1]) for i in range(0, len(numbers) - 1, 2)]
-
-        if not points:
-            return False
-
-        # Count points inside the rectangle and total points
-        points_inside = 0
-        for x, y in points:
-            if rect["x1"] <= x <= rect["x2"] and rect["y1"] <= y <= rect["y2"]:
-                points_inside += 1
-
-        # Require a significant portion of points to be inside (at least 20%)
-        # OR the path bounding box to have substantial overlap
-        if len(points) > 0:
-            percentage_inside = points_inside / len(points)
-
-            if is_iso_case and (percentage_inside > 0 or path_bbox):
-                print(f"ISO DEBUG: Path with bbox {path_bbox}")
-                print(
-                    f"  Points inside: {points_inside}/{len(points)} = "
-                    f"{percentage_inside:.2%}"
-                )
-                print(f"  First few points: {points[:5]}")
-                print(f"  Path preview: {path_d[:100]}...")
-
-            if percentage_inside >= 0.5:  # At least 50% of points inside
-                if is_iso_case:
-                    print("  -> INCLUDED (percentage)")
-                return True
-
-        # Fallback: check if the path bounding box has good overlap with hyperlink box
-        if path_bbox:
-            # Calculate overlap area
-            overlap_x1 = max(path_bbox["x1"], rect["x1"])
-            overlap_y1 = max(path_bbox["y1"], rect["y1"])
-            overlap_x2 = min(path_bbox["x2"], rect["x2"])
-            overlap_y2 = min(path_bbox["y2"], rect["y2"])
-
-            if overlap_x1 < overlap_x2 and overlap_y1 < overlap_y2:
-                overlap_area = (overlap_x2 - overlap_x1) * (overlap_y2 - overlap_y1)
-                path_area = (path_bbox["x2"] - path_bbox["x1"]) * (
-                    path_bbox["y2"] - path_bbox["y1"]
-                )
-
-                overlap_percentage = overlap_area / path_area if path_area > 0 else 0
-
-                if is_iso_case and overlap_percentage > 0:
-                    print(
-                        f"  Overlap: {overlap_area:.1f}/{path_area:.1f} = "
-                        f"{overlap_percentage:.2%}"
-                    )
-
-                # Require at least 50% of the path's bounding box to overlap
-                if path_area > 0 and overlap_percentage >= 0.5:
-                    if is_iso_case:
-                        print("  -> INCLUDED (overlap)")
-                    return True
-                elif is_iso_case and overlap_percentage > 0:
-                    print("  -> EXCLUDED (overlap too small)")
-
-        return False
-
-    def line_intersects_rect(self, x1, y1, x2, y2, rect):
-        """Check if a line segment intersects with a rectangle."""
-        # Check if either endpoint is inside the rectangle
-        if (rect["x1"] <= x1 <= rect["x2"] and rect["y1"] <= y1 <= rect["y2"]) or (
-            rect["x1"] <= x2 <= rect["x2"] and rect["y1"] <= y2 <= rect["y2"]
-        ):
-            return True
-
-        # Check intersection with each rectangle edge
-        # Left edge
-        if self.line_segments_intersect(
-            x1, y1, x2, y2, rect["x1"], rect["y1"], rect["x1"], rect["y2"]
-        ):
-            return True
-        # Right edge
-        if self.line_segments_intersect(
-            x1, y1, x2, y2, rect["x2"], rect["y1"], rect["x2"], rect["y2"]
-        ):
-            return True
-        # Top edge
-        if self.line_segments_intersect(
-            x1, y1, x2, y2, rect["x1"], rect["y1"], rect["x2"], rect["y1"]
-        ):
-            return True
-        # Bottom edge
-        if self.line_segments_intersect(
-            x1, y1, x2, y2, rect["x1"], rect["y2"], rect["x2"], rect["y2"]
-        ):
-            return True
-
-        return False
-
-    def line_segments_intersect(self, x1, y1, x2, y2, x3, y3, x4, y4):
-        """Check if two line segments intersect."""
-
-        # Calculate the direction of the lines
-        def ccw(Ax, Ay, Bx, By, Cx, Cy):
-            return (Cy - Ay) * (Bx - Ax) > (By - Ay) * (Cx - Ax)
-
-        # Check if the segments intersect
-        return ccw(x1, y1, x3, y3, x4, y4) != ccw(x2, y2, x3, y3, x4, y4) and ccw(
-            x1, y1, x2, y2, x3, y3
-        ) != ccw(x1, y1, x2, y2, x4, y4)
-
     def apply_pdf_hyperlinks(self, svg_content, svg_path):
         """Apply PDF hyperlinks to SVG content using simple overlay technique.
 
         This creates blue strokes in link areas by:
         1. Keeping original paths visible in black
         2. Creating masks for link areas
-        3. Duplicating paths in blue masked groups (paint on top in link areas)
+        3. Repainting the paths in blue through the masks (paint on top in link
+           areas), either with one ``<use>`` of the page drawing per link or,
+           in "clone" mode, by duplicating the paths in blue masked groups
         """
         hyperlinks = self.load_hyperlink_metadata(svg_path)
         if not hyperlinks:
             return svg_content
 
-        soup = BeautifulSoup(svg_content, "xml")
-        svg_element = soup.find("svg")
+        soup = bs4.BeautifulSoup(svg_content, "xml")
+        self.apply_hyperlinks_to_tree(soup, hyperlinks)
+        return str(soup)
 
-        if not hyperlinks:
-            return str(soup)
+    def apply_hyperlinks_to_tree(self, soup, hyperlinks):
+        """Add hyperlink highlighting and click targets to a parsed SVG tree."""
+        svg_element = soup.find("svg")
 
         # Get page number for unique IDs
         page_number = svg_element.get("data-page-number", "1")
+        # User units per PDF point: 1, or 10 ** precision for fixed-point pages
+        scale = self.page_scale(svg_element)
 
         # Create defs element if it doesn't exist
-        defs = soup.find("defs")
+        defs = svg_element.find("defs", recursive=False)
         if not defs:
             defs = soup.new_tag("defs")
             svg_element.insert(0, defs)
@@ -386,6 +370,25 @@ class HTMLGenerator:
             if not is_in_defs:
                 all_paths.append(path)
 
+        if self.link_highlight == "use":
+            drawing_id = f"linkDrawing_{page_number}"
+            self.share_page_drawing(soup, svg_element, defs, all_paths, drawing_id)
+        else:
+            # Blue copies are placed directly under the root, so index each copy
+            # by where it paints there; links then only copy the paths they touch
+            clone_attrs = []
+            path_index = GridIndex(cell_size=32.0 * scale)
+            for path_number, path in enumerate(all_paths):
+                # Skip style attribute to avoid copying display:none
+                attrs = {
+                    attr: value for attr, value in path.attrs.items() if attr != "style"
+                }
+                # Make stroke blue
+                attrs["stroke"] = "blue"
+                attrs["pointer-events"] = "none"
+                clone_attrs.append(attrs)
+                path_index.insert(path_number, stroke_bbox(attrs, svg_element))
+
         # Process each hyperlink - create masks for blue strokes inside link areas
         for idx, link_data in enumerate(hyperlinks):
             uri = link_data["uri"]
@@ -413,23 +416,35 @@ class HTMLGenerator:
             bbox = link_data["bbox"]
             mask_id_inside = f"linkMaskInside_{page_number}_{idx}"
 
-            # Create group for blue strokes inside this link
-            blue_group = soup.new_tag("g")
-            blue_group["mask"] = f"url(#{mask_id_inside})"
-
-            # Clone all paths into blue group
-            for path in all_paths:
-                path_clone = soup.new_tag("path")
-                for attr, value in path.attrs.items():
-                    # Skip style attribute to avoid copying display:none
-                    if attr != "style":
-                        path_clone[attr] = value
-                # Make stroke blue
-                path_clone["stroke"] = "blue"
-                path_clone["pointer-events"] = "none"
-                blue_group.append(path_clone)
+            if self.link_highlight == "use":
+                # Repaint the whole drawing with blue strokes inside this link
+                blue_use = soup.new_tag("use")
+                blue_use["xlink:href"] = f"#{drawing_id}"
+                blue_use["mask"] = f"url(#{mask_id_inside})"
+                blue_use["pointer-events"] = "none"
+                blue_use["style"] = f"{LINK_STROKE_PROPERTY}:blue"
+                svg_element.append(blue_use)
+            else:
+                # Create group for blue strokes inside this link
+                blue_group = soup.new_tag("g")
+                blue_group["mask"] = f"url(#{mask_id_inside})"
+
+                # Clone the paths that can paint inside the link area, widened
+                # slightly to cover the rounding of the mask rectangle
+                margin = 0.1 * scale
+                link_area = {
+                    "x1": bbox["x"] - margin,
+                    "y1": bbox["y"] - margin,
+                    "x2": bbox["x"] + bbox["width"] + margin,
+                    "y2": bbox["y"] + bbox["height"] + margin,
+                }
+                for path_number in path_index.query(link_area):
+                    blue_group.append(
+                        soup.new_tag("path", attrs=dict(clone_attrs[path_number]))
+                    )
 
-            svg_element.append(blue_group)
+                if blue_group.contents:
+                    svg_element.append(blue_group)
 
             # Create clickable overlay
             link_elem = soup.new_tag("a")
@@ -448,90 +463,447 @@ class HTMLGenerator:
             link_elem.append(overlay_rect)
             svg_element.append(link_elem)
 
-        return str(soup)
-
-    def copy_images_to_html_dir(self, pdf_name):
-        """Copy images with matching PDF prefix from pdfs directory to html
-        output directory."""
+        return soup
+
+    def page_scale(self, svg_element):
+        """Return the SVG user units per PDF point, from the ``viewBox``."""
+        try:
+            view_width = float(svg_element["viewBox"].replace(",", " ").split()[2])
+            return view_width / float(svg_element["width"])
+        except (KeyError, IndexError, ValueError, ZeroDivisionError):
+            return 1.0
+
+    def painted_stroke(self, element):
+        """Return the stroke an element is painted with, following inheritance."""
+        for ancestor in [element, *element.parents]:
+            match = STYLE_STROKE.search(ancestor.get("style") or "")
+            if match:
+                return match.group(1).strip()
+            if ancestor.get("stroke") is not None:
+                return ancestor["stroke"]
+        return "none"
+
+    def share_page_drawing(self, soup, svg_element, defs, paths, drawing_id):
+        """Move the page drawing into ``<defs>`` and show it with a ``<use>``.
+
+        Each path's stroke becomes ``var(--link-stroke, <original>)``, so the
+        page looks the same while a ``<use>`` that sets ``--link-stroke`` paints
+        every stroke in that colour, the way the blue clones used to.
+        """
+        for path in paths:
+            stroke = self.painted_stroke(path)
+            path.attrs.pop("stroke", None)
+            style = STYLE_STROKE.sub("", path.get("style", ""))
+            declarations = [part for part in style.split(";") if part.strip()]
+            declarations.append(f"stroke:var({LINK_STROKE_PROPERTY},{stroke})")
+            path["style"] = ";".join(declarations)
+
+        drawing = soup.new_tag("g")
+        drawing["id"] = drawing_id
+        for child in list(svg_element.contents):
+            if child is not defs:
+                drawing.append(child.extract())
+        defs.append(drawing)
+
+        page_use = soup.new_tag("use")
+        page_use["xlink:href"] = f"#{drawing_id}"
+        svg_element.append(page_use)
+
+    def find_images(self, pdf_name):
+        """Return image files in the pdfs directory that belong to a PDF."""
         if not self.pdfs_dir.exists():
             return []
 
-        copied_images = []
-        html_images_dir = self.html_dir / "images"
-        html_images_dir.mkdir(exist_ok=True)
-
         # Get all image files that start with the PDF name (without .pdf extension)
         image_files = [
             f
             for f in self.pdfs_dir.glob(f"{pdf_name}-*")
-            if f.is_file()
-            and f.suffix.lower() in [".jpg", ".jpeg", ".png", ".gif", ".webp"]
+            if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS
         ]
         image_files.sort(key=lambda x: x.name.lower())
+        return image_files
+
+    def image_processor(self, pdf_name):
+        """Return the processor that resizes a letter's photos."""
+        return ImageProcessor(
+            self.html_dir / "images",
+            self.html_dir / IMAGE_CACHE_DIR / f"{pdf_name}.json",
+            use_cache=self.use_cache,
+        )
 
-        for image_file in image_files:
-            dest_path = html_images_dir / image_file.name
-            shutil.copy2(image_file, dest_path)
-            copied_images.append(f"images/{image_file.name}")
+    def copy_images_to_html_dir(self, pdf_name):
+        """Resize images with matching PDF prefix into the html output directory.
+
+        Returns a dict per image with its ``src``, ``width``, ``height``,
+        ``srcset``, ``webp_srcset`` and ``sizes`` for the template.
+        """
+        image_files = self.find_images(pdf_name)
+        if not image_files:
+            return []
+        return self.image_processor(pdf_name).process(image_files)
+
+    def generate_html_from_svg_group(self, svg_files, output_name, page_links=None):
+        """Generate HTML from a group of SVG files.
+
+        Each file is read and processed only when the template reaches it.
+        ``page_links`` gives each file's hyperlinks, as listed in the page
+        manifest; without it they are looked up per file.
+        """
+        if page_links is None:
+            page_links = [None] * len(svg_files)
+        svg_contents = (
+            self.process_svg(svg_file, hyperlinks)
+            for svg_file, hyperlinks in zip(svg_files, page_links)
+        )
+        return self.render_letter(svg_contents, output_name)
+
+    def generate_html_from_pages(self, svg_pages, output_name):
+        """Generate HTML from in-memory ``SVGPage`` objects."""
+        svg_contents = (self.process_svg_page(svg_page) for svg_page in svg_pages)
+        return self.render_letter(svg_contents, output_name)
 
-        return copied_images
+    def render_letter(self, svg_contents, output_name):
+        """Stream processed page markup into the letter's HTML file.
 
-    def generate_html_from_svg_group(self, svg_files, output_name):
-        """Generate HTML from a group of SVG files."""
+        ``svg_contents`` may be a generator: pages are taken from it as the
+        template reaches them and written out at once, so only about one page
+        is held in memory however long the letter is. Templates should loop
+        over ``svg_contents`` rather than take its ``length``, which would
+        process every page up front.
+        """
         self.create_default_template()
 
         template = self.env.get_template("base.html")
-        svg_contents = []
 
-        for svg_file in svg_files:
-            svg_content = self.process_svg(svg_file)
-            svg_contents.append(svg_content)
+        # Resize images with matching PDF prefix and pass them to the template
+        image_files = self.find_images(output_name)
+        image_bytes = sum(path.stat().st_size for path in image_files)
+        with self.report.stage("images", output_name, bytes_in=image_bytes) as record:
+            photos = self.copy_images_to_html_dir(output_name)
+            if image_files:
+                record["bytes_out"] = sum(
+                    path.stat().st_size
+                    for path in self.image_processor(output_name).outputs(image_files)
+                )
 
-        # Copy images with matching PDF prefix and pass them to the template
-        copied_images = self.copy_images_to_html_dir(output_name)
-
-        html_content = template.render(
-            title=output_name.replace("_", " ").title(),
-            svg_contents=svg_contents,
-            photo_filenames=copied_images,
-        )
+        # Remove page files from an earlier build before writing any new ones
+        for old_asset in self.page_assets(output_name):
+            old_asset.unlink()
+        if self.lazy_pages:
+            svg_contents = self.page_markup(svg_contents, output_name)
 
         output_path = self.html_dir / f"{output_name}.html"
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        with self.report.stage("template", output_name, bytes_in=0) as record:
+
+            def counted(pages):
+                for page in pages:
+                    record["bytes_in"] += len(page)
+                    yield page
+
+            chunks = template.generate(
+                title=self.letter_title(output_name),
+                svg_contents=counted(svg_contents),
+                photos=photos,
+                # Plain image paths, for templates without srcset support
+                photo_filenames=[photo["src"] for photo in photos],
+            )
+            record["bytes_out"] = 0
+            with open(output_path, "w", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    record["bytes_out"] += len(chunk.encode("utf-8"))
 
         print(f"Generated HTML: {output_path}")
         return output_path
 
+    def page_assets(self, output_name):
+        """Return the page SVG files written for a letter in lazy mode."""
+        assets_dir = self.html_dir / PAGE_ASSETS_DIR
+        if not assets_dir.exists():
+            return []
+        return sorted(
+            assets_dir.glob(f"{output_name}_page_*.svg"),
+            key=lambda path: int(path.stem.rsplit("_page_", 1)[1]),
+        )
+
+    def write_page_assets(self, svg_contents, output_name):
+        """Write pages after the first to files and return the letter markup."""
+        return list(self.page_markup(svg_contents, output_name))
+
+    def page_markup(self, svg_contents, output_name):
+        """Yield the letter markup for each page, writing later pages to files.
+
+        The first page stays inline so it shows at once. Later pages become
+        lazily loaded ``<img>`` elements, or ``<iframe>`` elements for pages
+        with hyperlinks, since links in an ``<img>`` cannot be clicked. Each
+        page file is written as its page is reached.
+        """
+        assets_dir = self.html_dir / PAGE_ASSETS_DIR
+        for page_number, svg_content in enumerate(svg_contents, start=1):
+            start_tag = SVG_START_TAG.search(svg_content)
+            if page_number == 1 or start_tag is None:
+                yield svg_content
+                continue
+
+            asset_name = f"{output_name}_page_{page_number}.svg"
+            with self.report.stage("write", output_name, page_number) as record:
+                root_tag = start_tag.group(0) + "</svg>"
+                root = bs4.BeautifulSoup(root_tag, "xml").find("svg")
+                width = round(float(root.get("width", "595").rstrip("pt")))
+                height = round(float(root.get("height", "842").rstrip("pt")))
+                # Fill whatever box the page element is given; the viewBox scales
+                root["width"] = root["height"] = "100%"
+                for name, uri in SVG_NAMESPACES.items():
+                    root.attrs.setdefault(name, uri)
+                asset = str(root)[:-2] + ">" + svg_content[start_tag.end() :]
+                assets_dir.mkdir(exist_ok=True)
+                with open(assets_dir / asset_name, "w", encoding="utf-8") as f:
+                    f.write(asset)
+                record["bytes_out"] = len(asset.encode("utf-8"))
+
+            src = f"{PAGE_ASSETS_DIR}/{asset_name}"
+            size = f'width="{width}" height="{height}"'
+            if "<a " in svg_content:
+                yield (
+                    f'<iframe src="{src}" {size} loading="lazy" '
+                    f'title="Page {page_number}" '
+                    f'style="border:0;aspect-ratio:{width}/{height}"></iframe>'
+                )
+            else:
+                yield (
+                    f'<img src="{src}" {size} loading="lazy" decoding="async" '
+                    f'alt="Page {page_number}">'
+                )
+
+    def is_catalogued(self, output_name):
+        """Whether a letter's catalog entry and thumbnail are in place."""
+        entry = self.catalog.letters.get(output_name)
+        if entry is None:
+            return False
+        thumbnail = entry.get("thumbnail")
+        return thumbnail is None or (self.html_dir / thumbnail).exists()
+
+    def catalog_letter(self, output_name, page_count=None):
+        """Record a generated letter, and its thumbnail, in the catalog.
+
+        The page count and thumbnail come from the letter's PDF when it is
+        in the PDF directory; otherwise ``page_count`` is used.
+        """
+        output_path = self.html_dir / f"{output_name}.html"
+        entry = {
+            "title": self.letter_title(output_name),
+            "date": letter_date(output_name),
+            "pages": page_count,
+            "bytes": sum(
+                path.stat().st_size
+                for path in [output_path] + self.page_assets(output_name)
+            ),
+            "thumbnail": None,
+        }
+        pdf_path = self.pdfs_dir / f"{output_name}.pdf"
+        if pdf_path.exists():
+            thumbnail = f"{THUMBNAIL_DIR}/{output_name}.png"
+            entry.update(render_thumbnail(pdf_path, self.html_dir / thumbnail))
+            entry["thumbnail"] = thumbnail
+        self.catalog.letters[output_name] = entry
+
+    def update_index(self, letter_names):
+        """Write the index pages whose letters changed and return them.
+
+        The catalog is trimmed to ``letter_names``, then split into pages of
+        ``letters_per_page``. A page is only rendered when the letters on it,
+        its neighbours or the template differ from its last render.
+        """
+        self.create_default_index_template()
+        template = self.env.get_template("index.html")
+        template_hash = hash_file(self.template_dir / "index.html")
+
+        self.catalog.prune(letter_names)
+        pages = paginate(self.catalog.sorted_letters(), self.letters_per_page)
+        page_count = len(pages)
+        index_pages = {}
+        written = []
+        for page_number, letters in enumerate(pages, start=1):
+            filename = index_filename(page_number, page_count)
+            context = {
+                "title": "Letters",
+                # Newest first on every page
+                "letters": letters[::-1],
+                "page_number": page_number,
+                "page_count": page_count,
+                "newer_page": index_filename(page_number + 1, page_count)
+                if page_number < page_count
+                else None,
+                "older_page": index_filename(page_number - 1, page_count)
+                if page_number > 1
+                else None,
+            }
+            page_fingerprint = fingerprint(
+                template_hash, json.dumps(context, sort_keys=True)
+            )
+            index_pages[filename] = page_fingerprint
+
+            output_path = self.html_dir / filename
+            if (
+                self.use_cache
+                and self.catalog.index_pages.get(filename) == page_fingerprint
+                and output_path.exists()
+            ):
+                continue
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(template.render(**context))
+            written.append(output_path)
+
+        # Drop pages left over from when the index was longer
+        for index_path in self.html_dir.glob("index-*.html"):
+            if INDEX_PAGE_NAME.match(index_path.name) and (
+                index_path.name not in index_pages
+            ):
+                index_path.unlink()
+
+        self.catalog.index_pages = index_pages
+        self.catalog.save()
+        print(f"Index: {len(written)}/{page_count} page(s) updated")
+        return written
+
+    def letter_fingerprint(self, manifest_file, image_files, template_hash):
+        """Fingerprint every input that goes into one letter's HTML.
+
+        The page manifest holds the content hash and links of every page, so
+        hashing it covers the pages without reading each one.
+        """
+        parts = [template_hash, self.link_highlight, self.lazy_pages]
+        parts.append(hash_file(manifest_file))
+        for image_file in image_files:
+            parts.extend([image_file.name, hash_file(image_file)])
+        return fingerprint(*parts)
+
+    def load_letters(self):
+        """Read every page manifest in the SVG directory.
+
+        Returns a dict of PDF name to ``(manifest_file, pages)``, leaving out
+        PDFs whose manifest is unreadable or lists no pages.
+        """
+        letters = {}
+        for pdf_name, manifest_file in find_manifests(self.svg_dir).items():
+            manifest = read_manifest(manifest_file)
+            if manifest is None:
+                print(f"Skipping unreadable page manifest: {manifest_file}")
+            elif manifest["pages"]:
+                letters[pdf_name] = (manifest_file, manifest["pages"])
+        return letters
+
     def generate_all_html(self):
-        """Generate HTML files from all SVG files, grouped by PDF source."""
+        """Generate HTML files from all extracted PDFs, one letter per PDF.
+
+        Letters are found through the page manifests written by the
+        extractor, so the SVG directory itself is never listed. Letters
+        whose pages, hyperlinks, images and template all match the build
+        cache are skipped.
+        """
         if not self.svg_dir.exists():
             print(f"SVG directory {self.svg_dir} does not exist")
             return []
 
-        svg_groups = {}
-        for svg_file in self.svg_dir.glob("*.svg"):
-            pdf_name = svg_file.stem.rsplit("_page_", 1)[0]
-            if pdf_name not in svg_groups:
-                svg_groups[pdf_name] = []
-            svg_groups[pdf_name].append(svg_file)
+        letters = self.load_letters()
+        if not letters:
+            print(f"No page manifests in {self.svg_dir}; extract the PDFs first")
+
+        cache = None
+        if self.use_cache:
+            self.create_default_template()
+            cache = BuildCache(self.html_dir / CACHE_MANIFEST)
+            template_hash = hash_file(self.template_dir / "base.html")
 
         generated_files = []
-        for pdf_name, svg_files in svg_groups.items():
-            # Sort by page number numerically instead of alphabetically
-            svg_files.sort(
-                key=lambda x: int(x.stem.split("_page_")[1])
-                if "_page_" in x.stem
-                else 0
+        for pdf_name, (manifest_file, pages) in letters.items():
+            svg_files = [self.svg_dir / page["file"] for page in pages]
+            page_links = [page["links"] for page in pages]
+
+            if cache is None:
+                output_file = self.generate_html_from_svg_group(
+                    svg_files, pdf_name, page_links
+                )
+                generated_files.append(output_file)
+                self.catalog_letter(pdf_name, len(pages))
+                continue
+
+            image_files = self.find_images(pdf_name)
+            key_fingerprint = self.letter_fingerprint(
+                manifest_file, image_files, template_hash
+            )
+            cached = cache.lookup(letter_key(pdf_name), key_fingerprint)
+            if cached is not None:
+                print(f"Up to date: {cached[0]}")
+                generated_files.append(cached[0])
+                if not self.is_catalogued(pdf_name):
+                    self.catalog_letter(pdf_name, len(pages))
+                continue
+
+            output_file = self.generate_html_from_svg_group(
+                svg_files, pdf_name, page_links
             )
-            output_file = self.generate_html_from_svg_group(svg_files, pdf_name)
             generated_files.append(output_file)
+            self.catalog_letter(pdf_name, len(pages))
+            outputs = (
+                [output_file]
+                + self.image_processor(pdf_name).outputs(image_files)
+                + self.page_assets(pdf_name)
+            )
+            cache.store(letter_key(pdf_name), key_fingerprint, outputs)
 
-        return generated_files
+        if cache is not None:
+            cache.prune(letter_key(pdf_name) for pdf_name in letters)
+            cache.save()
+            print(cache.summary("HTML"))
+        self.update_index(letters)
+        if self.compress:
+            precompress(self.html_dir, use_cache=self.use_cache)
+        self.write_report()
 
+        return generated_files
 
-def main():
-    generator = HTMLGenerator()
+    def write_report(self):
+        """Write the build report beside the HTML files and print its summary."""
+        if not self.report.records:
+            return
+        self.report.write(self.html_dir / REPORT_FILE)
+        print(self.report.summary())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate HTML letters from SVG.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore the build cache and regenerate every letter",
+    )
+    parser.add_argument(
+        "--link-highlight",
+        choices=LINK_HIGHLIGHT_MODES,
+        default="use",
+        help="how hyperlinked strokes are drawn in blue: reference the page "
+        "drawing once per link, or clone the paths under it (default: use)",
+    )
+    parser.add_argument(
+        "--lazy-pages",
+        action="store_true",
+        help="keep the first page inline and load the others as separate SVG files",
+    )
+    parser.add_argument(
+        "--no-compress",
+        dest="compress",
+        action="store_false",
+        help="don't write precompressed .gz and .br copies of the output",
+    )
+    args = parser.parse_args(argv)
+
+    generator = HTMLGenerator(
+        use_cache=not args.force,
+        link_highlight=args.link_highlight,
+        lazy_pages=args.lazy_pages,
+        compress=args.compress,
+    )
     generated_files = generator.generate_all_html()
     print(f"Generated {len(generated_files)} HTML files")
 
@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.build_cache import BuildCache, fingerprint, hash_file
+from src.lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+
+# Photos are shown 595px wide (the width of a page), so a small size for
+# phones, the display size and double it for high-density screens
+IMAGE_WIDTHS = (400, 595, 1190)
+IMAGE_SIZES = "(max-width: 615px) 100vw, 595px"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def oriented_size(image):
+    """Return an image's size once its EXIF orientation has been applied."""
+    width, height = image.size
+    # Orientations 5-8 rotate the image by a quarter turn
+    if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def variant_widths(source_width, widths=IMAGE_WIDTHS):
+    """Return the widths to produce, never scaling a photo up."""
+    smaller = [width for width in widths if width < source_width]
+    if len(smaller) < len(widths):
+        smaller.append(source_width)
+    return smaller
+
+
+def _flatten(image):
+    """Return an RGB copy, with any transparency composited onto white."""
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def encode_variants(source, outputs):
+    """Resize a photo to each ``(width, path)`` in ``outputs``.
+
+    The image is decoded and rotated upright once. Variants are written as
+    WebP or JPEG by file suffix, without EXIF or other metadata.
+    """
+    with Image.open(source) as image:
+        image = _flatten(ImageOps.exif_transpose(image))
+    for width, path in outputs:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        if path.suffix == ".webp":
+            resized.save(path, "WEBP", quality=WEBP_QUALITY, method=6)
+        else:
+            resized.save(
+                path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+
+
+class ImageProcessor:
+    """Produce resized WebP and JPEG versions of letter photos.
+
+    Each photo becomes one file per width and format in the output
+    directory, named ``<stem>-<suffix>-<width>.<ext>`` so that photos
+    differing only in suffix (``beach.jpg`` and ``beach.png``) keep apart.
+    Encoded variants are cached by the hash of the source file, and stale
+    photos are encoded in parallel threads (Pillow releases the GIL while
+    resizing and encoding). Files an earlier build made that are no longer
+    wanted, including the full-size copies older builds wrote, are removed.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        manifest_path,
+        widths=IMAGE_WIDTHS,
+        use_cache=True,
+        jobs=None,
+    ):
+        self.output_dir = Path(output_dir)
+        # Records which source hash each photo's variants were made from
+        self.manifest_path = Path(manifest_path)
+        self.widths = tuple(widths)
+        self.use_cache = use_cache
+        self.jobs = jobs
+
+    def plan(self, source):
+        """Return the template data for a photo and the files it needs.
+
+        Only the image header is read, so this is cheap for cached photos.
+        """
+        with Image.open(source) as image:
+            width, height = oriented_size(image)
+
+        base_name = f"{source.stem}-{source.suffix[1:]}"
+        outputs = []
+        srcsets = {"webp": [], "jpg": []}
+        for variant_width in variant_widths(width, self.widths):
+            for extension, srcset in srcsets.items():
+                name = f"{base_name}-{variant_width}.{extension}"
+                outputs.append((variant_width, self.output_dir / name))
+                srcset.append(f"{self.output_dir.name}/{name} {variant_width}w")
+
+        # Shown at the middle width, or smaller photos at their own size
+        display_width = min(width, self.widths[len(self.widths) // 2])
+        photo = {
+            "src": f"{self.output_dir.name}/{base_name}-{display_width}.jpg",
+            "width": display_width,
+            "height": round(height * display_width / width),
+            "srcset": ", ".join(srcsets["jpg"]),
+            "webp_srcset": ", ".join(srcsets["webp"]),
+            "sizes": IMAGE_SIZES,
+        }
+        return photo, outputs
+
+    def outputs(self, sources):
+        """Return every file produced for the given photos."""
+        return [path for source in sources for _, path in self.plan(source)[1]]
+
+    def _remove_unwanted(self, cache, plans):
+        """Delete files earlier builds made that no planned output replaces.
+
+        These are the variants recorded in the manifest, for photos that
+        have since changed size or gone, and the full-size copies of each
+        photo that builds wrote before photos were resized.
+        """
+        wanted = {path.resolve() for _, _, outputs in plans for _, path in outputs}
+        unwanted = {self.output_dir / source.name for source, _, _ in plans}
+        for key in cache.entries:
+            unwanted.update(cache.previous_outputs(key))
+        for path in unwanted:
+            if path.resolve() not in wanted and path.is_file():
+                path.unlink()
+
+    def process(self, sources):
+        """Bring the variants of each photo up to date; return template data."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        cache = BuildCache(self.manifest_path)
+        plans = [(source, *self.plan(source)) for source in sources]
+        self._remove_unwanted(cache, plans)
+        recorded = len(cache.entries)
+        cache.prune(source.name for source in sources)
+
+        stale = []
+        for source, _, outputs in plans:
+            key_fingerprint = fingerprint(
+                hash_file(source), self.widths, WEBP_QUALITY, JPEG_QUALITY
+            )
+            if (
+                self.use_cache
+                and cache.lookup(source.name, key_fingerprint) is not None
+            ):
+                continue
+            stale.append((source, outputs))
+            cache.store(source.name, key_fingerprint, [path for _, path in outputs])
+
+        if len(stale) > 1 and self.jobs != 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                for future in [
+                    executor.submit(encode_variants, source, outputs)
+                    for source, outputs in stale
+                ]:
+                    future.result()
+        else:
+            for source, outputs in stale:
+                encode_variants(source, outputs)
+
+        for source, _ in stale:
+            print(f"Resized image: {source.name}")
+        if stale or len(cache.entries) < recorded:
+            cache.save()
+        return [photo for _, photo, _ in plans]
@@ -0,0 +1,120 @@
+import math
+
+from src.path_geometry import parse_transform, path_geometry
+
+
+def transform_bbox(bbox, matrix):
+    """Return the axis-aligned box around a transformed bounding box."""
+    a, b, c, d, e, f = matrix
+    xs = []
+    ys = []
+    for x in (bbox["x1"], bbox["x2"]):
+        for y in (bbox["y1"], bbox["y2"]):
+            xs.append(a * x + c * y + e)
+            ys.append(b * x + d * y + f)
+    return {"x1": min(xs), "y1": min(ys), "x2": max(xs), "y2": max(ys)}
+
+
+def _presentation(attrs, inherit_from, name, default):
+    """Look up a presentation attribute, falling back to an element's ancestry."""
+    value = attrs.get(name)
+    element = inherit_from
+    while value is None and element is not None:
+        value = element.get(name)
+        element = element.parent
+    return default if value is None else value
+
+
+def _float(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def stroke_bbox(attrs, inherit_from=None):
+    """Return a conservative box for a stroked path given its attributes.
+
+    ``attrs`` are the path's own attributes; presentation attributes it does
+    not set are inherited from ``inherit_from`` and its ancestors. The path
+    data box is padded by half the stroke width, scaled up by the miter limit
+    for mitred joins, and mapped through the path's ``transform``. Returns
+    ``None`` when the path cannot be bounded.
+    """
+    geometry = path_geometry(attrs.get("d"))
+    bbox = geometry.bounds()
+    matrix = parse_transform(attrs.get("transform"))
+    pad = _float(_presentation(attrs, inherit_from, "stroke-width", "1"), None)
+    if bbox is None or geometry.has_arcs or matrix is None or pad is None:
+        return None
+
+    pad /= 2
+    if _presentation(attrs, inherit_from, "stroke-linejoin", "miter") == "miter":
+        miter_limit = _presentation(attrs, inherit_from, "stroke-miterlimit", "4")
+        pad *= max(_float(miter_limit, 4), 1)
+    bbox = {
+        "x1": bbox["x1"] - pad,
+        "y1": bbox["y1"] - pad,
+        "x2": bbox["x2"] + pad,
+        "y2": bbox["y2"] + pad,
+    }
+    return transform_bbox(bbox, matrix)
+
+
+class GridIndex:
+    """Uniform grid over page space for finding boxes that touch a rectangle.
+
+    Items are inserted with a ``{"x1", "y1", "x2", "y2"}`` box, or ``None``
+    for items that cannot be bounded; those are returned by every query.
+    Queries return item keys in insertion order so paint order is kept.
+    """
+
+    # Boxes covering more cells than this are kept with the unbounded items
+    MAX_CELLS = 4096
+
+    def __init__(self, cell_size=32.0):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.boxes = {}
+        self.unbounded = []
+        self.order = {}
+
+    def _cell_range(self, bbox):
+        size = self.cell_size
+        return (
+            range(math.floor(bbox["x1"] / size), math.floor(bbox["x2"] / size) + 1),
+            range(math.floor(bbox["y1"] / size), math.floor(bbox["y2"] / size) + 1),
+        )
+
+    def insert(self, key, bbox):
+        self.order[key] = len(self.order)
+        if bbox is None or not all(math.isfinite(value) for value in bbox.values()):
+            self.unbounded.append(key)
+            return
+        columns, rows = self._cell_range(bbox)
+        if len(columns) * len(rows) > self.MAX_CELLS:
+            self.unbounded.append(key)
+            return
+        self.boxes[key] = bbox
+        for column in columns:
+            for row in rows:
+                self.cells.setdefault((column, row), []).append(key)
+
+    def query(self, rect):
+        """Return the keys whose boxes intersect ``rect``."""
+        found = set(self.unbounded)
+        columns, rows = self._cell_range(rect)
+        for column in columns:
+            for row in rows:
+                for key in self.cells.get((column, row), ()):
+                    if key in found:
+                        continue
+                    bbox = self.boxes[key]
+                    if not (
+                        bbox["x2"] < rect["x1"]
+                        or rect["x2"] < bbox["x1"]
+                        or bbox["y2"] < rect["y1"]
+                        or rect["y2"] < bbox["y1"]
+                    ):
+                        found.add(key)
+        return sorted(found, key=self.order.__getitem__)
@@ -0,0 +1,29 @@
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module that is imported when first used.
+
+    PyMuPDF, BeautifulSoup, Jinja, Pillow, lxml and NumPy together take
+    several hundred milliseconds to import, and most commands only need
+    some of them. Attributes are fetched from the real module on first use
+    and then kept on the stand-in, so later lookups cost the same as on the
+    module itself.
+    """
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._lazy_name)
+        value = getattr(module, attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self._lazy_name}'>"
+
+
+def lazy_import(name):
+    """Return a module that is only imported once an attribute is used."""
+    return LazyModule(name)
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+from src.build_cache import hash_bytes
+
+# One manifest per PDF, kept apart from the page files so finding every
+# letter lists one small directory instead of every page
+MANIFEST_DIR = "manifests"
+
+
+def manifest_path(svg_dir, pdf_name):
+    """Return where the page manifest of a PDF is kept."""
+    return Path(svg_dir) / MANIFEST_DIR / f"{pdf_name}.json"
+
+
+def find_manifests(svg_dir):
+    """Map each PDF name with a page manifest to the manifest's path."""
+    directory = Path(svg_dir) / MANIFEST_DIR
+    if not directory.exists():
+        return {}
+    return {path.stem: path for path in sorted(directory.glob("*.json"))}
+
+
+def page_entry(page, page_number, file_name, svg_text, hyperlinks):
+    """Describe one extracted page for the manifest.
+
+    Records the page's SVG file, its size in PDF points, the size and
+    content hash of the SVG, and its hyperlinks.
+    """
+    data = svg_text.encode("utf-8")
+    return {
+        "number": page_number,
+        "file": file_name,
+        "width": round(float(page.rect.width), 2),
+        "height": round(float(page.rect.height), 2),
+        "bytes": len(data),
+        "sha256": hash_bytes(data),
+        "links": hyperlinks,
+    }
+
+
+def write_manifest(svg_dir, pdf_name, pages):
+    """Write a PDF's page manifest, with its pages in page order.
+
+    A PDF with no pages has its manifest removed instead. Returns the
+    manifest path, or ``None`` when there is none.
+    """
+    path = manifest_path(svg_dir, pdf_name)
+    if not pages:
+        if path.exists():
+            path.unlink()
+        return None
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "pdf": f"{pdf_name}.pdf",
+        "pages": sorted(pages, key=lambda entry: entry["number"]),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    return path
+
+
+def read_manifest(path):
+    """Load a page manifest, or return ``None`` if it is missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("pages"), list):
+        return None
+    return manifest
@@ -0,0 +1,276 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from src.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+PATH_TOKEN = re.compile(
+    r"([MmZzLlHhVvCcSsQqTtAa])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+)
+# Numbers taken by one repetition of each command
+ARGUMENT_COUNTS = {
+    "M": 2,
+    "L": 2,
+    "H": 1,
+    "V": 1,
+    "C": 6,
+    "S": 4,
+    "Q": 4,
+    "T": 2,
+    "A": 7,
+    "Z": 0,
+}
+# Path data that is already plain absolute x,y pairs, as PyMuPDF writes it
+ABSOLUTE_PAIRS = re.compile(r"^[MLCQZ\d\s,.+-]*$")
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)")
+TRANSFORM = re.compile(r"(matrix|translate|scale|rotate)\s*\(([^)]*)\)")
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class PathGeometry:
+    """Absolute coordinates of an SVG path, parsed once from its ``d`` data.
+
+    ``points`` holds every end point and control point as an ``(n, 2)``
+    array, with relative, H/V and shorthand commands resolved. Control
+    points enclose their curves, so the bounds always contain the drawn
+    outline. Elliptical arcs are recorded by their end points only, and
+    ``has_arcs`` flags paths whose bounds may be too small.
+    """
+
+    def __init__(self, points, commands, number_count, has_arcs=False):
+        self.points = points
+        self.points.flags.writeable = False
+        self.commands = commands
+        self.number_count = number_count
+        self.has_arcs = has_arcs
+        self._command_counts = Counter(commands.upper())
+        self._bounds = None
+
+    def command_count(self, letters):
+        """Count the path commands (either case) among ``letters``."""
+        return sum(self._command_counts[c] for c in letters.upper())
+
+    def bounds(self):
+        """Return the ``{"x1", "y1", "x2", "y2"}`` box of the points.
+
+        The box is cached and shared, so callers must not modify it.
+        """
+        if not len(self.points):
+            return None
+        if self._bounds is None:
+            low = self.points.min(axis=0)
+            high = self.points.max(axis=0)
+            self._bounds = {
+                "x1": float(low[0]),
+                "y1": float(low[1]),
+                "x2": float(high[0]),
+                "y2": float(high[1]),
+            }
+        return self._bounds
+
+    def count_inside(self, rect):
+        """Count the points inside a ``{"x1", "y1", "x2", "y2"}`` rectangle."""
+        bbox = self.bounds()
+        if bbox is None:
+            return 0
+        # Most paths lie wholly inside or outside a link; skip the array work
+        if (
+            bbox["x2"] < rect["x1"]
+            or rect["x2"] < bbox["x1"]
+            or bbox["y2"] < rect["y1"]
+            or rect["y2"] < bbox["y1"]
+        ):
+            return 0
+        if (
+            rect["x1"] <= bbox["x1"]
+            and bbox["x2"] <= rect["x2"]
+            and rect["y1"] <= bbox["y1"]
+            and bbox["y2"] <= rect["y2"]
+        ):
+            return len(self.points)
+
+        x = self.points[:, 0]
+        y = self.points[:, 1]
+        inside_x = (rect["x1"] <= x) & (x <= rect["x2"])
+        inside_y = (rect["y1"] <= y) & (y <= rect["y2"])
+        return int(np.count_nonzero(inside_x & inside_y))
+
+    def fraction_inside(self, rect):
+        """Return the share of the points inside a rectangle."""
+        if not len(self.points):
+            return 0.0
+        return self.count_inside(rect) / len(self.points)
+
+    def overlap_ratio(self, rect):
+        """Return the share of the path's bounding box area that ``rect`` covers."""
+        bbox = self.bounds()
+        if bbox is None:
+            return 0.0
+        area = (bbox["x2"] - bbox["x1"]) * (bbox["y2"] - bbox["y1"])
+        overlap_width = min(bbox["x2"], rect["x2"]) - max(bbox["x1"], rect["x1"])
+        overlap_height = min(bbox["y2"], rect["y2"]) - max(bbox["y1"], rect["y1"])
+        if area <= 0 or overlap_width <= 0 or overlap_height <= 0:
+            return 0.0
+        return overlap_width * overlap_height / area
+
+
+def _resolve_points(tokens):
+    """Walk path tokens, returning absolute points, commands and number count."""
+    points = []
+    commands = []
+    number_count = 0
+    has_arcs = False
+    x = y = start_x = start_y = 0.0
+    # Control point that a following S or T reflects, and for which command
+    smooth_control = smooth_kind = None
+
+    index = 0
+    while index < len(tokens):
+        command, _ = tokens[index]
+        index += 1
+        if not command:
+            # Numbers before the first command make the data invalid
+            break
+        commands.append(command)
+        upper = command.upper()
+        relative = command != upper
+
+        if upper == "Z":
+            x, y = start_x, start_y
+            smooth_control = smooth_kind = None
+            continue
+
+        count = ARGUMENT_COUNTS[upper]
+        first = True
+        while index + count <= len(tokens) and all(
+            not tokens[index + i][0] for i in range(count)
+        ):
+            args = [float(tokens[index + i][1]) for i in range(count)]
+            index += count
+            number_count += count
+
+            if upper == "H":
+                x = args[0] + (x if relative else 0.0)
+                points.append((x, y))
+            elif upper == "V":
+                y = args[0] + (y if relative else 0.0)
+                points.append((x, y))
+            elif upper == "A":
+                has_arcs = True
+                x = args[5] + (x if relative else 0.0)
+                y = args[6] + (y if relative else 0.0)
+                points.append((x, y))
+            else:
+                if upper in "ST":
+                    # The implied first control point bounds the curve too
+                    kind = "C" if upper == "S" else "Q"
+                    if smooth_kind == kind:
+                        points.append(
+                            (2 * x - smooth_control[0], 2 * y - smooth_control[1])
+                        )
+                    else:
+                        points.append((x, y))
+                offset_x, offset_y = (x, y) if relative else (0.0, 0.0)
+                for i in range(0, count, 2):
+                    points.append((args[i] + offset_x, args[i + 1] + offset_y))
+                x, y = points[-1]
+
+            if upper in "CS":
+                smooth_control, smooth_kind = points[-2], "C"
+            elif upper in "QT":
+                smooth_control, smooth_kind = points[-2], "Q"
+            else:
+                smooth_control = smooth_kind = None
+
+            if upper == "M" and first:
+                start_x, start_y = x, y
+            first = False
+
+        if first or (index < len(tokens) and not tokens[index][0]):
+            # Missing or leftover arguments: keep what parsed cleanly
+            break
+
+    return points, "".join(commands), number_count, has_arcs
+
+
+@lru_cache(maxsize=4096)
+def path_geometry(path_d):
+    """Parse path data into a cached ``PathGeometry``.
+
+    Paths that repeat across a page, or are looked at again for every
+    link, are only parsed once.
+    """
+    if not path_d:
+        return PathGeometry(np.empty((0, 2)), "", 0)
+
+    if ABSOLUTE_PAIRS.match(path_d):
+        # Fast path: every number is part of an absolute x,y pair
+        commands = "".join(re.findall(r"[MLCQZ]", path_d))
+        numbers = np.array(NUMBER.findall(path_d), dtype=float)
+        if commands[:1] == "M" and len(numbers) % 2 == 0:
+            return PathGeometry(numbers.reshape(-1, 2), commands, len(numbers))
+
+    points, commands, number_count, has_arcs = _resolve_points(
+        PATH_TOKEN.findall(path_d)
+    )
+    array = np.array(points, dtype=float) if points else np.empty((0, 2))
+    return PathGeometry(array, commands, number_count, has_arcs)
+
+
+def multiply(m1, m2):
+    """Compose two SVG matrices (a, b, c, d, e, f): apply ``m2`` then ``m1``."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def parse_transform(value):
+    """Parse an SVG ``transform`` attribute into a matrix.
+
+    Returns ``None`` for transforms that are not understood, so callers can
+    fall back to treating the element as unbounded.
+    """
+    matrix = IDENTITY
+    if not value or not value.strip():
+        return matrix
+
+    end = 0
+    for match in TRANSFORM.finditer(value):
+        if value[end : match.start()].strip(" \t\r\n,"):
+            return None
+        end = match.end()
+        kind = match.group(1)
+        args = [float(n) for n in NUMBER.findall(match.group(2))]
+        if kind == "matrix" and len(args) == 6:
+            step = tuple(args)
+        elif kind == "translate" and len(args) in (1, 2):
+            step = (1.0, 0.0, 0.0, 1.0, args[0], args[1] if len(args) == 2 else 0.0)
+        elif kind == "scale" and len(args) in (1, 2):
+            step = (args[0], 0.0, 0.0, args[-1], 0.0, 0.0)
+        elif kind == "rotate" and len(args) in (1, 3):
+            angle = math.radians(args[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            step = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(args) == 3:
+                cx, cy = args[1], args[2]
+                step = multiply(
+                    multiply((1.0, 0.0, 0.0, 1.0, cx, cy), step),
+                    (1.0, 0.0, 0.0, 1.0, -cx, -cy),
+                )
+        else:
+            return None
+        matrix = multiply(matrix, step)
+
+    if value[end:].strip(" \t\r\n,"):
+        return None
+    return matrix
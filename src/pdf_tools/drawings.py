@@ -0,0 +1,434 @@
+import re
+
+from src.lazy_import import lazy_import
+from src.path_geometry import NUMBER
+from src.pdf_tools.path_data import compact_subpaths
+from src.pdf_tools.svg_precision import round_number
+
+# Stroke simplification needs NumPy, and only runs with --simplify
+simplification = lazy_import("src.pdf_tools.simplify")
+
+SVG_START = (
+    '<svg xmlns="http://www.w3.org/2000/svg"'
+    ' xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1"'
+    ' width="{width}" height="{height}" viewBox="0 0 {view_width} {view_height}"'
+)
+# SVG names of PDF line caps and joins, by their number in the PDF
+LINE_CAPS = ("butt", "round", "square")
+LINE_JOINS = ("miter", "round", "bevel")
+# PDF's default miter limit; get_drawings does not report the page's own
+PDF_MITER_LIMIT = 10
+# Presentation attributes holding lengths, rescaled in fixed-point output
+LENGTH_ATTRS = frozenset(["stroke-width", "stroke-dasharray", "stroke-dashoffset"])
+# Resources whose painting get_cdrawings does not report: shadings, which the
+# sh operator and shading patterns paint, and tiling or shading pattern fills
+UNDRAWN_RESOURCES = ("/Shading", "/Pattern")
+# The operator that begins an inline image, which get_images does not list
+INLINE_IMAGE = re.compile(rb"(?:^|\s)BI\s")
+# Values SVG assumes when an attribute is left out
+SVG_DEFAULTS = {
+    "stroke-width": "1",
+    "stroke-miterlimit": "4",
+    "stroke-dashoffset": "0",
+    "fill-opacity": "1",
+    "stroke-opacity": "1",
+}
+
+
+class DrawnPath:
+    """A path painted on a PDF page, in page coordinates.
+
+    ``subpaths`` are in the stroke simplifier's form: dicts with a ``start``
+    point, a list of ``("L", x, y)`` and ``("C", x1, y1, x2, y2, x, y)``
+    ``segments`` and a ``closed`` flag. ``style`` is a tuple of SVG
+    presentation attributes and their unformatted values, so paths painted
+    alike compare equal. ``clip`` is the rectangle the path is clipped to,
+    or ``None`` where clipping would not cut it.
+    """
+
+    def __init__(self, subpaths, style, bounds, clip=None):
+        self.subpaths = subpaths
+        self.style = style
+        self.bounds = bounds
+        self.clip = clip
+
+    @property
+    def is_stroke(self):
+        """True for stroked paths with no fill, the way handwriting is drawn."""
+        style = dict(self.style)
+        return style["fill"] == "none" and "stroke" in style
+
+    @property
+    def merges(self):
+        """True if the path can share one ``<path>`` with its neighbours.
+
+        Only opaque strokes qualify: the subpaths of one path are painted
+        together, so translucent strokes would no longer darken where they
+        cross, and fills could cancel out under the winding rule.
+        """
+        return self.is_stroke and "stroke-opacity" not in dict(self.style)
+
+
+class PageDrawing:
+    """The paths of a PDF page in paint order, with the page's size in points."""
+
+    def __init__(self, width, height, paths):
+        self.width = width
+        self.height = height
+        self.paths = paths
+        # CSS colour painted behind the page in place of a stripped page fill
+        self.background = None
+
+
+def _color(components):
+    return "#" + "".join(f"{round(value * 255):02x}" for value in components)
+
+
+def _path_style(item):
+    """Return the SVG presentation attributes of a drawing item."""
+    kind = item["type"]
+    style = []
+    if "f" in kind:
+        style.append(("fill", _color(item["fill"])))
+        if item.get("even_odd"):
+            style.append(("fill-rule", "evenodd"))
+        if item.get("fill_opacity", 1) != 1:
+            style.append(("fill-opacity", item["fill_opacity"]))
+    else:
+        style.append(("fill", "none"))
+
+    if "s" in kind:
+        style.append(("stroke", _color(item["color"])))
+        style.append(("stroke-width", item["width"]))
+        cap = LINE_CAPS[int(item["lineCap"][0])]
+        join = LINE_JOINS[int(item["lineJoin"])]
+        if cap != "butt":
+            style.append(("stroke-linecap", cap))
+        if join == "miter":
+            style.append(("stroke-miterlimit", PDF_MITER_LIMIT))
+        else:
+            style.append(("stroke-linejoin", join))
+        dashes = [float(number) for number in NUMBER.findall(item.get("dashes", ""))]
+        if len(dashes) > 1:
+            style.append(("stroke-dasharray", tuple(dashes[:-1])))
+            style.append(("stroke-dashoffset", dashes[-1]))
+        if item.get("stroke_opacity", 1) != 1:
+            style.append(("stroke-opacity", item["stroke_opacity"]))
+    return tuple(style)
+
+
+def _closed_subpath(corners):
+    start, *rest = corners
+    return {
+        "start": start,
+        "segments": [("L", *corner) for corner in rest],
+        "closed": True,
+    }
+
+
+def _item_subpaths(item):
+    """Convert a drawing item's line, curve, rectangle and quad items."""
+    subpaths = []
+    current = None
+    point = None
+    for kind, *args in item["items"]:
+        if kind == "re":
+            (x0, y0, x1, y1), orientation = args
+            corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+            subpaths.append(
+                _closed_subpath(corners if orientation >= 0 else corners[::-1])
+            )
+            current = None
+            continue
+        if kind == "qu":
+            upper_left, upper_right, lower_left, lower_right = args[0]
+            subpaths.append(
+                _closed_subpath([upper_left, lower_left, lower_right, upper_right])
+            )
+            current = None
+            continue
+
+        start = tuple(args[0])
+        if current is None or start != point:
+            current = {"start": start, "segments": [], "closed": False}
+            subpaths.append(current)
+        if kind == "l":
+            current["segments"].append(("L", *args[1]))
+        else:
+            current["segments"].append(("C", *args[1], *args[2], *args[3]))
+        point = tuple(args[-1])
+
+    if item.get("closePath") and current is not None:
+        current["closed"] = True
+    # get_cdrawings reports a closed subpath as a final line back to its
+    # start; closing it instead keeps the join there rather than two caps
+    for subpath in subpaths:
+        segments = subpath["segments"]
+        if (
+            not subpath["closed"]
+            and len(segments) > 1
+            and segments[-1][0] == "L"
+            and tuple(segments[-1][1:]) == tuple(subpath["start"])
+        ):
+            segments.pop()
+            subpath["closed"] = True
+    return subpaths
+
+
+def _intersect(rect1, rect2):
+    """Return the overlap of two ``(x0, y0, x1, y1)`` rectangles, or ``None``."""
+    if rect1 is None or rect2 is None:
+        return None
+    x0, y0 = max(rect1[0], rect2[0]), max(rect1[1], rect2[1])
+    x1, y1 = min(rect1[2], rect2[2]), min(rect1[3], rect2[3])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (x0, y0, x1, y1)
+
+
+def _contains(outer, inner):
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def _painted_bounds(item, style):
+    """Pad a drawing item's box by how far its stroke can reach past it."""
+    x0, y0, x1, y1 = item["rect"]
+    style = dict(style)
+    pad = style.get("stroke-width", 0) / 2
+    if "stroke-miterlimit" in style:
+        pad *= style["stroke-miterlimit"]
+    return (x0 - pad, y0 - pad, x1 + pad, y1 + pad)
+
+
+def _resources(doc, xref):
+    """Return the source of the resource dictionary an object uses.
+
+    Pages may inherit their resources from the page tree, so the parents of
+    an object without its own are searched too.
+    """
+    while xref:
+        kind, value = doc.xref_get_key(xref, "Resources")
+        if kind == "xref":
+            return doc.xref_object(int(value.split()[0]))
+        if kind == "dict":
+            return value
+        kind, value = doc.xref_get_key(xref, "Parent")
+        xref = int(value.split()[0]) if kind == "xref" else 0
+    return ""
+
+
+def _paints_undrawn_content(page):
+    """True if a page or its forms use shadings, patterns or inline images."""
+    doc = page.parent
+    sources = [(_resources(doc, page.xref), page.read_contents())]
+    for xref, *_ in page.get_xobjects():
+        sources.append((_resources(doc, xref), doc.xref_stream(xref) or b""))
+    return any(
+        any(name in resources for name in UNDRAWN_RESOURCES)
+        or INLINE_IMAGE.search(content)
+        for resources, content in sources
+    )
+
+
+def _rectangular(item):
+    """True if a clip item's path is an axis-aligned rectangle."""
+    items = item["items"]
+    if len(items) == 1 and items[0][0] == "re":
+        return True
+    x0, y0, x1, y1 = item["scissor"]
+    corners = {(x0, y0), (x1, y0), (x1, y1), (x0, y1)}
+    if len(items) == 1 and items[0][0] == "qu":
+        return {tuple(point) for point in items[0][1]} == corners
+    if any(kind != "l" for kind, *_ in items) or len(items) > 4:
+        return False
+    points = [tuple(items[0][1])] + [tuple(end) for _, _, end in items]
+    return set(points) == corners and all(
+        a[0] == b[0] or a[1] == b[1] for a, b in zip(points, points[1:])
+    )
+
+
+def read_page_drawing(page, complete=True):
+    """Read a page's paths into a ``PageDrawing``, without rendering SVG.
+
+    Uses ``page.get_cdrawings()``, the raw form of ``get_drawings()`` that
+    skips building ``Point`` and ``Rect`` objects. A clip is kept on a path
+    only if it cuts the visible part of the path, and paths clipped away or
+    lying off the page are dropped.
+
+    Returns ``None`` for pages this cannot draw faithfully: rotated pages,
+    pages with fonts, images (inline ones included), shadings or pattern
+    fills, and pages using transparency groups or clipping to anything but
+    rectangles. These need the full SVG renderer. With ``complete`` false,
+    all but rotated pages are read as far as ``get_cdrawings`` reports
+    them, clipped to the bounding box of each clip, which is enough to find
+    their background (see ``strip_rendered_background``).
+    """
+    if page.rotation:
+        return None
+    if complete and (
+        page.get_fonts() or page.get_images() or _paints_undrawn_content(page)
+    ):
+        return None
+
+    page_rect = tuple(page.rect)
+    # Clips in force as (level, rectangle), outermost first; each rectangle
+    # is already intersected with those enclosing it
+    clips = []
+    paths = []
+    for item in page.get_cdrawings(extended=True):
+        level = item.get("level", 0)
+        while clips and clips[-1][0] >= level:
+            clips.pop()
+        clip = clips[-1][1] if clips else page_rect
+
+        if item["type"] == "clip":
+            if complete and not _rectangular(item):
+                return None
+            clips.append((level, _intersect(clip, tuple(item["scissor"]))))
+            continue
+        if item["type"] == "group":
+            if complete and (
+                item.get("opacity", 1) != 1 or item.get("blendmode") != "Normal"
+            ):
+                return None
+            continue
+
+        subpaths = _item_subpaths(item)
+        style = _path_style(item)
+        visible = _intersect(_painted_bounds(item, style), page_rect)
+        if not subpaths or visible is None or clip is None:
+            continue
+        cut = not _contains(clip, visible)
+        paths.append(
+            DrawnPath(subpaths, style, tuple(item["rect"]), clip if cut else None)
+        )
+    return PageDrawing(page.rect.width, page.rect.height, paths)
+
+
+def _number_format(precision, fixed_point):
+    """Return the decimal places and scale path data is written with."""
+    return (0, 10**precision) if fixed_point else (precision, 1)
+
+
+def simplify_drawing(drawing, tolerance, precision=2, fixed_point=False):
+    """Simplify the stroke paths of a drawing in place, like ``simplify_svg``.
+
+    Paths keep their simplified geometry only where it writes shorter path
+    data. Returns a dict of ``paths`` simplified and path data
+    ``bytes_before`` and ``bytes_after``.
+    """
+    digits, scale = _number_format(precision, fixed_point)
+    stats = {"paths": 0, "bytes_before": 0, "bytes_after": 0}
+    for path in drawing.paths:
+        if not path.is_stroke:
+            continue
+        before = len(compact_subpaths(path.subpaths, digits, scale))
+        simplified = simplification.simplify_subpaths(
+            [dict(subpath) for subpath in path.subpaths], tolerance
+        )
+        after = len(compact_subpaths(simplified, digits, scale))
+        stats["bytes_before"] += before
+        if after < before:
+            path.subpaths = simplified
+            stats["paths"] += 1
+            stats["bytes_after"] += after
+        else:
+            stats["bytes_after"] += before
+    return stats
+
+
+def _style_runs(paths):
+    """Group consecutive paths that can be written as one ``<path>``."""
+    run = []
+    for path in paths:
+        previous = run[-1] if run else None
+        if (
+            previous is not None
+            and path.merges
+            and previous.merges
+            and path.style == previous.style
+            and path.clip == previous.clip
+        ):
+            run.append(path)
+            continue
+        if run:
+            yield run
+        run = [path]
+    if run:
+        yield run
+
+
+def write_drawing_svg(drawing, precision=2, fixed_point=False):
+    """Write a drawing as a compact SVG document in page coordinates.
+
+    Numbers are rounded as they are written. Consecutive opaque strokes
+    painted alike are merged into one path, attributes equal to SVG's
+    defaults are left out, and each clip rectangle is defined once and
+    referenced only by the paths it cuts. The drawing's ``background``
+    colour, if any, is set on the ``<svg>`` with CSS. With ``fixed_point``,
+    coordinates and lengths are integers in units of ``10 ** -precision``
+    points under a matching ``viewBox``, as ``optimize_svg_precision``
+    writes them.
+    """
+    digits, scale = _number_format(precision, fixed_point)
+
+    def length(value):
+        if fixed_point:
+            return str(round(value * scale))
+        return round_number(value, precision)
+
+    clip_ids = {}
+    clip_paths = []
+    elements = []
+    for run in _style_runs(drawing.paths):
+        first = run[0]
+        attrs = []
+        for name, value in first.style:
+            if isinstance(value, tuple):
+                text = " ".join(length(number) for number in value)
+            elif name in LENGTH_ATTRS:
+                text = length(value)
+            elif isinstance(value, str):
+                text = value
+            else:
+                text = round_number(value, precision)
+            if SVG_DEFAULTS.get(name) != text:
+                attrs.append(f' {name}="{text}"')
+
+        if first.clip is not None:
+            clip_id = clip_ids.get(first.clip)
+            if clip_id is None:
+                clip_id = clip_ids[first.clip] = f"clip_{len(clip_ids) + 1}"
+                x0, y0, x1, y1 = first.clip
+                clip_paths.append(
+                    f'<clipPath id="{clip_id}"><rect x="{length(x0)}"'
+                    f' y="{length(y0)}" width="{length(x1 - x0)}"'
+                    f' height="{length(y1 - y0)}"/></clipPath>'
+                )
+            attrs.append(f' clip-path="url(#{clip_id})"')
+
+        subpaths = [subpath for path in run for subpath in path.subpaths]
+        path_d = compact_subpaths(subpaths, digits, scale)
+        elements.append(f'<path{"".join(attrs)} d="{path_d}"/>')
+
+    parts = [
+        SVG_START.format(
+            width=f"{drawing.width:g}",
+            height=f"{drawing.height:g}",
+            view_width=length(drawing.width),
+            view_height=length(drawing.height),
+        )
+    ]
+    if drawing.background:
+        parts.append(f' style="background-color:{drawing.background}"')
+    parts.append(">")
+    if clip_paths:
+        parts.append(f"<defs>{''.join(clip_paths)}</defs>")
+    parts.extend(elements)
+    parts.append("</svg>")
+    return "".join(parts)
@@ -1,164 +1,622 @@
-import json
-import re
+import argparse
+import base64
+import gzip
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import fitz  # PyMuPDF
-from bs4 import BeautifulSoup
+from src.build_cache import BuildCache, fingerprint, hash_file
+from src.build_report import REPORT_FILE, BuildReport
+from src.lazy_import import lazy_import
+from src.page_manifest import manifest_path, page_entry, write_manifest
+from src.pdf_tools.drawings import (
+    read_page_drawing,
+    simplify_drawing,
+    write_drawing_svg,
+)
+from src.pdf_tools.page_background import (
+    PAGE_BACKGROUND_MODES,
+    strip_page_background,
+    strip_rendered_background,
+)
+from src.pdf_tools.svg_precision import optimize_svg_precision, optimize_tree_precision
+
+# Loaded when a page is first rendered, so --help and cached builds start fast
+fitz = lazy_import("fitz")  # PyMuPDF
+bs4 = lazy_import("bs4")
+Image = lazy_import("PIL.Image")
+# Stroke simplification needs NumPy, and only runs with --simplify
+simplification = lazy_import("src.pdf_tools.simplify")
+
+CACHE_MANIFEST = ".build-cache.json"
+# How pages become SVG: PyMuPDF's SVG renderer, or our own writer fed
+# straight from the page's drawing commands
+BACKENDS = ("svg", "drawings")
+# Lossy quality for raster pages; PNG is used instead when it is smaller
+RASTER_WEBP_QUALITY = 80
+
+
+class SVGPage:
+    """A rendered PDF page held in memory: one parsed SVG tree plus its links.
+
+    Pages carry their tree from extraction to HTML generation so the SVG is
+    parsed once and serialized once.
+    """
 
+    def __init__(self, pdf_name, page_number, soup, hyperlinks):
+        self.pdf_name = pdf_name
+        self.page_number = page_number
+        self.soup = soup
+        self.hyperlinks = hyperlinks
 
-def optimize_svg_precision(svg_text, precision=2):
-    """
-    Reduce decimal precision in SVG coordinates to compress file size.
+    @property
+    def file_name(self):
+        """Name of the SVG file this page is written to in debug output."""
+        return f"{self.pdf_name}_page_{self.page_number}.svg"
 
-    Uses XML parsing to safely modify numeric attributes and path data
-    without breaking the SVG structure.
 
-    Args:
-        svg_text: Raw SVG string
-        precision: Number of decimal places to keep (default: 2)
+def _page_hyperlinks(page, scale=1):
+    """Return the URI hyperlinks on a PDF page as JSON-ready dicts.
 
-    Returns:
-        Optimized SVG string
+    Link boxes are multiplied by ``scale`` to match fixed-point page SVG.
+    """
+    hyperlinks = []
+    for link in page.get_links():
+        if link["kind"] == 2:  # URI link
+            hyperlinks.append(
+                {
+                    "uri": link["uri"],
+                    "bbox": {
+                        "x": link["from"].x0 * scale,
+                        "y": link["from"].y0 * scale,
+                        "width": link["from"].width * scale,
+                        "height": link["from"].height * scale,
+                    },
+                }
+            )
+    return hyperlinks
+
+
+def _write_page_svg(output_dir, svg_file_name, svg_text):
+    """Write a page's SVG file; its links go in the PDF's page manifest."""
+    output_file = output_dir / svg_file_name
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(svg_text)
+    return output_file
+
+
+def _record_simplify_bytes(record, simplify_stats):
+    """Report the stroke path data a page had before and after simplifying.
+
+    Both backends measure path data rather than the whole page, so their
+    savings add up alike in the build report.
     """
+    record["bytes_in"] = simplify_stats["bytes_before"]
+    record["bytes_out"] = simplify_stats["bytes_after"]
 
-    def round_number(num_str):
-        """Round a number string to specified precision."""
-        try:
-            num = float(num_str)
-            rounded = round(num, precision)
-            # Format and remove unnecessary trailing zeros and decimal point
-            formatted = f"{rounded:.{precision}f}".rstrip('0').rstrip('.')
-            return formatted if formatted else '0'
-        except (ValueError, TypeError):
-            return num_str
-
-    def round_numbers_in_string(text):
-        """Find and round all numbers in a string (for path data, etc)."""
-        if not text:
-            return text
-        # Match floating point numbers:
-        # - Optional minus sign
-        # - Either: digits + optional decimal + optional digits
-        # - Or: just decimal point + digits (for .999 style numbers)
-        pattern = r'-?(?:\d+\.?\d*|\.\d+)'
-
-        def replace_num(match):
-            num_str = match.group(0)
-            # Only round if it has a decimal point
-            if '.' in num_str:
-                return round_number(num_str)
-            return num_str
-
-        return re.sub(pattern, replace_num, text)
-
-    # Parse SVG with BeautifulSoup
-    soup = BeautifulSoup(svg_text, 'xml')
-
-    # Attributes that contain numeric values to round
-    numeric_attrs = ['x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry',
-                     'x1', 'y1', 'x2', 'y2', 'stroke-width', 'font-size']
-
-    # Attributes that contain lists of numbers (space or comma separated)
-    list_attrs = ['viewBox', 'points']
-
-    # Attributes that contain complex number sequences (path data, transforms)
-    complex_attrs = ['d', 'transform']
-
-    # Process all elements
-    for element in soup.find_all():
-        # Round simple numeric attributes
-        for attr in numeric_attrs:
-            if attr in element.attrs:
-                element[attr] = round_number(element[attr])
-
-        # Round list-based attributes
-        for attr in list_attrs:
-            if attr in element.attrs:
-                values = re.split(r'[\s,]+', element[attr])
-                rounded_values = [round_number(v) for v in values if v]
-                element[attr] = ' '.join(rounded_values)
-
-        # Round complex attributes (paths and transforms)
-        for attr in complex_attrs:
-            if attr in element.attrs:
-                element[attr] = round_numbers_in_string(element[attr])
-
-    # Return optimized SVG
-    return str(soup)
 
+def _render_page_svg(page, simplify, page_background, report, pdf_name, page_number):
+    """Render a page to SVG text, simplifying its strokes if asked.
+
+    Unless ``page_background`` is ``"keep"``, the page's background is
+    stripped as it is rendered. Returns the text and the simplification
+    stats, or ``None`` for them when ``simplify`` is not set.
+    """
+    with report.stage("render", pdf_name, page_number) as record:
+        svg_text = page.get_svg_image()
+        if svg_text and page_background != "keep":
+            svg_text, _ = strip_rendered_background(
+                svg_text, page, css=page_background == "css"
+            )
+        record["bytes_out"] = len(svg_text or "")
+    if not svg_text or simplify is None:
+        return svg_text, None
+    with report.stage("simplify", pdf_name, page_number) as record:
+        svg_text, simplify_stats = simplification.simplify_svg(svg_text, simplify)
+        _record_simplify_bytes(record, simplify_stats)
+    return svg_text, simplify_stats
+
+
+def _draw_page_svg(
+    page,
+    precision,
+    simplify,
+    fixed_point,
+    page_background,
+    report,
+    pdf_name,
+    page_number,
+):
+    """Write a page's SVG straight from its drawing commands.
+
+    The paths are read as coordinates, their background stripped and their
+    strokes simplified if asked, and rounded as the SVG is written, so the
+    page is never rendered to SVG text and parsed back. Returns the text and
+    the simplification stats like ``_render_page_svg``, or ``None`` when the
+    page needs the full renderer.
+    """
+    with report.stage("render", pdf_name, page_number):
+        drawing = read_page_drawing(page)
+        if drawing is not None and page_background != "keep":
+            strip_page_background(drawing, css=page_background == "css")
+    if drawing is None:
+        return None
+    simplify_stats = None
+    if simplify is not None:
+        with report.stage("simplify", pdf_name, page_number) as record:
+            simplify_stats = simplify_drawing(drawing, simplify, precision, fixed_point)
+            _record_simplify_bytes(record, simplify_stats)
+    with report.stage("precision", pdf_name, page_number) as record:
+        svg_text = write_drawing_svg(drawing, precision, fixed_point)
+        record["bytes_out"] = len(svg_text)
+    return svg_text, simplify_stats
+
+
+def _raster_page_svg(page, dpi):
+    """Render a page to a bitmap wrapped in an SVG the size of the page.
+
+    The page is encoded as both WebP and PNG and the smaller is embedded as
+    a data URI. Returns the SVG text, in PDF points like ``get_svg_image``,
+    and the name of the image format used.
+    """
+    zoom = dpi / 72
+    pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    webp = io.BytesIO()
+    image.save(webp, "WEBP", quality=RASTER_WEBP_QUALITY, method=6)
+    image_format, mime_type, data = min(
+        [
+            ("WebP", "image/webp", webp.getvalue()),
+            ("PNG", "image/png", pixmap.tobytes("png")),
+        ],
+        key=lambda candidate: len(candidate[2]),
+    )
+
+    width = f"{page.rect.width:g}"
+    height = f"{page.rect.height:g}"
+    href = f"data:{mime_type};base64,{base64.b64encode(data).decode('ascii')}"
+    svg_text = (
+        '<svg xmlns="http://www.w3.org/2000/svg"'
+        ' xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1"'
+        f' width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<image width="{width}" height="{height}" xlink:href="{href}"/>'
+        "</svg>"
+    )
+    return svg_text, image_format
+
+
+def _raster_stats(svg_text, raster_text, image_format):
+    """Compare a page's SVG and raster versions as they would be served.
+
+    Both are gzipped, as a web server would send them. Returns the sizes
+    when the raster version is smaller, otherwise ``None``.
+    """
+    svg_bytes = len(gzip.compress(svg_text.encode("utf-8")))
+    raster_bytes = len(gzip.compress(raster_text.encode("utf-8")))
+    if raster_bytes >= svg_bytes:
+        return None
+    return {
+        "format": image_format,
+        "svg_bytes": svg_bytes,
+        "raster_bytes": raster_bytes,
+    }
+
+
+def _extract_page_svg(
+    page,
+    pdf_name,
+    page_num,
+    output_dir,
+    precision=2,
+    simplify=None,
+    compact_paths=False,
+    fixed_point=False,
+    raster_dpi=None,
+    report=None,
+    backend="svg",
+    page_background="keep",
+):
+    """Render, optimize and save a single page.
+
+    With ``raster_dpi`` set, the page is also rendered as a bitmap at that
+    resolution and saved that way if it is smaller than the SVG. The time
+    and output size of each stage is recorded in ``report``. The
+    ``"drawings"`` backend writes the SVG from the page's drawing commands,
+    falling back to PyMuPDF's renderer for pages it cannot draw, and can
+    strip the page's background as it goes (see ``PAGE_BACKGROUND_MODES``).
+
+    Returns a ``(output_file, manifest_entry, simplify_stats, raster_stats)``
+    tuple, or ``None`` when the page produced no SVG.
+    """
+    if report is None:
+        report = BuildReport()
+    page_number = page_num + 1
+    drawn = None
+    if backend == "drawings":
+        drawn = _draw_page_svg(
+            page,
+            precision,
+            simplify,
+            fixed_point,
+            page_background,
+            report,
+            pdf_name,
+            page_number,
+        )
+    if drawn is not None:
+        svg_text, simplify_stats = drawn
+    else:
+        svg_text, simplify_stats = _render_page_svg(
+            page, simplify, page_background, report, pdf_name, page_number
+        )
+
+    # Optimize SVG by reducing coordinate precision
+    if svg_text and drawn is None:
+        with report.stage("precision", pdf_name, page_number, len(svg_text)) as record:
+            svg_text = optimize_svg_precision(
+                svg_text,
+                precision=precision,
+                compact_paths=compact_paths,
+                fixed_point=fixed_point,
+            )
+            record["bytes_out"] = len(svg_text)
+
+    if not svg_text:
+        return None
+
+    raster_stats = None
+    if raster_dpi:
+        with report.stage("raster", pdf_name, page_number, len(svg_text)) as record:
+            raster_text, image_format = _raster_page_svg(page, raster_dpi)
+            raster_text = optimize_svg_precision(
+                raster_text, precision=precision, fixed_point=fixed_point
+            )
+            raster_stats = _raster_stats(svg_text, raster_text, image_format)
+            if raster_stats:
+                svg_text = raster_text
+            record["bytes_out"] = len(svg_text)
+
+    hyperlinks = _page_hyperlinks(page, 10**precision if fixed_point else 1)
+    file_name = f"{pdf_name}_page_{page_number}.svg"
+    with report.stage("write", pdf_name, page_number) as record:
+        output_file = _write_page_svg(output_dir, file_name, svg_text)
+        entry = page_entry(page, page_number, file_name, svg_text, hyperlinks)
+        record["bytes_out"] = entry["bytes"]
+    return output_file, entry, simplify_stats, raster_stats
+
+
+def _extract_page_worker(
+    pdf_path,
+    page_num,
+    output_dir,
+    precision,
+    simplify,
+    compact_paths,
+    fixed_point,
+    raster_dpi,
+    backend,
+    page_background,
+):
+    """Process pool entry point: open a private document and extract one page.
+
+    Returns the page's result together with its build report records.
+    """
+    report = BuildReport()
+    doc = fitz.open(pdf_path)
+    try:
+        result = _extract_page_svg(
+            doc[page_num],
+            Path(pdf_path).stem,
+            page_num,
+            Path(output_dir),
+            precision,
+            simplify,
+            compact_paths,
+            fixed_point,
+            raster_dpi,
+            report,
+            backend,
+            page_background,
+        )
+    finally:
+        doc.close()
+    return result, report.records
+
+
+def _report_page(result):
+    """Print the progress line for an extracted page."""
+    output_file, entry, simplify_stats, raster_stats = result
+    link_count = len(entry["links"])
+    if link_count:
+        print(f"Extracted SVG with {link_count} hyperlinks: {output_file}")
+    else:
+        print(f"Extracted SVG: {output_file}")
+    if simplify_stats and simplify_stats["paths"]:
+        saved = simplify_stats["bytes_before"] - simplify_stats["bytes_after"]
+        print(
+            f"  Simplified {simplify_stats['paths']} stroke paths, "
+            f"saving {saved} bytes of path data"
+        )
+    if raster_stats:
+        print(
+            f"  Rasterized as {raster_stats['format']}: "
+            f"{raster_stats['raster_bytes']} bytes gzipped instead of "
+            f"{raster_stats['svg_bytes']} bytes of SVG"
+        )
 
 
 class PDFSVGExtractor:
-    def __init__(self, pdf_dir="./pdfs", output_dir="output/svg"):
+    def __init__(
+        self,
+        pdf_dir="./pdfs",
+        output_dir="output/svg",
+        jobs=1,
+        precision=2,
+        use_cache=True,
+        simplify=None,
+        compact_paths=True,
+        fixed_point=False,
+        raster_dpi=None,
+        report=None,
+        backend="svg",
+        page_background="keep",
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown extraction backend: {backend}")
+        if page_background not in PAGE_BACKGROUND_MODES:
+            raise ValueError(f"Unknown page background mode: {page_background}")
         self.pdf_dir = Path(pdf_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Number of worker processes; 0 or None means one per CPU
+        self.jobs = jobs or os.cpu_count() or 1
+        self.precision = precision
+        self.use_cache = use_cache
+        # Stroke simplification tolerance in PDF points; None leaves paths as is
+        self.simplify = simplify
+        # Rewrite path data in its shortest form while rounding
+        self.compact_paths = compact_paths
+        # Write integer coordinates in units of 10 ** -precision points
+        self.fixed_point = fixed_point
+        # Resolution for raster pages, used where smaller than SVG; None: never
+        self.raster_dpi = raster_dpi
+        # "drawings" writes pages from their drawing commands; see BACKENDS
+        self.backend = backend
+        # Strip full-page fills and ruled templates; see PAGE_BACKGROUND_MODES
+        self.page_background = page_background
+        # Time and size of each stage, shared with the HTML generator in a pipeline
+        self.report = report if report is not None else BuildReport()
+
+    @property
+    def link_scale(self):
+        """Factor from PDF points to the page SVG's coordinate space."""
+        return 10**self.precision if self.fixed_point else 1
 
     def extract_svg_from_pdf(self, pdf_path, page_range=None):
-        """Extract SVG content from PDF pages with hyperlink metadata."""
+        """Extract SVG content from PDF pages with hyperlink metadata.
+
+        Each page is written to its own SVG file, and the pages' sizes,
+        hashes and links to one page manifest for the PDF.
+        """
         doc = fitz.open(pdf_path)
         pdf_name = Path(pdf_path).stem
-        extracted_files = []
 
         pages = range(len(doc)) if page_range is None else page_range
 
+        if self.jobs > 1 and len(pages) > 1:
+            doc.close()
+            results = self._extract_parallel([(pdf_path, page) for page in pages])
+            return self._finish_pdf(pdf_name, results)
+
+        results = []
         for page_num in pages:
-            page = doc[page_num]
-            svg_text = page.get_svg_image()
-
-            # Optimize SVG by reducing coordinate precision
-            if svg_text:
-                svg_text = optimize_svg_precision(svg_text, precision=2)
-
-            if svg_text:
-                # Extract hyperlinks from this page
-                links = page.get_links()
-                hyperlinks = []
-                for link in links:
-                    if link["kind"] == 2:  # URI link
-                        hyperlinks.append(
-                            {
-                                "uri": link["uri"],
-                                "bbox": {
-                                    "x": link["from"].x0,
-                                    "y": link["from"].y0,
-                                    "width": link["from"].width,
-                                    "height": link["from"].height,
-                                },
-                            }
-                        )
+            result = _extract_page_svg(
+                doc[page_num],
+                pdf_name,
+                page_num,
+                self.output_dir,
+                self.precision,
+                self.simplify,
+                self.compact_paths,
+                self.fixed_point,
+                self.raster_dpi,
+                self.report,
+                self.backend,
+                self.page_background,
+            )
+            if result:
+                _report_page(result)
+            results.append(result)
 
-                # Save SVG file
-                output_file = self.output_dir / f"{pdf_name}_page_{page_num + 1}.svg"
-                with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(svg_text)
-                extracted_files.append(output_file)
+        doc.close()
+        return self._finish_pdf(pdf_name, results)
+
+    def _finish_pdf(self, pdf_name, results):
+        """Write a PDF's page manifest and return its extracted SVG files."""
+        results = [result for result in results if result]
+        write_manifest(self.output_dir, pdf_name, [entry for _, entry, *_ in results])
+        return [output_file for output_file, *_ in results]
+
+    def render_pages(self, pdf_path, page_range=None, write_debug=False):
+        """Yield an ``SVGPage`` for every non-empty page of a PDF.
+
+        Each page's SVG is parsed once and rounded in place; nothing is
+        written to disk unless ``write_debug`` is set, in which case the
+        usual page SVG files and page manifest go to the output directory.
+        Pages are rendered lazily as the caller consumes them.
+        """
+        doc = fitz.open(pdf_path)
+        pdf_name = Path(pdf_path).stem
+        pages = range(len(doc)) if page_range is None else page_range
+        debug_results = []
 
-                # Save hyperlink metadata if any links found
-                if hyperlinks:
-                    metadata_file = (
-                        self.output_dir / f"{pdf_name}_page_{page_num + 1}_links.json"
-                    )
-                    with open(metadata_file, "w", encoding="utf-8") as f:
-                        json.dump(hyperlinks, f, indent=2)
-                    print(
-                        f"Extracted SVG with {len(hyperlinks)} hyperlinks: "
-                        f"{output_file}"
+        try:
+            for page_num in pages:
+                page = doc[page_num]
+                page_number = page_num + 1
+                drawn = None
+                if self.backend == "drawings":
+                    drawn = _draw_page_svg(
+                        page,
+                        self.precision,
+                        self.simplify,
+                        self.fixed_point,
+                        self.page_background,
+                        self.report,
+                        pdf_name,
+                        page_number,
                     )
+                if drawn is not None:
+                    svg_text, simplify_stats = drawn
+                    # Already rounded as it was written; only the parse is left
+                    with self.report.stage("precision", pdf_name, page_number):
+                        soup = bs4.BeautifulSoup(svg_text, "xml")
                 else:
-                    print(f"Extracted SVG: {output_file}")
+                    svg_text, simplify_stats = _render_page_svg(
+                        page,
+                        self.simplify,
+                        self.page_background,
+                        self.report,
+                        pdf_name,
+                        page_number,
+                    )
+                    if not svg_text:
+                        continue
+
+                    with self.report.stage(
+                        "precision", pdf_name, page_number, len(svg_text)
+                    ):
+                        soup = bs4.BeautifulSoup(svg_text, "xml")
+                        optimize_tree_precision(
+                            soup,
+                            precision=self.precision,
+                            compact_paths=self.compact_paths,
+                            fixed_point=self.fixed_point,
+                        )
 
-        doc.close()
-        return extracted_files
+                raster_stats = None
+                if self.raster_dpi:
+                    with self.report.stage("raster", pdf_name, page_number):
+                        raster_text, image_format = _raster_page_svg(
+                            page, self.raster_dpi
+                        )
+                        raster_soup = bs4.BeautifulSoup(raster_text, "xml")
+                        optimize_tree_precision(
+                            raster_soup,
+                            precision=self.precision,
+                            fixed_point=self.fixed_point,
+                        )
+                        raster_stats = _raster_stats(
+                            str(soup), str(raster_soup), image_format
+                        )
+                        if raster_stats:
+                            soup = raster_soup
 
-    def extract_all_pdfs(self):
-        """Extract SVG from all PDFs in the PDF directory."""
+                hyperlinks = _page_hyperlinks(page, self.link_scale)
+                svg_page = SVGPage(pdf_name, page_number, soup, hyperlinks)
+
+                if write_debug:
+                    svg_text = str(soup)
+                    output_file = _write_page_svg(
+                        self.output_dir, svg_page.file_name, svg_text
+                    )
+                    entry = page_entry(
+                        page, page_number, svg_page.file_name, svg_text, hyperlinks
+                    )
+                    result = (output_file, entry, simplify_stats, raster_stats)
+                    _report_page(result)
+                    debug_results.append(result)
+
+                yield svg_page
+        finally:
+            doc.close()
+        if write_debug:
+            self._finish_pdf(pdf_name, debug_results)
+
+    def _extract_parallel(self, tasks):
+        """Extract ``(pdf_path, page_num)`` tasks across a process pool.
+
+        Returns one result per task. Results are collected in task order, so
+        output files and progress lines are deterministic regardless of which
+        worker finishes first.
+        """
+        results = []
+        workers = min(self.jobs, len(tasks))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _extract_page_worker,
+                    str(pdf_path),
+                    page_num,
+                    str(self.output_dir),
+                    self.precision,
+                    self.simplify,
+                    self.compact_paths,
+                    self.fixed_point,
+                    self.raster_dpi,
+                    self.backend,
+                    self.page_background,
+                )
+                for pdf_path, page_num in tasks
+            ]
+            for future in futures:
+                result, records = future.result()
+                self.report.extend(records)
+                if result:
+                    _report_page(result)
+                results.append(result)
+        return results
+
+    def _extract_pdfs(self, pdf_files):
+        """Extract every page of ``pdf_files``, returning SVG files per PDF."""
+        if self.jobs <= 1:
+            extracted = {}
+            for pdf_file in pdf_files:
+                print(f"Processing {pdf_file.name}")
+                extracted[pdf_file] = self.extract_svg_from_pdf(pdf_file)
+            return extracted
+
+        # Fan out every page of every PDF across a single pool
+        tasks = []
+        for pdf_file in pdf_files:
+            doc = fitz.open(pdf_file)
+            page_count = len(doc)
+            doc.close()
+            print(f"Processing {pdf_file.name} ({page_count} pages)")
+            tasks.extend((pdf_file, page_num) for page_num in range(page_count))
+
+        results = {pdf_file: [] for pdf_file in pdf_files}
+        if tasks:
+            for (pdf_file, _), result in zip(tasks, self._extract_parallel(tasks)):
+                results[pdf_file].append(result)
+        return {
+            pdf_file: self._finish_pdf(pdf_file.stem, results[pdf_file])
+            for pdf_file in pdf_files
+        }
+
+    def write_report(self):
+        """Write the build report beside the SVG files and print its summary."""
+        if not self.report.records:
+            return
+        self.report.write(self.output_dir / REPORT_FILE)
+        print(self.report.summary())
+
+    def extract_all_pdfs(self, only=None):
+        """Extract SVG from all PDFs in the PDF directory.
+
+        PDFs whose content and precision setting match the build cache are
+        skipped and their previous output reused. Pass ``only`` to extract
+        just those PDFs.
+        """
         if not self.pdf_dir.exists():
             print(f"Error: PDF directory '{self.pdf_dir.resolve()}' does not exist.")
             print("Please create the directory and add PDF files to it.")
             return []
 
-        pdf_files = list(self.pdf_dir.glob("*.pdf"))
+        pdf_files = sorted(self.pdf_dir.glob("*.pdf"))
+        if only is not None:
+            pdf_files = [pdf_file for pdf_file in pdf_files if pdf_file in only]
         if not pdf_files:
             print(f"Error: No PDF files found in '{self.pdf_dir.resolve()}'.")
             print("Please add PDF files to the directory.")
@@ -166,17 +624,123 @@ class PDFSVGExtractor:
 
         print(f"Found {len(pdf_files)} PDF file(s) in '{self.pdf_dir.resolve()}'")
 
-        all_extracted = []
-        for pdf_file in pdf_files:
-            print(f"Processing {pdf_file.name}")
-            extracted = self.extract_svg_from_pdf(pdf_file)
-            all_extracted.extend(extracted)
-
-        return all_extracted
+        if not self.use_cache:
+            extracted = self._extract_pdfs(pdf_files)
+            self.write_report()
+            return [svg for pdf_file in pdf_files for svg in extracted[pdf_file]]
 
-
-def main():
-    extractor = PDFSVGExtractor()
+        cache = BuildCache(self.output_dir / CACHE_MANIFEST)
+        extracted = {}
+        stale = {}
+        for pdf_file in pdf_files:
+            key_fingerprint = fingerprint(
+                hash_file(pdf_file),
+                self.precision,
+                self.simplify,
+                self.compact_paths,
+                self.fixed_point,
+                self.raster_dpi,
+                self.backend,
+                self.page_background,
+            )
+            cached = cache.lookup(pdf_file.name, key_fingerprint)
+            if cached is not None:
+                print(f"Up to date: {pdf_file.name}")
+                extracted[pdf_file] = [path for path in cached if path.suffix == ".svg"]
+                continue
+
+            # Remove the previous build's pages so shrunken PDFs leave no strays
+            for old_output in cache.previous_outputs(pdf_file.name):
+                if old_output.exists():
+                    old_output.unlink()
+            stale[pdf_file] = key_fingerprint
+
+        extracted.update(self._extract_pdfs(list(stale)))
+        for pdf_file, key_fingerprint in stale.items():
+            outputs = list(extracted[pdf_file])
+            page_manifest = manifest_path(self.output_dir, pdf_file.stem)
+            if page_manifest.exists():
+                outputs.append(page_manifest)
+            cache.store(pdf_file.name, key_fingerprint, outputs)
+        cache.save()
+
+        print(cache.summary("Extraction"))
+        self.write_report()
+        return [svg for pdf_file in pdf_files for svg in extracted[pdf_file]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract SVG pages from PDFs.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=2,
+        help="decimal places kept in SVG coordinates (default: 2)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore the build cache and re-extract every PDF",
+    )
+    parser.add_argument(
+        "--simplify",
+        type=float,
+        metavar="TOLERANCE",
+        help="simplify handwriting strokes, moving them at most TOLERANCE points",
+    )
+    parser.add_argument(
+        "--no-compact-paths",
+        dest="compact_paths",
+        action="store_false",
+        help="only round path data instead of rewriting it in its shortest form",
+    )
+    parser.add_argument(
+        "--fixed-point",
+        action="store_true",
+        help="write integer coordinates scaled by 10^precision, with a matching "
+        "viewBox and link boxes",
+    )
+    parser.add_argument(
+        "--raster-dpi",
+        type=float,
+        metavar="DPI",
+        help="also render each page as a bitmap at DPI, and use it instead of "
+        "the SVG when it is smaller",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="svg",
+        help="write pages with PyMuPDF's SVG renderer, or straight from their "
+        "drawing commands (default: svg)",
+    )
+    parser.add_argument(
+        "--page-background",
+        choices=PAGE_BACKGROUND_MODES,
+        default="keep",
+        help="strip full-page fills and ruled templates, or strip them and "
+        "paint the page colour with CSS (default: keep)",
+    )
+    args = parser.parse_args(argv)
+
+    extractor = PDFSVGExtractor(
+        jobs=args.jobs,
+        precision=args.precision,
+        use_cache=not args.force,
+        simplify=args.simplify,
+        compact_paths=args.compact_paths,
+        fixed_point=args.fixed_point,
+        raster_dpi=args.raster_dpi,
+        backend=args.backend,
+        page_background=args.page_background,
+    )
     extracted_files = extractor.extract_all_pdfs()
     print(f"Extracted {len(extracted_files)} SVG files")
 
@@ -0,0 +1,224 @@
+from collections import defaultdict
+
+from src.html_gen.spatial_index import transform_bbox
+from src.lazy_import import lazy_import
+from src.path_geometry import IDENTITY, multiply, parse_transform, path_geometry
+from src.pdf_tools.drawings import read_page_drawing
+
+etree = lazy_import("lxml.etree")
+
+# How a page's background is written: as drawn, stripped, or stripped with
+# the page's fill colour moved to a CSS background on its <svg>
+PAGE_BACKGROUND_MODES = ("keep", "strip", "css")
+# Points a fill may fall short of the page edge and still count as full-page
+PAGE_EDGE_TOLERANCE = 1.0
+# Fewest evenly spaced rules of one style that make a ruled template
+MIN_RULES = 4
+# Shortest rule, as a fraction of the page's width (or height, for columns)
+MIN_RULE_SPAN = 0.5
+# How far the gaps between neighbouring rules may differ, relative to the
+# median gap
+RULE_SPACING_TOLERANCE = 0.05
+# Points a rendered path's box may differ from its drawing item's
+RENDERED_BOUNDS_TOLERANCE = 0.5
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+# Elements a renderer paints with; a page fill must come before all of them
+PAINTED_ELEMENTS = frozenset(
+    SVG_NAMESPACE + name for name in ["path", "use", "image", "text", "rect"]
+)
+# Containers whose contents are only painted where they are referenced
+UNPAINTED_CONTAINERS = frozenset(
+    SVG_NAMESPACE + name
+    for name in ["defs", "clipPath", "mask", "pattern", "marker", "symbol"]
+)
+
+
+def _page_rectangle(path, width, height):
+    """True if a path is an unclipped, opaque fill of the whole page."""
+    style = dict(path.style)
+    if style["fill"] == "none" or "fill-opacity" in style or path.clip is not None:
+        return False
+    if len(path.subpaths) != 1:
+        return False
+    subpath = path.subpaths[0]
+    points = [subpath["start"]] + [segment[-2:] for segment in subpath["segments"]]
+    if any(kind != "L" for kind, *_ in subpath["segments"]) or len(points) > 5:
+        return False
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    tolerance = PAGE_EDGE_TOLERANCE
+    return (
+        min(xs) <= tolerance
+        and min(ys) <= tolerance
+        and max(xs) >= width - tolerance
+        and max(ys) >= height - tolerance
+        # Every corner on the page edge: a rectangle, not a shape reaching it
+        and all(x <= tolerance or x >= width - tolerance for x in xs)
+        and all(y <= tolerance or y >= height - tolerance for y in ys)
+    )
+
+
+def _rule_positions(path, width, height):
+    """Return the orientation and positions of a path made only of rules.
+
+    A rule is a straight horizontal or vertical stroke across at least
+    ``MIN_RULE_SPAN`` of the page. Returns ``None`` for any other path.
+    """
+    if not path.is_stroke:
+        return None
+    orientation = None
+    positions = []
+    for subpath in path.subpaths:
+        if len(subpath["segments"]) != 1 or subpath["segments"][0][0] != "L":
+            return None
+        (x0, y0), (_, x1, y1) = subpath["start"], subpath["segments"][0]
+        if abs(y1 - y0) < 0.01 and abs(x1 - x0) >= MIN_RULE_SPAN * width:
+            kind, position = "horizontal", y0
+        elif abs(x1 - x0) < 0.01 and abs(y1 - y0) >= MIN_RULE_SPAN * height:
+            kind, position = "vertical", x0
+        else:
+            return None
+        if orientation not in (None, kind):
+            return None
+        orientation = kind
+        positions.append(round(position, 2))
+    return orientation, positions
+
+
+def _evenly_spaced(positions):
+    positions = sorted(set(positions))
+    if len(positions) < MIN_RULES:
+        return False
+    gaps = sorted(b - a for a, b in zip(positions, positions[1:]))
+    median = gaps[len(gaps) // 2]
+    return gaps[-1] - gaps[0] <= RULE_SPACING_TOLERANCE * median
+
+
+def find_page_background(drawing):
+    """Find the paths of a ``PageDrawing`` that only paint the paper.
+
+    These are full-page fills painted before anything else, measured
+    against the page's real size, and ruled-paper templates: at least
+    ``MIN_RULES`` evenly spaced page-wide lines of one style. Returns the
+    background paths and the colour of the topmost full-page fill, or
+    ``None`` if there is none.
+    """
+    background = []
+    color = None
+    for path in drawing.paths:
+        if not _page_rectangle(path, drawing.width, drawing.height):
+            break
+        background.append(path)
+        color = dict(path.style)["fill"]
+
+    # Rules of each style and orientation, with every position they draw at
+    rule_groups = defaultdict(lambda: ([], []))
+    for path in drawing.paths[len(background) :]:
+        rules = _rule_positions(path, drawing.width, drawing.height)
+        if rules is not None:
+            orientation, positions = rules
+            paths, group_positions = rule_groups[path.style, path.clip, orientation]
+            paths.append(path)
+            group_positions.extend(positions)
+    for paths, positions in rule_groups.values():
+        if _evenly_spaced(positions):
+            background.extend(paths)
+    return background, color
+
+
+def strip_page_background(drawing, css=False):
+    """Remove a drawing's background paths, returning how many there were.
+
+    With ``css``, the colour of the page's fill is kept as the drawing's
+    ``background``, to be painted with CSS behind the page instead.
+    """
+    background, color = find_page_background(drawing)
+    if background:
+        stripped = set(map(id, background))
+        drawing.paths = [path for path in drawing.paths if id(path) not in stripped]
+    if css:
+        drawing.background = color
+    return len(background)
+
+
+def _rendered_bounds(element):
+    """Return the page box an SVG element's path data paints in, or ``None``."""
+    bounds = path_geometry(element.get("d")).bounds()
+    matrix = IDENTITY
+    for node in [element, *element.iterancestors()]:
+        transform = parse_transform(node.get("transform"))
+        if transform is None:
+            return None
+        matrix = multiply(transform, matrix)
+    return None if bounds is None else transform_bbox(bounds, matrix)
+
+
+def _renders(element, path):
+    """True if a rendered ``<path>`` paints the same way and box as a path."""
+    if element.tag != SVG_NAMESPACE + "path":
+        return False
+    style = dict(path.style)
+    if (element.get("fill", "black") != "none") != (style["fill"] != "none"):
+        return False
+    if (element.get("stroke", "none") != "none") != ("stroke" in style):
+        return False
+    bounds = _rendered_bounds(element)
+    if bounds is None:
+        return False
+    rendered = (bounds["x1"], bounds["y1"], bounds["x2"], bounds["y2"])
+    return all(
+        abs(a - b) <= RENDERED_BOUNDS_TOLERANCE for a, b in zip(rendered, path.bounds)
+    )
+
+
+def strip_rendered_background(svg_text, page, css=False):
+    """Remove a page's background from its SVG as rendered by PyMuPDF.
+
+    The background is found in the page's drawing list as
+    ``strip_page_background`` finds it, even on pages with text or images,
+    and each background path is matched to the rendered ``<path>`` painting
+    the same box the same way. A full-page fill is only removed if nothing
+    is painted before it, text and images included. With ``css``, the fill's
+    colour is set as a CSS background on the ``<svg>``. Returns the new SVG
+    text and how many paths were removed.
+    """
+    drawing = read_page_drawing(page, complete=False)
+    if drawing is None:
+        return svg_text, 0
+    background, color = find_page_background(drawing)
+    if not background:
+        return svg_text, 0
+    try:
+        root = etree.fromstring(
+            svg_text.encode("utf-8"), etree.XMLParser(huge_tree=True)
+        )
+    except etree.XMLSyntaxError:
+        return svg_text, 0
+
+    painted = [
+        element
+        for element in root.iter(*PAINTED_ELEMENTS)
+        if not any(
+            ancestor.tag in UNPAINTED_CONTAINERS for ancestor in element.iterancestors()
+        )
+    ]
+    removed = 0
+    fill_removed = False
+    for path in background:
+        # Page fills lead the drawing, so each must be the first thing painted
+        candidates = painted if path.is_stroke else painted[:1]
+        for element in candidates:
+            if _renders(element, path):
+                element.getparent().remove(element)
+                painted.remove(element)
+                removed += 1
+                fill_removed = fill_removed or not path.is_stroke
+                break
+
+    if not removed:
+        return svg_text, 0
+    if css and fill_removed and color:
+        style = root.get("style")
+        declaration = f"background-color:{color}"
+        root.set("style", f"{style};{declaration}" if style else declaration)
+    return etree.tostring(root, encoding="unicode"), removed
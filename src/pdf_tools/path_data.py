@@ -0,0 +1,279 @@
+from src.path_geometry import ARGUMENT_COUNTS, PATH_TOKEN
+
+
+class _PathSyntaxError(ValueError):
+    def __init__(self, message, segments):
+        super().__init__(message)
+        # Segments that parsed cleanly before the error
+        self.segments = segments
+
+
+def _format_number(value, precision):
+    """Format a number as briefly as possible: ``-0.50`` becomes ``-.5``."""
+    text = "%.*f" % (precision, value)
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text in ("", "-0"):
+        return "0"
+    if text.startswith("0."):
+        return text[1:]
+    if text.startswith("-0."):
+        return "-" + text[2:]
+    return text
+
+
+def _parse_segments(path_d):
+    """Resolve path data into ``(command, absolute_arguments)`` segments.
+
+    Commands are upper case, H and V become L, and S and T carry their
+    reflected first control point. Arc arguments keep their radii and flags,
+    with the end point made absolute. Raises ``_PathSyntaxError`` for data
+    that does not parse cleanly.
+    """
+    tokens = PATH_TOKEN.findall(path_d)
+    segments = []
+    x = y = start_x = start_y = 0.0
+    # Last control point of the previous segment, for S and T reflection
+    last_cubic = last_quadratic = None
+
+    index = 0
+    while index < len(tokens):
+        command, _ = tokens[index]
+        index += 1
+        if not command:
+            raise _PathSyntaxError("numbers before the first command", segments)
+        upper = command.upper()
+        relative = command != upper
+
+        if upper == "Z":
+            segments.append(("Z", ()))
+            x, y = start_x, start_y
+            last_cubic = last_quadratic = None
+            continue
+
+        count = ARGUMENT_COUNTS[upper]
+        repeated = False
+        while index < len(tokens) and not tokens[index][0]:
+            arguments = tokens[index : index + count]
+            if len(arguments) < count or any(letter for letter, _ in arguments):
+                raise _PathSyntaxError("incomplete arguments", segments)
+            args = [float(number) for _, number in arguments]
+            index += count
+            offset_x, offset_y = (x, y) if relative else (0.0, 0.0)
+
+            if upper == "H":
+                args = [args[0] + offset_x, y]
+            elif upper == "V":
+                args = [x, args[0] + offset_y]
+            elif upper == "A":
+                args[5] += offset_x
+                args[6] += offset_y
+            else:
+                args = [
+                    value + (offset_x if i % 2 == 0 else offset_y)
+                    for i, value in enumerate(args)
+                ]
+
+            segment = "L" if upper in "HV" or (upper == "M" and repeated) else upper
+            if segment == "S":
+                reflected = last_cubic or (x, y)
+                args = [2 * x - reflected[0], 2 * y - reflected[1]] + args
+                segment = "C"
+            elif segment == "T":
+                reflected = last_quadratic or (x, y)
+                args = [2 * x - reflected[0], 2 * y - reflected[1]] + args
+                segment = "Q"
+            segments.append((segment, args))
+
+            last_cubic = (args[2], args[3]) if segment == "C" else None
+            last_quadratic = (args[0], args[1]) if segment == "Q" else None
+            x, y = args[-2], args[-1]
+            if segment == "M":
+                start_x, start_y = x, y
+            repeated = True
+
+        if not repeated:
+            raise _PathSyntaxError(f"{command} without arguments", segments)
+
+    return segments
+
+
+class _PathWriter:
+    """Accumulate compacted path data, choosing the shortest spelling."""
+
+    def __init__(self, precision):
+        self.precision = precision
+        self.parts = []
+        # Command a bare list of numbers would continue with
+        self.implied = None
+        self.last_number = None
+        self.x = self.y = 0.0
+
+    def _spell(self, command, numbers):
+        """Return the text ``command`` with ``numbers`` adds after the output."""
+        text = [] if command == self.implied else [command]
+        previous = None if text else self.last_number
+        for number in numbers:
+            if previous is not None and not (
+                number[0] == "-" or (number[0] == "." and "." in previous)
+            ):
+                text.append(" ")
+            text.append(number)
+            previous = number
+        return "".join(text)
+
+    def _emit(self, command, numbers):
+        self.parts.append(self._spell(command, numbers))
+        self.last_number = numbers[-1] if numbers else None
+        if command in "Mm":
+            self.implied = "L" if command == "M" else "l"
+        else:
+            self.implied = command
+
+    def _numbers(self, values, relative_to=None):
+        precision = self.precision
+        if relative_to is None:
+            return [_format_number(value, precision) for value in values]
+        origin_x, origin_y = relative_to
+        return [
+            _format_number(value - (origin_x if i % 2 == 0 else origin_y), precision)
+            for i, value in enumerate(values)
+        ]
+
+    def write(self, command, coordinates, extra=()):
+        """Write a segment, absolute or relative to the current point.
+
+        ``coordinates`` are rounded absolute x, y pairs; ``extra`` are arc
+        parameters written before them unchanged.
+        """
+        extra = [_format_number(value, self.precision) for value in extra]
+        candidates = [
+            (command, extra + self._numbers(coordinates)),
+            (command.lower(), extra + self._numbers(coordinates, (self.x, self.y))),
+        ]
+        if command == "L":
+            x, y = coordinates
+            if y == self.y:
+                candidates.append(("H", self._numbers([x])))
+                candidates.append(("h", self._numbers([x], (self.x, 0.0))))
+            elif x == self.x:
+                candidates.append(("V", self._numbers([y])))
+                candidates.append(("v", [_format_number(y - self.y, self.precision)]))
+        self._emit(*min(candidates, key=lambda c: len(self._spell(*c))))
+        self.x, self.y = coordinates[-2], coordinates[-1]
+
+    def close(self, start):
+        self._emit("z", [])
+        self.x, self.y = start
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
+def compact_path_data(path_d, precision=2, scale=1):
+    """Rewrite path data in its shortest equivalent form.
+
+    Coordinates are rounded to ``precision`` decimal places, then each
+    segment is written absolute or relative, whichever is shorter, with H/V
+    for axis-aligned lines and S/T where a control point is a reflection.
+    Repeated command letters, leading zeros and separators a parser does
+    not need are dropped, and zero-length segments are removed unless they
+    are all that draws a subpath (a dot with round caps). Relative values
+    are taken between rounded absolute points, so errors never accumulate.
+
+    Coordinates are multiplied by ``scale`` before rounding. Returns ``None``
+    for data that does not parse, unless it is being scaled: then the part
+    before the error, which is all a renderer draws, is kept.
+    """
+    try:
+        segments = _parse_segments(path_d)
+    except _PathSyntaxError as error:
+        if scale == 1:
+            return None
+        segments = error.segments
+    return _compact_segments(segments, precision, scale)
+
+
+def compact_subpaths(subpaths, precision=2, scale=1):
+    """Write subpaths as compact path data, as ``compact_path_data`` would.
+
+    ``subpaths`` are dicts with a ``start`` point, a list of ``("L", x, y)``
+    and ``("C", x1, y1, x2, y2, x, y)`` ``segments`` and a ``closed`` flag,
+    as the stroke simplifier and the drawing reader hold them, so geometry
+    that never was path data is written without formatting and parsing it.
+    """
+    segments = []
+    for subpath in subpaths:
+        segments.append(("M", subpath["start"]))
+        segments.extend((kind, values) for kind, *values in subpath["segments"])
+        if subpath["closed"]:
+            segments.append(("Z", ()))
+    return _compact_segments(segments, precision, scale)
+
+
+def _compact_segments(segments, precision, scale):
+    """Write parsed ``(command, absolute_arguments)`` segments compactly."""
+    writer = _PathWriter(precision)
+    start = (0.0, 0.0)
+    # Whether the current subpath has drawn, or skipped, a segment
+    drawn = skipped = False
+    last_cubic = last_quadratic = None
+
+    def finish_subpath():
+        if skipped and not drawn:
+            writer.write("L", [writer.x, writer.y])
+
+    for command, args in segments:
+        if command == "Z":
+            finish_subpath()
+            writer.close(start)
+            drawn = skipped = False
+            last_cubic = last_quadratic = None
+            continue
+
+        if command == "A":
+            extra = [round(value * scale, precision) for value in args[:2]]
+            extra += [round(args[2], precision)]
+            extra += [1.0 if args[3] else 0.0, 1.0 if args[4] else 0.0]
+            coordinates = [round(value * scale, precision) for value in args[5:]]
+        else:
+            extra = []
+            coordinates = [round(value * scale, precision) for value in args]
+
+        current = (writer.x, writer.y)
+        if command == "M":
+            finish_subpath()
+            writer.write("M", coordinates)
+            start = (writer.x, writer.y)
+            drawn = skipped = False
+            last_cubic = last_quadratic = None
+            continue
+
+        if all(value == current[i % 2] for i, value in enumerate(coordinates)):
+            # A reader reflects the last segment written, so the skipped
+            # segment leaves the reflection state as it was
+            skipped = True
+            continue
+
+        reflected = None
+        if command == "C":
+            reflected = last_cubic or current
+        elif command == "Q":
+            reflected = last_quadratic or current
+        smooth = reflected is not None and (
+            round(2 * current[0] - reflected[0], precision) == coordinates[0]
+            and round(2 * current[1] - reflected[1], precision) == coordinates[1]
+        )
+
+        if command == "C" and smooth:
+            writer.write("S", coordinates[2:])
+        elif command == "Q" and smooth:
+            writer.write("T", coordinates[2:])
+        else:
+            writer.write(command, coordinates, extra)
+        drawn = True
+        last_cubic = tuple(coordinates[2:4]) if command == "C" else None
+        last_quadratic = tuple(coordinates[0:2]) if command == "Q" else None
+
+    finish_subpath()
+    return writer.getvalue()
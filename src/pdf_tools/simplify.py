@@ -0,0 +1,439 @@
+import math
+
+import numpy as np
+from lxml import etree
+
+from src.path_geometry import IDENTITY, PATH_TOKEN, multiply, parse_transform
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+# Containers whose paths are used for clipping or reuse, never painted as is
+UNPAINTED_CONTAINERS = frozenset(
+    SVG_NAMESPACE + name
+    for name in ["defs", "clipPath", "mask", "pattern", "marker", "symbol"]
+)
+# Parameters at which original curves are sampled when checking a merged fit
+SAMPLE_STEPS = np.arange(8) / 8
+# Upper bound on how many curve segments are merged into one
+MAX_MERGED_CURVES = 64
+# Fit and reparameterize rounds before a merge is given up
+FIT_ITERATIONS = 10
+# Decimal places written for simplified coordinates, well below any tolerance
+COORDINATE_PRECISION = 3
+
+
+def _number(value):
+    text = ("%.*f" % (COORDINATE_PRECISION, value)).rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def _parse_subpaths(path_d):
+    """Split absolute M/L/C/Z path data into subpaths.
+
+    Each subpath is a dict with its ``start`` point, a list of ``segments``
+    (``("L", x, y)`` or ``("C", x1, y1, x2, y2, x, y)``) and a ``closed``
+    flag. Returns ``None`` for data using any other command, which is left
+    alone rather than risk changing its shape.
+    """
+    tokens = PATH_TOKEN.findall(path_d)
+    subpaths = []
+    current = None
+    command = None
+    index = 0
+    while index < len(tokens):
+        letter = tokens[index][0]
+        if letter:
+            if letter not in "MLCZ":
+                return None
+            command = letter
+            index += 1
+            if command == "Z":
+                if current is None:
+                    return None
+                current["closed"] = True
+                current = None
+                continue
+        elif command in (None, "Z"):
+            return None
+
+        count = 6 if command == "C" else 2
+        arguments = tokens[index : index + count]
+        if len(arguments) < count or any(letter for letter, _ in arguments):
+            return None
+        values = [float(number) for _, number in arguments]
+        index += count
+
+        if command == "M":
+            current = {"start": tuple(values), "segments": [], "closed": False}
+            subpaths.append(current)
+            # Further pairs after a moveto are implicit linetos
+            command = "L"
+        elif current is None:
+            return None
+        else:
+            current["segments"].append((command, *values))
+    return subpaths
+
+
+def _segment_distances(points, start, end):
+    """Distances from each point to the line segment ``start``-``end``."""
+    direction = end - start
+    length_squared = direction @ direction
+    if length_squared == 0:
+        return np.hypot(*(points - start).T)
+    t = np.clip((points - start) @ direction / length_squared, 0.0, 1.0)
+    return np.hypot(*(points - start - t[:, None] * direction).T)
+
+
+def douglas_peucker(points, tolerance):
+    """Return the indices of the polyline vertices kept by Ramer-Douglas-Peucker.
+
+    The simplified polyline stays within ``tolerance`` of every dropped
+    vertex; the first and last vertices are always kept.
+    """
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(
+            points[first + 1 : last], points[first], points[last]
+        )
+        worst = int(np.argmax(distances))
+        if distances[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep).tolist()
+
+
+def _basis(t):
+    """Cubic Bernstein basis at parameters ``t``, one row per parameter."""
+    mt = 1.0 - t
+    return np.stack([mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t], axis=1)
+
+
+SAMPLE_BASIS = _basis(SAMPLE_STEPS)
+HALFWAY_BASIS = _basis(SAMPLE_STEPS + SAMPLE_STEPS[1] / 2)
+
+
+def _unit_tangent(origin, candidates):
+    """Return the first non-degenerate direction from ``origin``, normalized."""
+    for point in candidates:
+        direction = point - origin
+        length = math.hypot(*direction)
+        if length > 1e-9:
+            return direction / length
+    return None
+
+
+def _fit_with_parameters(samples, basis, start_tangent, end_tangent):
+    """Least-squares cubic with fixed ends and tangent directions (Schneider)."""
+    p0, p3 = samples[0], samples[-1]
+    a1 = basis[:, 1:2] * start_tangent
+    a2 = basis[:, 2:3] * end_tangent
+    residual = (
+        samples
+        - (basis[:, 0:1] + basis[:, 1:2]) * p0
+        - (basis[:, 2:3] + basis[:, 3:4]) * p3
+    )
+
+    c00 = (a1 * a1).sum()
+    c01 = (a1 * a2).sum()
+    c11 = (a2 * a2).sum()
+    x0 = (a1 * residual).sum()
+    x1 = (a2 * residual).sum()
+    determinant = c00 * c11 - c01 * c01
+
+    chord = math.hypot(*(p3 - p0))
+    alpha1 = alpha2 = 0.0
+    if abs(determinant) > 1e-12:
+        alpha1 = (x0 * c11 - x1 * c01) / determinant
+        alpha2 = (c00 * x1 - c01 * x0) / determinant
+    if alpha1 < 1e-6 * chord or alpha2 < 1e-6 * chord:
+        # Degenerate solve: fall back to the Wu/Barsky heuristic
+        alpha1 = alpha2 = chord / 3.0
+    return np.array([p0, p0 + alpha1 * start_tangent, p3 + alpha2 * end_tangent, p3])
+
+
+def _reparameterize(control, samples, u, basis):
+    """One Newton-Raphson step moving each parameter to its closest point."""
+    mt = 1.0 - u
+    deltas = np.diff(control, axis=0)
+    first = 3 * (
+        (mt * mt)[:, None] * deltas[0]
+        + (2 * mt * u)[:, None] * deltas[1]
+        + (u * u)[:, None] * deltas[2]
+    )
+    bends = np.diff(deltas, axis=0)
+    second = 6 * (mt[:, None] * bends[0] + u[:, None] * bends[1])
+    offset = basis @ control - samples
+    numerator = (offset * first).sum(axis=1)
+    denominator = (first * first).sum(axis=1) + (offset * second).sum(axis=1)
+    safe = np.abs(denominator) > 1e-12
+    step = np.divide(numerator, denominator, out=np.zeros_like(u), where=safe)
+    return np.clip(u - step, 0.0, 1.0)
+
+
+def _fit_error(control, samples, halfway, basis, u):
+    """Largest distance between a fitted cubic and the sampled original.
+
+    Samples are compared with the fit at their parameters. Between
+    neighbouring samples, the fit's sideways offset from their chord is
+    compared with the original's offset at ``halfway``, which catches
+    bulges the samples alone would miss.
+    """
+    sample_error = np.hypot(*(basis @ control - samples).T).max()
+
+    fitted = _basis((u[:-1] + u[1:]) / 2) @ control
+    starts = samples[:-1]
+    chords = samples[1:] - starts
+    lengths = np.hypot(*chords.T)
+    # Cross products with the chords: the sideways offsets scaled by length
+    difference = fitted - halfway
+    sideways = chords[:, 0] * difference[:, 1] - chords[:, 1] * difference[:, 0]
+    bulge = np.divide(
+        np.abs(sideways),
+        lengths,
+        out=np.zeros_like(lengths),
+        where=lengths > 0,
+    )
+    return max(sample_error, bulge.max())
+
+
+def _refine_fit(samples, halfway, u, start_tangent, end_tangent, tolerance):
+    """Alternate fitting and reparameterizing until the fit is close enough."""
+    previous_error = math.inf
+    basis = _basis(u)
+    for _ in range(FIT_ITERATIONS):
+        control = _fit_with_parameters(samples, basis, start_tangent, end_tangent)
+        u = _reparameterize(control, samples, u, basis)
+        basis = _basis(u)
+        error = _fit_error(control, samples, halfway, basis, u)
+        if error <= tolerance:
+            return control
+        if error > 0.8 * previous_error:
+            # Reparameterizing has stopped helping: this run cannot be merged
+            return None
+        previous_error = error
+    return None
+
+
+def _fit_curves(controls, samples, halfway, first, last, tolerance):
+    """Fit one cubic to ``controls[first:last + 1]``, or ``None`` if too far off.
+
+    ``samples`` and ``halfway`` hold every curve of the run sampled at
+    ``SAMPLE_STEPS`` and halfway between them.
+    """
+    start_tangent = _unit_tangent(controls[first, 0], controls[first, 1:])
+    end_tangent = _unit_tangent(controls[last, 3], controls[last, 2::-1])
+    if start_tangent is None or end_tangent is None:
+        return None
+
+    run_samples = np.concatenate(
+        [samples[first : last + 1].reshape(-1, 2), controls[last, 3:]]
+    )
+    run_halfway = halfway[first : last + 1].reshape(-1, 2)
+    chords = np.hypot(*np.diff(run_samples, axis=0).T)
+    total = chords.sum()
+    if total <= 0:
+        return None
+
+    # Pen strokes are usually drawn at an even pace per segment, so first try
+    # spacing the parameters evenly by segment, then by chord length
+    uniform = np.linspace(0.0, 1.0, len(run_samples))
+    chord_length = np.concatenate([[0.0], np.cumsum(chords) / total])
+    for u in (uniform, chord_length):
+        control = _refine_fit(
+            run_samples, run_halfway, u, start_tangent, end_tangent, tolerance
+        )
+        if control is not None:
+            return control
+    return None
+
+
+def merge_curves(start, curves, tolerance):
+    """Merge runs of consecutive cubic segments into fewer fitted cubics.
+
+    ``curves`` are ``(x1, y1, x2, y2, x, y)`` rows continuing from
+    ``start``. Segment end points where merging stops are kept exactly, and
+    merged curves keep the original end tangents, so joins stay smooth.
+    Returns the replacement list in the same form.
+    """
+    curves = np.asarray(curves, dtype=float).reshape(-1, 3, 2)
+    starts = np.concatenate([np.reshape(start, (1, 2)), curves[:-1, 2]])
+    controls = np.concatenate([starts[:, None], curves], axis=1)
+    samples = SAMPLE_BASIS @ controls
+    halfway = HALFWAY_BASIS @ controls
+
+    merged = []
+    first = 0
+    while first < len(controls):
+        best_last, best_control = first, controls[first]
+        # Grow the run exponentially, then binary search the longest fit
+        step = 1
+        failed = min(len(controls), first + MAX_MERGED_CURVES)
+        while best_last + 1 < failed:
+            last = min(first + step, failed - 1)
+            control = _fit_curves(controls, samples, halfway, first, last, tolerance)
+            if control is None:
+                failed = last
+                break
+            best_last, best_control = last, control
+            step *= 2
+        low, high = best_last + 1, failed - 1
+        while low <= high:
+            middle = (low + high) // 2
+            control = _fit_curves(controls, samples, halfway, first, middle, tolerance)
+            if control is None:
+                high = middle - 1
+            else:
+                best_last, best_control = middle, control
+                low = middle + 1
+
+        merged.append(tuple(best_control[1:].ravel()))
+        first = best_last + 1
+    return merged
+
+
+def _simplify_subpath(subpath, tolerance):
+    """Simplify the line and curve runs of one subpath in place."""
+    segments = subpath["segments"]
+    simplified = []
+    current = subpath["start"]
+    index = 0
+    while index < len(segments):
+        kind = segments[index][0]
+        end = index
+        while end < len(segments) and segments[end][0] == kind:
+            end += 1
+        run = [segment[1:] for segment in segments[index:end]]
+
+        if kind == "L":
+            points = np.array([current] + run)
+            kept = douglas_peucker(points, tolerance)
+            simplified.extend(("L", *points[k]) for k in kept[1:])
+        else:
+            curves = merge_curves(np.array(current), np.array(run), tolerance)
+            simplified.extend(("C", *curve) for curve in curves)
+
+        current = tuple(run[-1][-2:])
+        index = end
+    subpath["segments"] = simplified
+
+
+def _format_subpaths(subpaths):
+    """Write subpaths back as compact absolute path data."""
+    parts = []
+    for subpath in subpaths:
+        parts.append("M" + " ".join(_number(v) for v in subpath["start"]))
+        previous = "L"  # pairs following a moveto are already linetos
+        for kind, *values in subpath["segments"]:
+            numbers = " ".join(_number(v) for v in values)
+            parts.append(f" {numbers}" if kind == previous else f"{kind}{numbers}")
+            previous = kind
+        if subpath["closed"]:
+            parts.append("Z")
+    return "".join(parts)
+
+
+def simplify_subpaths(subpaths, tolerance):
+    """Simplify subpaths in the form ``_parse_subpaths`` returns, in place.
+
+    For geometry read straight from a PDF page, which has no path data to
+    parse. Unlike ``simplify_path_data`` the result is kept even when it
+    would not be shorter; callers compare the written data themselves.
+    """
+    for subpath in subpaths:
+        _simplify_subpath(subpath, tolerance)
+    return subpaths
+
+
+def simplify_path_data(path_d, tolerance):
+    """Simplify absolute path data to within ``tolerance`` user units.
+
+    Straight runs are thinned with Ramer-Douglas-Peucker and curve runs are
+    merged into fewer cubics. Data that cannot be parsed, or that would not
+    get shorter, is returned unchanged.
+    """
+    subpaths = _parse_subpaths(path_d) if path_d else None
+    if not subpaths:
+        return path_d
+    for subpath in subpaths:
+        _simplify_subpath(subpath, tolerance)
+    simplified = _format_subpaths(subpaths)
+    return simplified if len(simplified) < len(path_d) else path_d
+
+
+def _inherited(element, name, default):
+    while element is not None:
+        value = element.get(name)
+        if value is not None:
+            return value
+        element = element.getparent()
+    return default
+
+
+def _is_painted_stroke(path):
+    """True for stroked, unfilled paths outside clip paths and definitions."""
+    if any(ancestor.tag in UNPAINTED_CONTAINERS for ancestor in path.iterancestors()):
+        return False
+    return (
+        _inherited(path, "stroke", "none") != "none"
+        and _inherited(path, "fill", "black") == "none"
+    )
+
+
+def _user_scale(element):
+    """Largest factor by which an element's transforms stretch its coordinates."""
+    matrix = IDENTITY
+    for node in [element, *element.iterancestors()]:
+        transform = parse_transform(node.get("transform"))
+        if transform is None:
+            return None
+        matrix = multiply(transform, matrix)
+    a, b, c, d, _, _ = matrix
+    total = a * a + b * b + c * c + d * d
+    determinant = a * d - b * c
+    return math.sqrt(
+        (total + math.sqrt(max(total * total - 4 * determinant**2, 0))) / 2
+    )
+
+
+def simplify_svg(svg_text, tolerance):
+    """Simplify the stroke paths of an SVG page.
+
+    ``tolerance`` is the largest allowed deviation in PDF points; each path
+    is simplified in its own coordinates, with the tolerance scaled by its
+    transforms. Clip paths and anything in ``<defs>`` are left alone.
+
+    Returns the new SVG text and a dict of ``paths`` simplified and path
+    data ``bytes_before`` and ``bytes_after``.
+    """
+    stats = {"paths": 0, "bytes_before": 0, "bytes_after": 0}
+    parser = etree.XMLParser(huge_tree=True)
+    try:
+        root = etree.fromstring(svg_text.encode("utf-8"), parser)
+    except etree.XMLSyntaxError:
+        return svg_text, stats
+
+    for path in root.iter(SVG_NAMESPACE + "path"):
+        path_d = path.get("d")
+        if not path_d or not _is_painted_stroke(path):
+            continue
+        scale = _user_scale(path)
+        if not scale:
+            continue
+
+        simplified = simplify_path_data(path_d, tolerance / scale)
+        stats["bytes_before"] += len(path_d)
+        stats["bytes_after"] += len(simplified)
+        if simplified is not path_d:
+            path.set("d", simplified)
+            stats["paths"] += 1
+
+    if not stats["paths"]:
+        return svg_text, stats
+    return etree.tostring(root, encoding="unicode"), stats
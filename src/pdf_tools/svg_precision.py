@@ -0,0 +1,367 @@
+import re
+
+from src.lazy_import import lazy_import
+from src.path_geometry import parse_transform
+from src.pdf_tools.path_data import compact_path_data
+
+etree = lazy_import("lxml.etree")
+
+# Attributes that contain numeric values to round
+NUMERIC_ATTRS = frozenset(
+    [
+        "x",
+        "y",
+        "width",
+        "height",
+        "cx",
+        "cy",
+        "r",
+        "rx",
+        "ry",
+        "x1",
+        "y1",
+        "x2",
+        "y2",
+        "stroke-width",
+        "font-size",
+    ]
+)
+
+# Attributes that contain lists of numbers (space or comma separated)
+LIST_ATTRS = frozenset(["viewBox", "points"])
+
+# Attributes that contain complex number sequences (path data, transforms)
+COMPLEX_ATTRS = frozenset(["d", "transform"])
+
+# Lengths and coordinates rescaled in fixed-point output, alone or as lists
+# (text x/y positions); everything but the outer size of the root element
+FIXED_POINT_ATTRS = (
+    NUMERIC_ATTRS
+    | LIST_ATTRS
+    | frozenset(["dx", "dy", "stroke-dasharray", "stroke-dashoffset"])
+)
+ROOT_SIZE_ATTRS = frozenset(["width", "height"])
+
+# Numbers with a decimal point. Integers never change when rounded, so they
+# are left for the split to skip over; tokenisation is otherwise identical to
+# matching ``-?(?:\d+\.?\d*|\.\d+)`` and rounding only the decimal matches.
+DECIMAL_NUMBER = re.compile(r"(-?(?:\d+\.\d*|\.\d+))")
+LIST_SEPARATOR = re.compile(r"[\s,]+")
+XML_SPECIAL = re.compile(r"[&<>]")
+XML_ENTITIES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>\n'
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+def round_number(num_str, precision=2):
+    """Round a number string to the given precision.
+
+    Trailing zeros and a trailing decimal point are removed, so ``-0.004``
+    becomes ``-0`` just as ``round_numbers_in_string`` writes it. Strings
+    that are not numbers are returned unchanged.
+    """
+    try:
+        formatted = "%.*f" % (precision, float(num_str))
+    except (ValueError, TypeError):
+        return num_str
+    if "." in formatted:
+        formatted = formatted.rstrip("0").rstrip(".")
+    return formatted
+
+
+def round_numbers_in_string(text, precision=2):
+    """Round every decimal number in a string (path data, transforms)."""
+    if not text:
+        return text
+    parts = DECIMAL_NUMBER.split(text)
+    if len(parts) == 1:
+        return text
+    if precision <= 0:
+        parts[1::2] = [round_number(num, precision) for num in parts[1::2]]
+        return "".join(parts)
+    number_format = f"%.{precision}f"
+    # Odd entries are the captured numbers; format them in one pass
+    parts[1::2] = [
+        (number_format % float(num)).rstrip("0").rstrip(".") or "0"
+        for num in parts[1::2]
+    ]
+    return "".join(parts)
+
+
+def round_number_list(text, precision=2):
+    """Round a space or comma separated list of numbers (viewBox, points)."""
+    values = LIST_SEPARATOR.split(text)
+    return " ".join(round_number(v, precision) for v in values if v)
+
+
+def round_attribute(name, value, precision=2, compact_paths=False):
+    """Round an attribute value according to the kind of numbers it holds.
+
+    With ``compact_paths``, path data is also rewritten in its shortest form.
+    """
+    if compact_paths and name == "d":
+        compacted = compact_path_data(value, precision)
+        if compacted is not None:
+            return compacted
+    if name in NUMERIC_ATTRS:
+        return round_number(value, precision)
+    if name in LIST_ATTRS:
+        return round_number_list(value, precision)
+    if name in COMPLEX_ATTRS:
+        return round_numbers_in_string(value, precision)
+    return value
+
+
+def _scaled_number_list(text, scale):
+    """Scale a list of numbers and round each to an integer."""
+    values = []
+    for value in LIST_SEPARATOR.split(text.strip()):
+        try:
+            values.append(str(round(float(value) * scale)))
+        except ValueError:
+            # Units or keywords (``100%``, ``none``) cannot be rescaled
+            return text
+    return " ".join(values)
+
+
+def _fixed_point_transform(value, scale, precision):
+    """Rescale a transform's translation, keeping its linear part as is."""
+    matrix = parse_transform(value)
+    if matrix is None:
+        # Conjugating by the scale maps any transform into the scaled space
+        inner = round_numbers_in_string(value, precision)
+        return f"scale({scale}) {inner} scale({1 / scale})"
+    a, b, c, d, e, f = matrix
+    linear = [round_number(number, precision) for number in (a, b, c, d)]
+    translation = [str(round(e * scale)), str(round(f * scale))]
+    return f"matrix({','.join(linear + translation)})"
+
+
+def fixed_point_attribute(name, value, precision=2, is_root=False):
+    """Rewrite an attribute for fixed-point output.
+
+    Coordinates and lengths are multiplied by ``10 ** precision`` and
+    rounded to integers, transforms have their translation rescaled, and
+    path data is compacted in the rescaled space. The root element keeps
+    its ``width`` and ``height`` so the page renders at the same size.
+    """
+    scale = 10**precision
+    if name == "d":
+        return compact_path_data(value, 0, scale)
+    if name == "transform":
+        return _fixed_point_transform(value, scale, precision)
+    if name in FIXED_POINT_ATTRS and not (is_root and name in ROOT_SIZE_ATTRS):
+        return _scaled_number_list(value, scale)
+    return round_attribute(name, value, precision)
+
+
+def _escape(text):
+    """Escape text the way BeautifulSoup's minimal XML formatter does."""
+    if XML_SPECIAL.search(text) is None:
+        return text
+    return XML_SPECIAL.sub(lambda match: XML_ENTITIES[match.group(0)], text)
+
+
+def _quote_attribute(value):
+    """Quote an escaped attribute value, preferring double quotes."""
+    if '"' in value:
+        if "'" in value:
+            return '"' + value.replace('"', "&quot;") + '"'
+        return "'" + value + "'"
+    return '"' + value + '"'
+
+
+def _collapse_whitespace(text):
+    """Reduce a whitespace-only string to a single newline or space."""
+    if text.strip(ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _split_name(name):
+    """Split an lxml ``{namespace}local`` name into its parts."""
+    if name[:1] == "{":
+        namespace, local = name[1:].split("}", 1)
+        return namespace, local
+    return None, name
+
+
+class _PrecisionWriter:
+    """lxml parser target that rounds numbers and re-serializes on the fly.
+
+    Events stream straight from the parser to output fragments without
+    building a tree. Serialization follows BeautifulSoup's XML output
+    (sorted attributes, collapsed whitespace-only text, ``<tag/>`` for
+    empty elements), so at any precision above zero the result is identical
+    to parsing with BeautifulSoup, rounding, and calling ``str()``. (At zero
+    the old rounding also stripped the zeros off integers, ``10`` to ``1``.)
+    """
+
+    def __init__(self, precision, compact_paths=False, fixed_point=False):
+        self.precision = precision
+        self.compact_paths = compact_paths
+        self.fixed_point = fixed_point
+        self.parts = [XML_DECLARATION]
+        self.text = []
+        self.tag_names = []
+        self.tag_open = False
+        # Inverted namespace maps (uri -> prefix), innermost last
+        self.nsmaps = [{XML_NAMESPACE: "xml"}]
+
+    def _prefix_for(self, namespace):
+        if namespace is None:
+            return None
+        for inverted in reversed(self.nsmaps):
+            if inverted is not None and namespace in inverted:
+                return inverted[namespace]
+        return None
+
+    def _close_start_tag(self):
+        if self.tag_open:
+            self.parts.append(">")
+            self.tag_open = False
+
+    def _flush_data(self):
+        if self.text:
+            text = _collapse_whitespace("".join(self.text))
+            self.text = []
+            self._close_start_tag()
+            self.parts.append(_escape(text))
+
+    def start(self, tag, attrib, nsmap=None):
+        self._flush_data()
+        self._close_start_tag()
+
+        attrs = dict(attrib)
+        if nsmap:
+            self.nsmaps.append({uri: prefix for prefix, uri in nsmap.items()})
+            for prefix, uri in nsmap.items():
+                attrs[f"xmlns:{prefix}" if prefix else "xmlns"] = uri
+        elif len(self.nsmaps) > 1:
+            self.nsmaps.append(None)
+
+        precision = self.precision
+        compact_paths = self.compact_paths
+        is_root = not self.tag_names
+        rendered = {}
+        for name, value in attrs.items():
+            namespace, local = _split_name(name)
+            if namespace is not None:
+                prefix = self._prefix_for(namespace)
+                name = f"{prefix}:{local}" if prefix else local
+            if self.fixed_point:
+                rendered[name] = fixed_point_attribute(name, value, precision, is_root)
+            else:
+                rendered[name] = round_attribute(name, value, precision, compact_paths)
+
+        namespace, local = _split_name(tag)
+        prefix = self._prefix_for(namespace)
+        parts = self.parts
+        parts.append(f"<{prefix}:{local}" if prefix else f"<{local}")
+        for name in sorted(rendered):
+            parts.append(f" {name}={_quote_attribute(_escape(rendered[name]))}")
+        self.tag_open = True
+        self.tag_names.append(f"{prefix}:{local}" if prefix else local)
+
+    def end(self, tag):
+        self._flush_data()
+        name = self.tag_names.pop()
+        if self.tag_open:
+            self.parts.append("/>")
+            self.tag_open = False
+        else:
+            self.parts.append(f"</{name}>")
+        if len(self.nsmaps) > 1:
+            self.nsmaps.pop()
+
+    def data(self, text):
+        self.text.append(text)
+
+    def comment(self, text):
+        self._flush_data()
+        self._close_start_tag()
+        self.parts.append(f"<!--{_collapse_whitespace(text)}-->")
+
+    def pi(self, target, data):
+        self._flush_data()
+        self._close_start_tag()
+        self.parts.append(f"<?{target} {data or ''}?>")
+
+    def doctype(self, name, pubid, system):
+        self._flush_data()
+        self._close_start_tag()
+        value = name or ""
+        if pubid is not None:
+            value += f' PUBLIC "{pubid}"'
+            if system is not None:
+                value += f' "{system}"'
+        elif system is not None:
+            value += f' SYSTEM "{system}"'
+        self.parts.append(f"<!DOCTYPE {value}>\n")
+
+    def close(self):
+        self._flush_data()
+        # Recovered documents may end with elements still open
+        while self.tag_names:
+            self.end(None)
+        return "".join(self.parts)
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
+def optimize_tree_precision(soup, precision=2, compact_paths=False, fixed_point=False):
+    """Round numeric attributes in place on a parsed BeautifulSoup tree.
+
+    ``str(soup)`` afterwards is identical to ``optimize_svg_precision`` on
+    the original markup, for callers that keep working with the tree.
+    """
+    root = soup.find()
+    for element in soup.find_all():
+        for name, value in element.attrs.items():
+            if fixed_point:
+                element.attrs[name] = fixed_point_attribute(
+                    name, value, precision, element is root
+                )
+            else:
+                element.attrs[name] = round_attribute(
+                    name, value, precision, compact_paths
+                )
+    return soup
+
+
+def optimize_svg_precision(
+    svg_text, precision=2, compact_paths=False, fixed_point=False
+):
+    """
+    Reduce decimal precision in SVG coordinates to compress file size.
+
+    Streams the document through lxml's parser-target interface, rounding
+    numeric attributes and path data as each element arrives, so no tree
+    is built for the page.
+
+    Args:
+        svg_text: Raw SVG string
+        precision: Number of decimal places to keep (default: 2)
+        compact_paths: Also rewrite path data in its shortest equivalent
+            form (relative commands, no repeated letters or spare separators)
+        fixed_point: Scale coordinates by ``10 ** precision`` and write
+            them as integers, with a matching ``viewBox`` so the page keeps
+            its size; path data is always compacted
+
+    Returns:
+        Optimized SVG string
+    """
+    if svg_text[:1] == "\ufeff":
+        svg_text = svg_text[1:]
+
+    writer = _PrecisionWriter(precision, compact_paths, fixed_point)
+    parser = etree.XMLParser(target=writer, recover=True, huge_tree=True)
+    try:
+        parser.feed(svg_text)
+        parser.close()
+    except etree.XMLSyntaxError:
+        # Unrecoverable markup: keep whatever was serialized before the error
+        writer.close()
+    return writer.getvalue()
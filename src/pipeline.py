@@ -0,0 +1,336 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.build_cache import BuildCache, fingerprint, hash_file, letter_key
+from src.build_report import BuildReport
+from src.html_gen.compress import precompress
+from src.html_gen.generate import CACHE_MANIFEST, LINK_HIGHLIGHT_MODES, HTMLGenerator
+from src.pdf_tools.extract_svg import BACKENDS, PDFSVGExtractor
+from src.pdf_tools.page_background import PAGE_BACKGROUND_MODES
+
+
+def _build_letter_worker(settings, pdf_path):
+    """Process pool entry point: build one letter with a private pipeline.
+
+    Returns the HTML path together with the letter's build report records.
+    """
+    pipeline = LetterPipeline(**settings)
+    return pipeline.build_letter(pdf_path), pipeline.report.records
+
+
+class LetterPipeline:
+    """Build HTML letters straight from PDFs without intermediate files.
+
+    Every page is parsed once by the extractor and handed to the HTML
+    generator as a tree, so the SVG is never written out and read back.
+    Set ``debug_svg`` to also write the page SVG files and page manifest.
+    """
+
+    def __init__(
+        self,
+        pdf_dir="./pdfs",
+        svg_dir="output/svg",
+        html_dir="output/html",
+        template_dir="templates",
+        jobs=1,
+        precision=2,
+        use_cache=True,
+        debug_svg=False,
+        link_highlight="use",
+        simplify=None,
+        compact_paths=True,
+        fixed_point=False,
+        lazy_pages=False,
+        compress=True,
+        raster_dpi=None,
+        backend="svg",
+        page_background="keep",
+    ):
+        # Keyword arguments for rebuilding this pipeline inside a worker
+        self.settings = {
+            "pdf_dir": pdf_dir,
+            "svg_dir": svg_dir,
+            "html_dir": html_dir,
+            "template_dir": template_dir,
+            "precision": precision,
+            "use_cache": use_cache,
+            "debug_svg": debug_svg,
+            "link_highlight": link_highlight,
+            "simplify": simplify,
+            "compact_paths": compact_paths,
+            "fixed_point": fixed_point,
+            "lazy_pages": lazy_pages,
+            "compress": compress,
+            "raster_dpi": raster_dpi,
+            "backend": backend,
+            "page_background": page_background,
+        }
+        self.jobs = jobs or os.cpu_count() or 1
+        self.precision = precision
+        self.use_cache = use_cache
+        self.debug_svg = debug_svg
+        # One report for both halves, so a letter's stages are measured together
+        self.report = BuildReport()
+
+        self.extractor = PDFSVGExtractor(
+            pdf_dir=pdf_dir,
+            output_dir=svg_dir,
+            precision=precision,
+            simplify=simplify,
+            compact_paths=compact_paths,
+            fixed_point=fixed_point,
+            raster_dpi=raster_dpi,
+            report=self.report,
+            backend=backend,
+            page_background=page_background,
+        )
+        self.generator = HTMLGenerator(
+            svg_dir=svg_dir,
+            html_dir=html_dir,
+            template_dir=template_dir,
+            pdfs_dir=pdf_dir,
+            link_highlight=link_highlight,
+            lazy_pages=lazy_pages,
+            compress=compress,
+            report=self.report,
+        )
+
+    def build_letter(self, pdf_path):
+        """Render one PDF to its HTML letter in a single pass."""
+        pdf_path = Path(pdf_path)
+        print(f"Processing {pdf_path.name}")
+        svg_pages = self.extractor.render_pages(pdf_path, write_debug=self.debug_svg)
+        return self.generator.generate_html_from_pages(svg_pages, pdf_path.stem)
+
+    def letter_fingerprint(self, pdf_path, template_hash):
+        """Fingerprint the PDF, settings, template and images of a letter."""
+        parts = [
+            hash_file(pdf_path),
+            self.precision,
+            self.extractor.simplify,
+            self.extractor.compact_paths,
+            self.extractor.fixed_point,
+            self.extractor.raster_dpi,
+            self.extractor.backend,
+            self.extractor.page_background,
+            self.generator.link_highlight,
+            self.generator.lazy_pages,
+            template_hash,
+        ]
+        for image_file in self.generator.find_images(pdf_path.stem):
+            parts.extend([image_file.name, hash_file(image_file)])
+        return fingerprint(*parts)
+
+    def build_all(self, only=None):
+        """Build every PDF in the PDF directory, skipping unchanged letters.
+
+        Pass ``only`` to check just those PDFs for changes and take the
+        other letters as they are, as the watcher does for a single edit.
+        The index still lists every letter.
+        """
+        pdf_dir = self.extractor.pdf_dir
+        if not pdf_dir.exists():
+            print(f"Error: PDF directory '{pdf_dir.resolve()}' does not exist.")
+            print("Please create the directory and add PDF files to it.")
+            return []
+
+        pdf_files = sorted(pdf_dir.glob("*.pdf"))
+        if not pdf_files and only is None:
+            print(f"Error: No PDF files found in '{pdf_dir.resolve()}'.")
+            print("Please add PDF files to the directory.")
+            return []
+
+        print(f"Found {len(pdf_files)} PDF file(s) in '{pdf_dir.resolve()}'")
+        candidates = pdf_files if only is None else sorted(only)
+        self.report.clear()
+
+        cache = None
+        outputs = {}
+        stale = {}
+        if self.use_cache:
+            self.generator.create_default_template()
+            cache = BuildCache(self.generator.html_dir / CACHE_MANIFEST)
+            template_hash = hash_file(self.generator.template_dir / "base.html")
+
+        for pdf_file in candidates:
+            if cache is None:
+                stale[pdf_file] = None
+                continue
+            key_fingerprint = self.letter_fingerprint(pdf_file, template_hash)
+            cached = cache.lookup(letter_key(pdf_file.stem), key_fingerprint)
+            if cached is not None:
+                print(f"Up to date: {cached[0]}")
+                outputs[pdf_file] = cached[0]
+            else:
+                stale[pdf_file] = key_fingerprint
+
+        if self.jobs > 1 and len(stale) > 1:
+            workers = min(self.jobs, len(stale))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    pdf_file: executor.submit(
+                        _build_letter_worker, self.settings, pdf_file
+                    )
+                    for pdf_file in stale
+                }
+                for pdf_file, future in futures.items():
+                    outputs[pdf_file], records = future.result()
+                    self.report.extend(records)
+        else:
+            for pdf_file in stale:
+                outputs[pdf_file] = self.build_letter(pdf_file)
+
+        if cache is not None:
+            for pdf_file, key_fingerprint in stale.items():
+                image_outputs = self.generator.image_processor(pdf_file.stem).outputs(
+                    self.generator.find_images(pdf_file.stem)
+                )
+                page_outputs = self.generator.page_assets(pdf_file.stem)
+                cache.store(
+                    letter_key(pdf_file.stem),
+                    key_fingerprint,
+                    [outputs[pdf_file]] + image_outputs + page_outputs,
+                )
+            cache.prune(letter_key(pdf_file.stem) for pdf_file in pdf_files)
+            cache.save()
+            print(cache.summary("Build"))
+
+        for pdf_file in pdf_files:
+            if pdf_file in stale or not self.generator.is_catalogued(pdf_file.stem):
+                self.generator.catalog_letter(pdf_file.stem)
+        index_pages = self.generator.update_index(
+            [pdf_file.stem for pdf_file in pdf_files]
+        )
+        if self.generator.compress and only is None:
+            precompress(self.generator.html_dir, use_cache=self.use_cache)
+        elif self.generator.compress:
+            changed = list(index_pages)
+            for pdf_file in stale:
+                changed.append(outputs[pdf_file])
+                changed.extend(self.generator.page_assets(pdf_file.stem))
+            precompress(
+                self.generator.html_dir, use_cache=self.use_cache, sources=changed
+            )
+        self.generator.write_report()
+
+        return [outputs[pdf_file] for pdf_file in candidates]
+
+
+def add_build_arguments(parser):
+    """Add the options shared by every command that builds letters."""
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of letters built in parallel (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=2,
+        help="decimal places kept in SVG coordinates (default: 2)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore the build cache and rebuild every letter",
+    )
+    parser.add_argument(
+        "--debug-svg",
+        action="store_true",
+        help="also write intermediate page SVG files and page manifests",
+    )
+    parser.add_argument(
+        "--link-highlight",
+        choices=LINK_HIGHLIGHT_MODES,
+        default="use",
+        help="how hyperlinked strokes are drawn in blue (default: use)",
+    )
+    parser.add_argument(
+        "--simplify",
+        type=float,
+        metavar="TOLERANCE",
+        help="simplify handwriting strokes, moving them at most TOLERANCE points",
+    )
+    parser.add_argument(
+        "--no-compact-paths",
+        dest="compact_paths",
+        action="store_false",
+        help="only round path data instead of rewriting it in its shortest form",
+    )
+    parser.add_argument(
+        "--fixed-point",
+        action="store_true",
+        help="write integer coordinates scaled by 10^precision, with a matching "
+        "viewBox and link boxes",
+    )
+    parser.add_argument(
+        "--lazy-pages",
+        action="store_true",
+        help="keep the first page inline and load the others as separate SVG files",
+    )
+    parser.add_argument(
+        "--no-compress",
+        dest="compress",
+        action="store_false",
+        help="don't write precompressed .gz and .br copies of the output",
+    )
+    parser.add_argument(
+        "--raster-dpi",
+        type=float,
+        metavar="DPI",
+        help="also render each page as a bitmap at DPI, and use it instead of "
+        "the SVG when it is smaller",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="svg",
+        help="write pages with PyMuPDF's SVG renderer, or straight from their "
+        "drawing commands (default: svg)",
+    )
+    parser.add_argument(
+        "--page-background",
+        choices=PAGE_BACKGROUND_MODES,
+        default="keep",
+        help="strip full-page fills and ruled templates, or strip them and "
+        "paint the page colour with CSS (default: keep)",
+    )
+
+
+def build_settings(args):
+    """Return ``LetterPipeline`` keyword arguments for parsed build options."""
+    return {
+        "jobs": args.jobs,
+        "precision": args.precision,
+        "use_cache": not args.force,
+        "debug_svg": args.debug_svg,
+        "link_highlight": args.link_highlight,
+        "simplify": args.simplify,
+        "compact_paths": args.compact_paths,
+        "fixed_point": args.fixed_point,
+        "lazy_pages": args.lazy_pages,
+        "compress": args.compress,
+        "raster_dpi": args.raster_dpi,
+        "backend": args.backend,
+        "page_background": args.page_background,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build HTML letters from PDFs in a single pass."
+    )
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
+
+    pipeline = LetterPipeline(**build_settings(args))
+    generated_files = pipeline.build_all()
+    print(f"Generated {len(generated_files)} HTML files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from src.build_cache import hash_file
+
+PUBLISH_MANIFEST = ".publish-manifest.json"
+# Top-level files published: dated letters and the index pages, with their
+# precompressed siblings
+PUBLISHED_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2}|index|index-\d+)\.html(\.gz|\.br)?$")
+# Directories published with everything in them
+PUBLISHED_DIRS = ("images", "pages", "thumbs")
+
+
+def published_files(html_dir):
+    """Return the generated files that belong on the website, relative paths."""
+    html_dir = Path(html_dir)
+    files = [
+        path.name
+        for path in html_dir.iterdir()
+        if path.is_file() and PUBLISHED_NAME.match(path.name)
+    ]
+    for dir_name in PUBLISHED_DIRS:
+        for path in (html_dir / dir_name).rglob("*"):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                files.append(path.relative_to(html_dir).as_posix())
+    return sorted(files)
+
+
+def copy_atomic(source, destination):
+    """Copy a file so that readers see either the old or the new version."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(destination.name + ".tmp")
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class Publisher:
+    """Copy generated letters to the website, skipping unchanged files.
+
+    A manifest in the publish directory records the hash and size of every
+    file copied there, and the modification time of its source. Files whose
+    source hash matches the manifest, and whose published copy is still
+    present at the same size, are left alone, so a publish only writes what
+    changed. Sources whose size and modification time match the manifest
+    are taken to have the recorded hash without being read again. Nothing
+    is ever deleted from the publish directory.
+    """
+
+    def __init__(self, html_dir="output/html", publish_dir="publish"):
+        self.html_dir = Path(html_dir)
+        self.publish_dir = Path(publish_dir)
+        self.manifest_path = self.publish_dir / PUBLISH_MANIFEST
+
+    def load_manifest(self):
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Without a manifest every file is compared afresh
+            return {}
+
+    def save_manifest(self, manifest):
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_current(self, entry, file_hash, destination):
+        if entry is None or entry.get("sha256") != file_hash:
+            return False
+        try:
+            return destination.stat().st_size == entry.get("size")
+        except OSError:
+            return False
+
+    def source_hash(self, entry, source_stat, source):
+        """Return a source file's hash, reading it only if it has changed."""
+        if (
+            entry is not None
+            and entry.get("size") == source_stat.st_size
+            and entry.get("mtime_ns") == source_stat.st_mtime_ns
+            and "sha256" in entry
+        ):
+            return entry["sha256"]
+        return hash_file(source)
+
+    def publish(self, dry_run=False):
+        """Copy new and changed files and return them with the unchanged count.
+
+        The result maps ``"added"`` and ``"updated"`` to lists of relative
+        paths, and ``"unchanged"`` to a count.
+        """
+        old_manifest = self.load_manifest()
+        manifest = {}
+        changes = {"added": [], "updated": [], "unchanged": 0}
+
+        for relative_path in published_files(self.html_dir):
+            source = self.html_dir / relative_path
+            destination = self.publish_dir / relative_path
+            source_stat = source.stat()
+            entry = old_manifest.get(relative_path)
+            file_hash = self.source_hash(entry, source_stat, source)
+            manifest[relative_path] = {
+                "sha256": file_hash,
+                "size": source_stat.st_size,
+                "mtime_ns": source_stat.st_mtime_ns,
+            }
+
+            if self.is_current(entry, file_hash, destination):
+                changes["unchanged"] += 1
+                continue
+            if destination.exists():
+                changes["updated"].append(relative_path)
+            else:
+                changes["added"].append(relative_path)
+            if not dry_run:
+                copy_atomic(source, destination)
+
+        if not dry_run:
+            self.save_manifest(manifest)
+        return changes
+
+
+def print_changes(changes, dry_run=False):
+    for relative_path in changes["added"]:
+        print(f"  + {relative_path}")
+    for relative_path in changes["updated"]:
+        print(f"  ~ {relative_path}")
+    verb = "Would publish" if dry_run else "Published"
+    print(
+        f"{verb} {len(changes['added'])} new, {len(changes['updated'])} changed, "
+        f"{changes['unchanged']} unchanged"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Copy new and changed letters to the website directory."
+    )
+    parser.add_argument(
+        "--html-dir",
+        default="output/html",
+        help="directory of generated files (default: output/html)",
+    )
+    parser.add_argument(
+        "--publish-dir",
+        default="publish",
+        help="website directory to publish to (default: publish)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list what would be copied without copying it",
+    )
+    args = parser.parse_args(argv)
+
+    publisher = Publisher(html_dir=args.html_dir, publish_dir=args.publish_dir)
+    if not publisher.publish_dir.exists():
+        print(f"Error: publish directory '{publisher.publish_dir}' does not exist")
+        print(f"Create it with: mkdir {publisher.publish_dir}")
+        print(
+            "Or symlink it to your website: "
+            f"ln -s /path/to/website {publisher.publish_dir}"
+        )
+        return 1
+    if not publisher.html_dir.is_dir():
+        print("Error: No HTML files to publish. Run 'make html' first.")
+        return 1
+
+    print(f"Publishing {publisher.html_dir} to {publisher.publish_dir}...")
+    changes = publisher.publish(dry_run=args.dry_run)
+    print_changes(changes, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
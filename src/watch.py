@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+from src.html_gen.generate import IMAGE_EXTENSIONS
+from src.pipeline import LetterPipeline, add_build_arguments, build_settings
+
+
+def snapshot(directory):
+    """Map each file in a directory to its modification time and size."""
+    files = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return files
+    for entry in entries:
+        if entry.is_file():
+            stat = entry.stat()
+            files[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_files(before, after):
+    """Return the paths added, removed or modified between two snapshots."""
+    return {
+        path
+        for path in before.keys() | after.keys()
+        if before.get(path) != after.get(path)
+    }
+
+
+class LetterWatcher:
+    """Rebuild letters as their PDFs, photos or templates change.
+
+    One ``LetterPipeline`` is kept for the life of the watcher, so modules,
+    templates and caches stay loaded between builds. ``pdfs/`` and
+    ``templates/`` are polled every ``interval`` seconds; once a change is
+    seen, the watcher waits until nothing has changed for ``debounce``
+    seconds (a sync tool may write a PDF in several steps) and then
+    rebuilds only the letters involved:
+
+    - ``2025-09-28.pdf`` or ``2025-09-28-*.jpg``: that letter
+    - ``base.html``: every letter
+    - ``index.html``: the index pages
+    """
+
+    def __init__(self, pipeline, interval=0.25, debounce=0.5):
+        self.pipeline = pipeline
+        self.interval = interval
+        self.debounce = debounce
+        self.pdf_dir = pipeline.extractor.pdf_dir
+        self.template_dir = pipeline.generator.template_dir
+
+    def take_snapshot(self):
+        files = snapshot(self.pdf_dir)
+        files.update(snapshot(self.template_dir))
+        return files
+
+    def affected_letters(self, changes):
+        """Return the PDFs to rebuild for a set of changed paths.
+
+        Returns ``None`` when every letter needs rebuilding.
+        """
+        letters = set()
+        pdf_stems = {path.stem for path in self.pdf_dir.glob("*.pdf")}
+        for path in changes:
+            if path.parent == self.template_dir:
+                if path.name == "base.html":
+                    return None
+                continue
+            if path.suffix.lower() == ".pdf":
+                letters.add(path.stem)
+            elif path.suffix.lower() in IMAGE_EXTENSIONS:
+                # Photos are named after their letter: 2025-09-28-beach.jpg
+                letters.update(
+                    stem for stem in pdf_stems if path.stem.startswith(f"{stem}-")
+                )
+        return {self.pdf_dir / f"{stem}.pdf" for stem in letters if stem in pdf_stems}
+
+    def rebuild(self, changes):
+        started = time.perf_counter()
+        names = ", ".join(sorted(path.name for path in changes))
+        print(f"Changed: {names}")
+        letters = self.affected_letters(changes)
+        try:
+            self.pipeline.build_all(only=letters)
+        except Exception as error:  # Keep watching after a bad save or sync
+            print(f"Build failed: {error}")
+            return
+        print(f"Rebuilt in {time.perf_counter() - started:.2f}s")
+
+    def wait_for_quiet(self, files):
+        """Poll until nothing has changed for ``debounce`` seconds."""
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(self.interval)
+            current = self.take_snapshot()
+            if current != files:
+                files = current
+                quiet_since = time.monotonic()
+        return files
+
+    def run(self):
+        """Build once, then rebuild on every change until interrupted."""
+        self.pipeline.build_all()
+        files = self.take_snapshot()
+        print(f"Watching {self.pdf_dir} and {self.template_dir} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.take_snapshot()
+                if current == files:
+                    continue
+                current = self.wait_for_quiet(current)
+                changes = changed_files(files, current)
+                files = current
+                if changes:
+                    self.rebuild(changes)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild letters whenever their PDFs, photos or templates change."
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="seconds between checks for changes (default: 0.25)",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="seconds without further changes before rebuilding (default: 0.5)",
+    )
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
+
+    pipeline = LetterPipeline(**build_settings(args))
+    LetterWatcher(pipeline, interval=args.interval, debounce=args.debounce).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import shutil
+import unittest
+from pathlib import Path
+
+import fitz
+
+from benchmarks.synthetic import make_handwriting_pdf
+
+
+class TestSyntheticPDF(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path("test_benchmarks")
+
+    def tearDown(self):
+        if self.output_dir.exists():
+            shutil.rmtree(self.output_dir)
+
+    def test_make_handwriting_pdf(self):
+        path = make_handwriting_pdf(
+            self.output_dir / "letter.pdf",
+            pages=2,
+            strokes_per_page=20,
+            curve_density=3,
+            links=2,
+        )
+
+        doc = fitz.open(path)
+        try:
+            self.assertEqual(len(doc), 2)
+            drawings = doc[0].get_drawings()
+            self.assertEqual(len(drawings), 20)
+            self.assertEqual(len(drawings[0]["items"]), 3)
+            self.assertEqual(
+                [link["uri"] for link in doc[1].get_links()],
+                ["https://example.com/0", "https://example.com/1"],
+            )
+        finally:
+            doc.close()
+
+    def test_same_seed_same_pdf(self):
+        first = make_handwriting_pdf(self.output_dir / "a.pdf", pages=1, seed=3)
+        second = make_handwriting_pdf(self.output_dir / "b.pdf", pages=1, seed=3)
+
+        self.assertEqual(first.read_bytes(), second.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import shutil
+import unittest
+from pathlib import Path
+
+from src.build_cache import BuildCache, fingerprint, hash_file, letter_key
+
+
+class TestBuildCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = Path("test_cache")
+        self.cache_dir.mkdir(exist_ok=True)
+        self.manifest = self.cache_dir / ".build-cache.json"
+        self.output = self.cache_dir / "letter.html"
+        self.output.write_text("<html></html>", encoding="utf-8")
+
+    def tearDown(self):
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+
+    def test_lookup_miss_then_hit_after_save(self):
+        cache = BuildCache(self.manifest)
+        key_fingerprint = fingerprint("pdf-hash", 2)
+        self.assertIsNone(cache.lookup("letter", key_fingerprint))
+        cache.store("letter", key_fingerprint, [self.output])
+        cache.save()
+
+        reloaded = BuildCache(self.manifest)
+        self.assertEqual(reloaded.lookup("letter", key_fingerprint), [self.output])
+        self.assertEqual((reloaded.hits, reloaded.misses), (1, 0))
+
+    def test_changed_fingerprint_is_stale(self):
+        cache = BuildCache(self.manifest)
+        cache.store("letter", fingerprint("pdf-hash", 2), [self.output])
+
+        self.assertIsNone(cache.lookup("letter", fingerprint("pdf-hash", 3)))
+        self.assertEqual(cache.misses, 1)
+
+    def test_missing_output_is_stale(self):
+        cache = BuildCache(self.manifest)
+        key_fingerprint = fingerprint("pdf-hash", 2)
+        cache.store("letter", key_fingerprint, [self.output])
+        self.output.unlink()
+
+        self.assertIsNone(cache.lookup("letter", key_fingerprint))
+
+    def test_corrupt_manifest_starts_empty(self):
+        self.manifest.write_text("{not json", encoding="utf-8")
+
+        cache = BuildCache(self.manifest)
+
+        self.assertEqual(cache.entries, {})
+
+    def test_letter_keys_replace_older_entries(self):
+        cache = BuildCache(self.manifest)
+        key_fingerprint = fingerprint("pdf-hash", 2)
+        for key in ["2025.09.28.pdf", "2025.09.28", letter_key("2025.09.28")]:
+            cache.store(key, key_fingerprint, [self.output])
+
+        cache.prune([letter_key("2025.09.28")])
+
+        self.assertEqual(list(cache.entries), ["letter:2025.09.28"])
+
+    def test_hash_file_tracks_content(self):
+        before = hash_file(self.output)
+        self.output.write_text("<html>changed</html>", encoding="utf-8")
+
+        self.assertNotEqual(before, hash_file(self.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import shutil
+import time
+import unittest
+from pathlib import Path
+
+from src.build_report import BuildReport
+
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self.report_dir = Path("test_report")
+        self.report = BuildReport()
+        for page in (1, 2):
+            with self.report.stage("render", "2025-01-01", page) as record:
+                record["bytes_out"] = 1000
+            with self.report.stage("precision", "2025-01-01", page, 1000) as record:
+                record["bytes_out"] = 600
+        with self.report.stage("write", "2025-01-01") as record:
+            record["bytes_out"] = 1500
+        with self.report.stage("render", "2025-02-01", 1) as record:
+            record["bytes_out"] = 800
+
+    def tearDown(self):
+        if self.report_dir.exists():
+            shutil.rmtree(self.report_dir)
+
+    def test_stage_records_time_and_sizes(self):
+        record = self.report.records[1]
+        self.assertEqual(record["stage"], "precision")
+        self.assertEqual(record["letter"], "2025-01-01")
+        self.assertEqual(record["page"], 1)
+        self.assertEqual((record["bytes_in"], record["bytes_out"]), (1000, 600))
+        self.assertGreaterEqual(record["seconds"], 0)
+
+    def test_stage_is_recorded_when_it_fails(self):
+        with self.assertRaises(ValueError):
+            with self.report.stage("template", "2025-03-01"):
+                raise ValueError("bad template")
+        self.assertEqual(self.report.records[-1]["stage"], "template")
+
+    def test_nested_stages_are_not_counted_twice(self):
+        report = BuildReport()
+        with report.stage("template", "2025-01-01") as outer:
+            with report.stage("ids", "2025-01-01", 1) as inner:
+                time.sleep(0.02)
+
+        self.assertGreaterEqual(inner["seconds"], 0.02)
+        self.assertLess(outer["seconds"], 0.02)
+        self.assertEqual(report.records, [inner, outer])
+
+    def test_totals(self):
+        stages = self.report.stage_totals()
+        self.assertEqual(list(stages), ["render", "precision", "write"])
+        self.assertEqual(stages["render"]["count"], 3)
+        self.assertEqual(stages["render"]["bytes_out"], 2800)
+        self.assertEqual(stages["precision"]["bytes_in"], 2000)
+
+        letters = self.report.letter_totals()
+        self.assertEqual(letters["2025-01-01"]["pages"], 2)
+        self.assertEqual(letters["2025-01-01"]["bytes_written"], 1500)
+        self.assertEqual(letters["2025-02-01"]["bytes_written"], 0)
+
+    def test_write_and_summary(self):
+        path = self.report_dir / "report.json"
+        self.report.write(path)
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(len(data["records"]), 6)
+        self.assertEqual(data["stages"]["write"]["bytes_out"], 1500)
+        self.assertIn("2025-02-01", data["letters"])
+
+        summary = self.report.summary(top=1)
+        self.assertIn("precision", summary)
+        self.assertEqual(summary.count("2025-"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
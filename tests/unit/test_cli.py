@@ -0,0 +1,59 @@
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.cli import letter_pdfs, main, plan_stages
+
+
+class TestBuildCommand(unittest.TestCase):
+    def setUp(self):
+        self.pdf_dir = Path("test_pdfs")
+        self.pdf_dir.mkdir(exist_ok=True)
+        (self.pdf_dir / "2025-09-28.pdf").write_bytes(b"%PDF")
+
+    def tearDown(self):
+        if self.pdf_dir.exists():
+            shutil.rmtree(self.pdf_dir)
+
+    def test_plan_stages_adds_dependencies_in_order(self):
+        self.assertEqual(plan_stages(["generate"]), ["extract", "generate"])
+        self.assertEqual(
+            plan_stages(["publish", "extract"]), ["extract", "generate", "publish"]
+        )
+        self.assertEqual(plan_stages(["extract"]), ["extract"])
+
+    def test_letter_pdfs(self):
+        letter = self.pdf_dir / "2025-09-28.pdf"
+
+        self.assertEqual(letter_pdfs(self.pdf_dir, ["2025-09-28"]), {letter})
+        self.assertEqual(letter_pdfs(self.pdf_dir, ["2025-09-28.pdf"]), {letter})
+        with self.assertRaises(ValueError):
+            letter_pdfs(self.pdf_dir, ["2025-10-01"])
+
+    @patch("src.cli.LetterPipeline")
+    def test_build_runs_pipeline_for_one_letter(self, mock_pipeline):
+        mock_pipeline.return_value.build_all.return_value = []
+
+        status = main(
+            ["build", "--pdf-dir", str(self.pdf_dir), "--only", "2025-09-28", "-j", "2"]
+        )
+
+        self.assertEqual(status, 0)
+        settings = mock_pipeline.call_args.kwargs
+        self.assertEqual(settings["jobs"], 2)
+        self.assertEqual(settings["html_dir"], Path("output/html"))
+        mock_pipeline.return_value.build_all.assert_called_once_with(
+            only={self.pdf_dir / "2025-09-28.pdf"}
+        )
+
+    @patch("src.cli.LetterPipeline")
+    def test_unknown_letter_fails(self, mock_pipeline):
+        status = main(["build", "--pdf-dir", str(self.pdf_dir), "--only", "nope"])
+
+        self.assertEqual(status, 1)
+        mock_pipeline.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import gzip
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.html_gen.compress import precompress
+
+
+@patch("src.html_gen.compress.brotli_available", lambda: False)
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.html_dir = Path("test_compress")
+        (self.html_dir / "pages").mkdir(parents=True, exist_ok=True)
+        self.letter = self.html_dir / "letter.html"
+        self.letter.write_text("<html>letter</html>", encoding="utf-8")
+        self.page = self.html_dir / "pages" / "letter_page_2.svg"
+        self.page.write_text("<svg/>", encoding="utf-8")
+
+    def tearDown(self):
+        if self.html_dir.exists():
+            shutil.rmtree(self.html_dir)
+
+    def test_writes_gzip_siblings(self):
+        self.assertEqual(precompress(self.html_dir), 2)
+
+        with gzip.open(self.html_dir / "letter.html.gz") as f:
+            self.assertEqual(f.read(), b"<html>letter</html>")
+        self.assertTrue((self.html_dir / "pages" / "letter_page_2.svg.gz").exists())
+        self.assertFalse((self.html_dir / "letter.html.br").exists())
+
+    def test_only_changed_files_are_recompressed(self):
+        precompress(self.html_dir)
+        self.assertEqual(precompress(self.html_dir), 0)
+
+        self.letter.write_text("<html>revised</html>", encoding="utf-8")
+        self.assertEqual(precompress(self.html_dir), 1)
+        with gzip.open(self.html_dir / "letter.html.gz") as f:
+            self.assertEqual(f.read(), b"<html>revised</html>")
+        self.assertEqual(precompress(self.html_dir, use_cache=False), 2)
+
+    def test_siblings_of_removed_files_are_deleted(self):
+        precompress(self.html_dir)
+        self.page.unlink()
+
+        precompress(self.html_dir)
+
+        self.assertFalse((self.html_dir / "pages" / "letter_page_2.svg.gz").exists())
+        self.assertTrue((self.html_dir / "letter.html.gz").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
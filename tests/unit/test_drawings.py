@@ -0,0 +1,194 @@
+import shutil
+import unittest
+from pathlib import Path
+
+import fitz
+
+from src.build_report import BuildReport
+from src.pdf_tools.drawings import (
+    read_page_drawing,
+    simplify_drawing,
+    write_drawing_svg,
+)
+from src.pdf_tools.extract_svg import _extract_page_svg
+
+INK = (0.1, 0.1, 0.2)
+# A page clipped to itself, with one stroke cut by a smaller clip
+CLIPPED_CONTENT = (
+    b"q 0 0 595 842 re W n 2 w 10 10 m 50 50 l S "
+    b"q 100 100 50 50 re W n 90 90 m 200 200 l S Q Q"
+)
+# A red-to-blue gradient painted under one stroke
+GRADIENT = (
+    "<< /ShadingType 2 /ColorSpace /DeviceRGB /Coords [0 0 100 0] /Function"
+    " << /FunctionType 2 /Domain [0 1] /C0 [1 0 0] /C1 [0 0 1] /N 1 >> >>"
+)
+
+
+def _stroke_page(strokes, color=INK):
+    """Return a page with each stroke drawn as its own stroked polyline."""
+    doc = fitz.open()
+    page = doc.new_page()
+    for points in strokes:
+        shape = page.new_shape()
+        shape.draw_polyline(points)
+        shape.finish(color=color, width=1.5, lineCap=1, lineJoin=1, closePath=False)
+        shape.commit()
+    return doc, page
+
+
+def _content_page(content):
+    """Return a page drawn by the given content stream."""
+    doc = fitz.open()
+    page = doc.new_page()
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, content)
+    doc.xref_set_key(page.xref, "Contents", f"{xref} 0 R")
+    return doc, page
+
+
+def _render(svg_text):
+    """Return the pixels of an SVG page rendered by MuPDF."""
+    doc = fitz.open(stream=svg_text.encode("utf-8"), filetype="svg")
+    samples = doc[0].get_pixmap().samples
+    doc.close()
+    return samples
+
+
+class TestDrawings(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path("test_svg")
+        self.output_dir.mkdir(exist_ok=True)
+
+    def tearDown(self):
+        if self.output_dir.exists():
+            shutil.rmtree(self.output_dir)
+
+    def test_strokes_painted_alike_share_a_path(self):
+        doc, page = _stroke_page([[(10, 10), (20, 10.004)], [(30, 30), (30, 40)]])
+        shape = page.new_shape()
+        shape.draw_line((50, 50), (60, 60))
+        shape.finish(color=(1, 0, 0), width=1.5, lineCap=1, lineJoin=1, closePath=False)
+        shape.commit()
+
+        svg_text = write_drawing_svg(read_page_drawing(page))
+
+        self.assertTrue(svg_text.startswith('<svg xmlns="http://www.w3.org/2000/svg"'))
+        self.assertIn('viewBox="0 0 595 842"', svg_text)
+        self.assertIn(
+            '<path fill="none" stroke="#1a1a33" stroke-width="1.5"'
+            ' stroke-linecap="round" stroke-linejoin="round" d="M10 10H20M30 30V40"/>',
+            svg_text,
+        )
+        self.assertIn('stroke="#ff0000"', svg_text)
+        self.assertEqual(svg_text.count("<path"), 2)
+        doc.close()
+
+    def test_clips_are_kept_only_where_they_cut(self):
+        doc, page = _content_page(CLIPPED_CONTENT)
+
+        svg_text = write_drawing_svg(read_page_drawing(page))
+
+        self.assertEqual(svg_text.count("<clipPath"), 1)
+        self.assertIn('<rect x="100" y="692" width="50" height="50"/>', svg_text)
+        self.assertIn('stroke-width="2" stroke-miterlimit="10" d="M10 832', svg_text)
+        self.assertIn('clip-path="url(#clip_1)" d="M90 752', svg_text)
+        doc.close()
+
+    def test_pages_with_text_need_the_renderer(self):
+        doc, page = _stroke_page([[(10, 10), (20, 20)]])
+        page.insert_text((100, 100), "Dear Andy")
+
+        self.assertIsNone(read_page_drawing(page))
+        doc.close()
+
+    def test_pages_with_shadings_need_the_renderer(self):
+        doc, page = _content_page(b"q 10 10 100 100 re W n /Sh0 sh Q 0 0 m 50 50 l S")
+        shading = doc.get_new_xref()
+        doc.update_object(shading, GRADIENT)
+        doc.xref_set_key(
+            page.xref, "Resources", f"<< /Shading << /Sh0 {shading} 0 R >> >>"
+        )
+
+        self.assertIsNone(read_page_drawing(page))
+        doc.close()
+
+    def test_pages_clipped_to_other_shapes_need_the_renderer(self):
+        doc, page = _content_page(b"q 10 10 m 100 10 l 50 90 l h W n 0 0 m 50 50 l S Q")
+
+        self.assertIsNone(read_page_drawing(page))
+        doc.close()
+
+    def test_fixed_point(self):
+        doc, page = _stroke_page([[(10.5, 10), (20, 20.25)]])
+
+        svg_text = write_drawing_svg(read_page_drawing(page), fixed_point=True)
+
+        self.assertIn('width="595" height="842" viewBox="0 0 59500 84200"', svg_text)
+        self.assertIn('stroke-width="150"', svg_text)
+        self.assertIn('d="M1050 1000l950 1025"', svg_text)
+        doc.close()
+
+    def test_simplify_drawing(self):
+        wiggle = [(x, 100 + (0.02 if x % 2 else -0.02)) for x in range(10, 60)]
+        doc, page = _stroke_page([wiggle])
+        drawing = read_page_drawing(page)
+
+        stats = simplify_drawing(drawing, 0.1)
+
+        self.assertEqual(stats["paths"], 1)
+        self.assertLess(stats["bytes_after"], stats["bytes_before"])
+        self.assertIn('d="M10 99.98l49 .04"', write_drawing_svg(drawing))
+        doc.close()
+
+    def test_extract_page_with_drawings_backend(self):
+        doc, page = _stroke_page([[(10, 10), (20, 20)]])
+
+        output_file, entry, _, _ = _extract_page_svg(
+            page, "2025-01-01", 0, self.output_dir, backend="drawings"
+        )
+
+        self.assertEqual(output_file, self.output_dir / "2025-01-01_page_1.svg")
+        self.assertIn('d="M10 10 20 20"', output_file.read_text(encoding="utf-8"))
+        self.assertEqual(entry["bytes"], output_file.stat().st_size)
+        doc.close()
+
+    def test_both_backends_report_simplified_bytes(self):
+        wiggle = [(x, 100 + (0.02 if x % 2 else -0.02)) for x in range(10, 60)]
+        doc, page = _stroke_page([wiggle])
+
+        for backend in ["svg", "drawings"]:
+            report = BuildReport()
+            _, _, stats, _ = _extract_page_svg(
+                page,
+                "2025-01-01",
+                0,
+                self.output_dir,
+                simplify=0.1,
+                report=report,
+                backend=backend,
+            )
+            (record,) = [r for r in report.records if r["stage"] == "simplify"]
+            self.assertEqual(record["bytes_in"], stats["bytes_before"])
+            self.assertEqual(record["bytes_out"], stats["bytes_after"])
+            self.assertLess(record["bytes_out"], record["bytes_in"])
+        doc.close()
+
+    def test_closed_strokes_render_like_the_svg_backend(self):
+        doc = fitz.open()
+        page = doc.new_page()
+        shape = page.new_shape()
+        shape.draw_polyline([(50, 50), (300, 50), (300, 300)])
+        shape.finish(color=INK, width=20, closePath=True)
+        shape.commit()
+
+        svg_text = write_drawing_svg(read_page_drawing(page))
+
+        self.assertIn('d="M50 50H300V300z"', svg_text)
+        self.assertEqual(_render(svg_text), _render(page.get_svg_image()))
+        doc.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,10 @@ import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
+from bs4 import BeautifulSoup
+
 from src.html_gen.generate import HTMLGenerator
+from src.pdf_tools.extract_svg import SVGPage
 
 
 class TestHTMLGenerator(unittest.TestCase):
@@ -27,6 +30,90 @@ class TestHTMLGenerator(unittest.TestCase):
         self.assertIn('data-source-file="test.svg"', result)
         mock_file.assert_called_once()
 
+    @patch("builtins.open", new_callable=mock_open)
+    def test_process_svg_page_in_memory(self, mock_file):
+        soup = BeautifulSoup(
+            '<svg><defs><clipPath id="c"/></defs>'
+            '<path clip-path="url(#c)" d="M10 10L20 20"/></svg>',
+            "xml",
+        )
+        hyperlinks = [
+            {
+                "uri": "https://example.com",
+                "bbox": {"x": 5, "y": 5, "width": 20, "height": 20},
+            }
+        ]
+        svg_page = SVGPage("letter", 2, soup, hyperlinks)
+
+        result = self.generator.process_svg_page(svg_page)
+
+        self.assertIn('data-source-file="letter_page_2.svg"', result)
+        self.assertIn('id="c_p2"', result)
+        self.assertIn('clip-path="url(#c_p2)"', result)
+        self.assertIn('xlink:href="https://example.com"', result)
+        self.assertNotIn("<?xml", result)
+        mock_file.assert_not_called()
+
+    def test_apply_hyperlinks_only_clones_paths_near_link(self):
+        self.generator.link_highlight = "clone"
+        soup = BeautifulSoup(
+            '<svg><path id="near" d="M10 10L20 20" stroke-width="2"/>'
+            '<path id="far" d="M300 300L320 320" stroke-width="2"/>'
+            '<path id="moved" d="M300 300L310 310" transform="translate(-290,-290)"/>'
+            "</svg>",
+            "xml",
+        )
+        hyperlinks = [
+            {
+                "uri": "https://example.com",
+                "bbox": {"x": 5, "y": 5, "width": 20, "height": 20},
+            }
+        ]
+
+        self.generator.apply_hyperlinks_to_tree(soup, hyperlinks)
+
+        blue_ids = [path["id"] for path in soup.find_all("path", stroke="blue")]
+        self.assertEqual(blue_ids, ["near", "moved"])
+
+    def test_apply_hyperlinks_with_use(self):
+        soup = BeautifulSoup(
+            '<svg data-page-number="3"><g stroke="red">'
+            '<path d="M10 10L20 20"/><path d="M1 1L2 2" style="fill:none;stroke:#000"/>'
+            '</g><path d="M5 5L6 6" fill="black"/></svg>',
+            "xml",
+        )
+        hyperlinks = [
+            {
+                "uri": "https://a.example",
+                "bbox": {"x": 0, "y": 0, "width": 9, "height": 9},
+            },
+            {
+                "uri": "https://b.example",
+                "bbox": {"x": 9, "y": 9, "width": 9, "height": 9},
+            },
+        ]
+
+        self.generator.apply_hyperlinks_to_tree(soup, hyperlinks)
+
+        svg = soup.find("svg")
+        drawing = svg.find("defs", recursive=False).find("g", id="linkDrawing_3")
+        self.assertEqual(len(drawing.find_all("path")), 3)
+        self.assertEqual(
+            [path["style"] for path in drawing.find_all("path")],
+            [
+                "stroke:var(--link-stroke,red)",
+                "fill:none;stroke:var(--link-stroke,#000)",
+                "stroke:var(--link-stroke,none)",
+            ],
+        )
+        uses = svg.find_all("use", recursive=False)
+        self.assertEqual([use["xlink:href"] for use in uses], ["#linkDrawing_3"] * 3)
+        self.assertNotIn("mask", uses[0].attrs)
+        self.assertEqual(uses[2]["mask"], "url(#linkMaskInside_3_1)")
+        self.assertEqual(uses[2]["style"], "--link-stroke:blue")
+        # Paths are referenced, never copied
+        self.assertEqual(len(soup.find_all("path")), 3)
+
     @patch("pathlib.Path.mkdir")
     @patch("pathlib.Path.exists")
     @patch("builtins.open", new_callable=mock_open)
@@ -61,17 +148,99 @@ class TestHTMLGenerator(unittest.TestCase):
         mock_process.return_value = "<svg>processed</svg>"
         mock_copy_images.return_value = []  # No images
 
-        # Mock the jinja2 template
+        # Mock the jinja2 template, streaming one chunk per page
+        def generate(svg_contents, **context):
+            yield "<html><body>"
+            yield from svg_contents
+            yield "</body></html>"
+
         mock_template_obj = MagicMock()
-        mock_template_obj.render.return_value = "<html><body>test</body></html>"
+        mock_template_obj.generate.side_effect = generate
         self.generator.env.get_template = MagicMock(return_value=mock_template_obj)
 
         svg_files = [Path("test_page_1.svg"), Path("test_page_2.svg")]
         result = self.generator.generate_html_from_svg_group(svg_files, "test_output")
 
         self.assertIsInstance(result, Path)
-        mock_process.assert_called()
+        self.assertEqual(mock_process.call_count, 2)
         mock_file.assert_called()
+        written = "".join(call.args[0] for call in mock_file().write.call_args_list)
+        self.assertEqual(
+            written,
+            "<html><body><svg>processed</svg><svg>processed</svg></body></html>",
+        )
+
+    def test_write_page_assets(self):
+        svg_contents = [
+            '<svg width="595" height="842"><path d="M0 0"/></svg>',
+            '<svg width="595.5" height="842" viewBox="0 0 595.5 842">'
+            '<path d="M1 1"/></svg>',
+            '<svg width="595" height="842"><a xlink:href="https://example.com"'
+            ' target="_blank"><rect/></a></svg>',
+        ]
+
+        markup = self.generator.write_page_assets(svg_contents, "test_output")
+
+        self.assertEqual(markup[0], svg_contents[0])
+        self.assertIn('<img src="pages/test_output_page_2.svg"', markup[1])
+        self.assertIn('width="596" height="842" loading="lazy"', markup[1])
+        self.assertIn('<iframe src="pages/test_output_page_3.svg"', markup[2])
+        self.assertEqual(
+            [path.name for path in self.generator.page_assets("test_output")],
+            ["test_output_page_2.svg", "test_output_page_3.svg"],
+        )
+        asset = Path("test_html/pages/test_output_page_2.svg").read_text()
+        self.assertIn('xmlns="http://www.w3.org/2000/svg"', asset)
+        self.assertIn('width="100%"', asset)
+        self.assertIn('viewBox="0 0 595.5 842"', asset)
+        self.assertTrue(asset.endswith('<path d="M1 1"/></svg>'))
+
+    def test_render_letter_takes_pages_as_needed(self):
+        self.generator.create_default_template()
+        consumed = []
+
+        def pages():
+            for page_number in (1, 2, 3):
+                consumed.append(page_number)
+                yield f'<svg data-page-number="{page_number}"></svg>'
+
+        output_path = self.generator.render_letter(pages(), "test_output")
+
+        self.assertEqual(consumed, [1, 2, 3])
+        html = output_path.read_text(encoding="utf-8")
+        self.assertIn('<svg data-page-number="1"></svg>', html)
+        self.assertLess(html.index('"1"'), html.index('"3"'))
+        template = self.generator.report.records[-1]
+        self.assertEqual(template["stage"], "template")
+        self.assertEqual(template["bytes_out"], len(html.encode("utf-8")))
+
+    def test_update_index_paginates_and_skips_unchanged_pages(self):
+        self.generator.letters_per_page = 2
+        names = ["2025-01-01", "2025-02-01", "2025-03-01"]
+        for name in names:
+            Path("test_html", f"{name}.html").write_text("<html></html>")
+            self.generator.catalog_letter(name, page_count=1)
+
+        written = self.generator.update_index(names)
+
+        self.assertEqual(
+            sorted(path.name for path in written), ["index-1.html", "index.html"]
+        )
+        newest = Path("test_html/index.html").read_text()
+        self.assertIn('href="2025-03-01.html"', newest)
+        self.assertIn('href="index-1.html"', newest)
+        self.assertNotIn("2025-01-01", newest)
+        self.assertEqual(self.generator.update_index(names), [])
+
+        # A new letter fills the newest page without touching older ones
+        Path("test_html/2025-04-01.html").write_text("<html></html>")
+        self.generator.catalog_letter("2025-04-01", page_count=2)
+        written = self.generator.update_index(names + ["2025-04-01"])
+        self.assertEqual([path.name for path in written], ["index.html"])
+
+        # Removing letters drops index pages that are no longer needed
+        self.generator.update_index(["2025-04-01"])
+        self.assertFalse(Path("test_html/index-1.html").exists())
 
 
 if __name__ == "__main__":
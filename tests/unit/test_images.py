@@ -0,0 +1,99 @@
+import shutil
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from src.html_gen.images import ImageProcessor, variant_widths
+
+
+class TestImageProcessor(unittest.TestCase):
+    def setUp(self):
+        self.source_dir = Path("test_photos")
+        self.source_dir.mkdir(exist_ok=True)
+        self.output_dir = Path("test_html") / "images"
+        self.processor = ImageProcessor(
+            self.output_dir, Path("test_html") / ".image-cache" / "letter.json"
+        )
+
+        # A landscape-encoded photo that EXIF says to show upright
+        self.photo = self.source_dir / "letter-beach.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Phone Maker"
+        Image.new("RGB", (2000, 1000), "blue").save(self.photo, exif=exif)
+
+    def tearDown(self):
+        for dir_name in [self.source_dir, Path("test_html")]:
+            if dir_name.exists():
+                shutil.rmtree(dir_name)
+
+    def test_variant_widths_never_upscale(self):
+        self.assertEqual(variant_widths(2000), [400, 595, 1190])
+        self.assertEqual(variant_widths(500), [400, 500])
+        self.assertEqual(variant_widths(300), [300])
+
+    def test_resized_variants_and_srcset(self):
+        (photo,) = self.processor.process([self.photo])
+
+        self.assertEqual(photo["src"], "images/letter-beach-jpg-595.jpg")
+        self.assertEqual((photo["width"], photo["height"]), (595, 1190))
+        self.assertIn("images/letter-beach-jpg-1000.jpg 1000w", photo["srcset"])
+        self.assertIn("images/letter-beach-jpg-400.webp 400w", photo["webp_srcset"])
+        self.assertEqual(len(list(self.output_dir.iterdir())), 6)
+
+        with Image.open(self.output_dir / "letter-beach-jpg-400.webp") as variant:
+            self.assertEqual(variant.size, (400, 800))
+        with Image.open(self.output_dir / "letter-beach-jpg-1000.jpg") as variant:
+            self.assertEqual(variant.size, (1000, 2000))
+            self.assertEqual(len(variant.getexif()), 0)
+
+    def test_unchanged_photos_are_not_encoded_again(self):
+        self.processor.process([self.photo])
+        variant = self.output_dir / "letter-beach-jpg-595.jpg"
+        variant.write_bytes(b"cached")
+
+        self.processor.process([self.photo])
+        self.assertEqual(variant.read_bytes(), b"cached")
+
+        Image.new("RGB", (800, 600), "red").save(self.photo)
+        (photo,) = self.processor.process([self.photo])
+        self.assertNotEqual(variant.read_bytes(), b"cached")
+        self.assertEqual(photo["srcset"].count("w,"), 2)
+
+    def test_photos_sharing_a_stem_keep_apart(self):
+        other = self.source_dir / "letter-beach.png"
+        Image.new("RGB", (500, 250), "red").save(other)
+
+        jpeg, png = self.processor.process([self.photo, other])
+
+        self.assertEqual(png["src"], "images/letter-beach-png-500.jpg")
+        self.assertNotEqual(jpeg["srcset"], png["srcset"])
+        self.assertEqual(len(list(self.output_dir.iterdir())), 10)
+        with Image.open(self.output_dir / "letter-beach-jpg-400.jpg") as variant:
+            self.assertEqual(variant.size, (400, 800))
+
+    def test_files_from_earlier_builds_are_removed(self):
+        self.output_dir.mkdir(parents=True)
+        # A full-size copy, as builds wrote before photos were resized
+        shutil.copy2(self.photo, self.output_dir / self.photo.name)
+        self.processor.process([self.photo])
+
+        Image.new("RGB", (500, 250), "red").save(self.photo)
+        self.processor.process([self.photo])
+        self.assertEqual(
+            sorted(path.name for path in self.output_dir.iterdir()),
+            [
+                "letter-beach-jpg-400.jpg",
+                "letter-beach-jpg-400.webp",
+                "letter-beach-jpg-500.jpg",
+                "letter-beach-jpg-500.webp",
+            ],
+        )
+
+        self.processor.process([])
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
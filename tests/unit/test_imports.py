@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# Libraries that should only load once a stage needs them
+HEAVY_MODULES = {"fitz", "pymupdf", "bs4", "jinja2", "PIL", "lxml", "numpy"}
+
+
+def import_times(module):
+    """Import a module in a fresh interpreter and return ``-X importtime``.
+
+    Returns a dict of every module imported to its cumulative import time
+    in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    def assert_no_heavy_imports(self, module):
+        times = import_times(module)
+        self.assertIn(module, times)
+        loaded = {name.split(".")[0] for name in times} & HEAVY_MODULES
+        self.assertEqual(loaded, set(), f"{module} imports {sorted(loaded)}")
+
+    def test_cli_defers_heavy_imports(self):
+        self.assert_no_heavy_imports("src.cli")
+
+    def test_watch_defers_heavy_imports(self):
+        self.assert_no_heavy_imports("src.watch")
+
+    def test_generator_defers_heavy_imports(self):
+        self.assert_no_heavy_imports("src.html_gen.generate")
+
+
+if __name__ == "__main__":
+    unittest.main()
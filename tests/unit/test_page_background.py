@@ -0,0 +1,101 @@
+import unittest
+
+import fitz
+
+from src.pdf_tools.drawings import read_page_drawing, write_drawing_svg
+from src.pdf_tools.page_background import (
+    find_page_background,
+    strip_page_background,
+    strip_rendered_background,
+)
+
+PAPER = (1, 0.98, 0.9)
+RULE = (0.7, 0.8, 0.9)
+INK = (0.1, 0.1, 0.2)
+
+
+def _letter_page(rule_positions=range(100, 700, 25), ink_first=False):
+    """Return a US Letter page of tinted, ruled paper with one ink stroke."""
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    shape = page.new_shape()
+
+    def ink():
+        shape.draw_bezier((80, 200), (120, 150), (160, 250), (200, 190))
+        shape.finish(color=INK, width=1.2, lineCap=1, lineJoin=1, closePath=False)
+
+    if ink_first:
+        ink()
+    shape.draw_rect(page.rect)
+    shape.finish(fill=PAPER, color=None)
+    for y in rule_positions:
+        shape.draw_line((50, y), (562, y))
+    shape.finish(color=RULE, width=0.5, closePath=False)
+    if not ink_first:
+        ink()
+    shape.commit()
+    return doc, page
+
+
+class TestPageBackground(unittest.TestCase):
+    def test_paper_and_rules_are_found_on_any_page_size(self):
+        doc, page = _letter_page()
+        drawing = read_page_drawing(page)
+
+        background, color = find_page_background(drawing)
+
+        self.assertEqual(len(background), 2)
+        self.assertEqual(color, "#fffae5")
+        self.assertEqual(strip_page_background(drawing), 2)
+        self.assertEqual(len(drawing.paths), 1)
+        self.assertTrue(drawing.paths[0].is_stroke)
+        doc.close()
+
+    def test_css_background(self):
+        doc, page = _letter_page()
+        drawing = read_page_drawing(page)
+
+        strip_page_background(drawing, css=True)
+        svg_text = write_drawing_svg(drawing)
+
+        self.assertIn(' style="background-color:#fffae5">', svg_text)
+        self.assertEqual(svg_text.count("<path"), 1)
+        doc.close()
+
+    def test_uneven_lines_and_fills_over_ink_are_kept(self):
+        doc, page = _letter_page([100, 125, 150, 300, 310], ink_first=True)
+        drawing = read_page_drawing(page)
+
+        self.assertEqual(strip_page_background(drawing), 0)
+        self.assertEqual(len(drawing.paths), 3)
+        doc.close()
+
+    def test_rendered_page_with_text(self):
+        doc, page = _letter_page()
+        page.insert_text((100, 100), "Dear Andy")
+        self.assertIsNone(read_page_drawing(page))
+
+        svg_text, removed = strip_rendered_background(
+            page.get_svg_image(), page, css=True
+        )
+
+        self.assertEqual(removed, 2)
+        self.assertIn('style="background-color:#fffae5"', svg_text)
+        self.assertNotIn('d="M0 0H612V792H0Z"', svg_text)
+        self.assertEqual(svg_text.count('stroke="#1a1a33"'), 1)
+        self.assertIn('data-text="D"', svg_text)
+        doc.close()
+
+    def test_rendered_fill_over_text_is_kept(self):
+        doc = fitz.open()
+        page = doc.new_page(width=612, height=792)
+        page.insert_text((100, 100), "Dear Andy")
+        page.draw_rect(page.rect, fill=PAPER, color=None)
+        svg_text = page.get_svg_image()
+
+        self.assertEqual(strip_rendered_background(svg_text, page), (svg_text, 0))
+        doc.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
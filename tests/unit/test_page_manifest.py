@@ -0,0 +1,115 @@
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.html_gen.generate import HTMLGenerator
+from src.page_manifest import (
+    find_manifests,
+    manifest_path,
+    page_entry,
+    read_manifest,
+    write_manifest,
+)
+
+PAGE_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+    '<path d="M10 10L20 20" stroke="#000"/></svg>'
+)
+LINK = {
+    "uri": "https://example.com",
+    "bbox": {"x": 5, "y": 5, "width": 20, "height": 20},
+}
+
+
+class TestPageManifest(unittest.TestCase):
+    def setUp(self):
+        self.svg_dir = Path("test_svg")
+        self.html_dir = Path("test_html")
+        self.svg_dir.mkdir(exist_ok=True)
+        self.page = MagicMock()
+        self.page.rect.width = 595.276
+        self.page.rect.height = 841.89
+
+    def tearDown(self):
+        for directory in [self.svg_dir, self.html_dir, Path("test_templates")]:
+            if directory.exists():
+                shutil.rmtree(directory)
+
+    def write_letter(self, pdf_name, page_count, links=()):
+        pages = []
+        for number in range(1, page_count + 1):
+            file_name = f"{pdf_name}_page_{number}.svg"
+            (self.svg_dir / file_name).write_text(PAGE_SVG, encoding="utf-8")
+            page_links = list(links) if number == 1 else []
+            pages.append(page_entry(self.page, number, file_name, PAGE_SVG, page_links))
+        # Out of order, as pages come back from a process pool
+        return write_manifest(self.svg_dir, pdf_name, pages[::-1])
+
+    def test_round_trip(self):
+        path = self.write_letter("2025-01-01", 2, [LINK])
+
+        self.assertEqual(path, manifest_path(self.svg_dir, "2025-01-01"))
+        self.assertEqual(find_manifests(self.svg_dir), {"2025-01-01": path})
+        manifest = read_manifest(path)
+        self.assertEqual(manifest["pdf"], "2025-01-01.pdf")
+        first, second = manifest["pages"]
+        self.assertEqual((first["number"], second["number"]), (1, 2))
+        self.assertEqual(first["links"], [LINK])
+        self.assertEqual((first["width"], first["height"]), (595.28, 841.89))
+        self.assertEqual(first["bytes"], len(PAGE_SVG))
+        self.assertEqual(len(first["sha256"]), 64)
+
+    def test_pdf_without_pages_has_no_manifest(self):
+        path = self.write_letter("2025-01-01", 1)
+
+        self.assertIsNone(write_manifest(self.svg_dir, "2025-01-01", []))
+        self.assertFalse(path.exists())
+
+    def test_corrupt_manifest(self):
+        path = manifest_path(self.svg_dir, "2025-01-01")
+        path.parent.mkdir()
+        path.write_text("{not json", encoding="utf-8")
+
+        self.assertIsNone(read_manifest(path))
+
+    def test_generator_finds_letters_through_manifests(self):
+        self.write_letter("2025-01-01", 2, [LINK])
+        self.write_letter("2025-02-01", 1)
+        # A stray page with no manifest is not a letter
+        (self.svg_dir / "stray_page_1.svg").write_text(PAGE_SVG, encoding="utf-8")
+        generator = HTMLGenerator(
+            svg_dir=self.svg_dir,
+            html_dir=self.html_dir,
+            template_dir="test_templates",
+            compress=False,
+        )
+
+        letters = generator.load_letters()
+
+        self.assertEqual(list(letters), ["2025-01-01", "2025-02-01"])
+        self.assertEqual(len(letters["2025-01-01"][1]), 2)
+        self.assertEqual(
+            generator.load_hyperlink_metadata(self.svg_dir / "2025-01-01_page_1.svg"),
+            [LINK],
+        )
+
+    def test_generate_all_html_applies_manifest_links(self):
+        self.write_letter("2025-01-01", 2, [LINK])
+        generator = HTMLGenerator(
+            svg_dir=self.svg_dir,
+            html_dir=self.html_dir,
+            template_dir="test_templates",
+            compress=False,
+        )
+
+        (output_file,) = generator.generate_all_html()
+
+        html = output_file.read_text(encoding="utf-8")
+        self.assertIn('data-page-number="2"', html)
+        self.assertEqual(html.count('href="https://example.com"'), 1)
+        self.assertEqual(generator.catalog.letters["2025-01-01"]["pages"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
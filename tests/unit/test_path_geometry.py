@@ -0,0 +1,70 @@
+import unittest
+
+from src.path_geometry import parse_transform, path_geometry
+
+
+class TestPathGeometry(unittest.TestCase):
+    def test_absolute_path(self):
+        geometry = path_geometry("M10 20C30 -5 40 60 50 25Z")
+
+        self.assertEqual(
+            geometry.points.tolist(), [[10, 20], [30, -5], [40, 60], [50, 25]]
+        )
+        self.assertEqual(geometry.bounds(), {"x1": 10, "y1": -5, "x2": 50, "y2": 60})
+        self.assertEqual(geometry.commands, "MCZ")
+        self.assertEqual(geometry.number_count, 8)
+
+    def test_relative_and_horizontal_vertical_commands(self):
+        geometry = path_geometry("m10 10h20v5l-5 5 -5 0zm2 2H0V1")
+
+        self.assertEqual(
+            geometry.points.tolist(),
+            [
+                [10, 10],
+                [30, 10],
+                [30, 15],
+                [25, 20],
+                [20, 20],
+                [12, 12],
+                [0, 12],
+                [0, 1],
+            ],
+        )
+        self.assertEqual(geometry.command_count("HV"), 4)
+        self.assertEqual(geometry.number_count, 12)
+        self.assertFalse(geometry.has_arcs)
+
+    def test_arcs_and_invalid_data(self):
+        arc = path_geometry("M0 0a5 5 0 0 1 10 10")
+        self.assertTrue(arc.has_arcs)
+        self.assertEqual(arc.points.tolist(), [[0, 0], [10, 10]])
+
+        self.assertIsNone(path_geometry("").bounds())
+        # Parsing stops at the first malformed command
+        self.assertEqual(path_geometry("M1 2L3").points.tolist(), [[1, 2]])
+
+    def test_smooth_curves_include_reflected_control(self):
+        geometry = path_geometry("M0 0c0 10 10 10 10 0s10 -10 10 0")
+
+        self.assertIn([10, -10], geometry.points.tolist())
+        self.assertEqual(geometry.bounds()["y1"], -10)
+
+    def test_rect_measures(self):
+        geometry = path_geometry("M0 0L10 0L10 10L0 10")
+        rect = {"x1": 5, "y1": -5, "x2": 20, "y2": 20}
+
+        self.assertEqual(geometry.count_inside(rect), 2)
+        self.assertEqual(geometry.fraction_inside(rect), 0.5)
+        self.assertEqual(geometry.overlap_ratio(rect), 0.5)
+
+    def test_parsed_once(self):
+        self.assertIs(path_geometry("M1 1L2 2"), path_geometry("M1 1L2 2"))
+
+    def test_parse_transform(self):
+        self.assertEqual(
+            parse_transform("matrix(1,0,0,-1,0,842)"), (1, 0, 0, -1, 0, 842)
+        )
+        self.assertEqual(
+            parse_transform("translate(10 20) scale(2)"), (2, 0, 0, 2, 10, 20)
+        )
+        self.assertIsNone(parse_transform("skewX(30)"))
@@ -1,5 +1,6 @@
 import shutil
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
@@ -30,7 +31,14 @@ class TestPDFSVGExtractor(unittest.TestCase):
 
         self.assertEqual(len(result), 1)
         mock_fitz.open.assert_called_once_with("test.pdf")
-        mock_file.assert_called_once()
+        # The page SVG, then the PDF's page manifest
+        self.assertEqual(
+            [call.args[0] for call in mock_file.call_args_list],
+            [
+                Path("test_output/test_page_1.svg"),
+                Path("test_output/manifests/test.json"),
+            ],
+        )
         mock_doc.close.assert_called_once()
 
     @patch("src.pdf_tools.extract_svg.fitz")
@@ -49,6 +57,120 @@ class TestPDFSVGExtractor(unittest.TestCase):
         self.assertEqual(len(result), 0)
         mock_file.assert_not_called()
 
+    @patch("src.pdf_tools.extract_svg.fitz")
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("pathlib.Path.mkdir")
+    def test_render_pages_in_memory(self, mock_mkdir, mock_file, mock_fitz):
+        mock_doc = MagicMock()
+        mock_page = MagicMock()
+        mock_page.get_svg_image.return_value = '<svg><path d="M1.234 5.678"/></svg>'
+        mock_page.get_links.return_value = []
+        mock_doc.__len__.return_value = 2
+        mock_doc.__getitem__.return_value = mock_page
+        mock_fitz.open.return_value = mock_doc
+
+        pages = list(self.extractor.render_pages("letter.pdf"))
+
+        self.assertEqual([page.page_number for page in pages], [1, 2])
+        self.assertEqual(pages[0].soup.find("path")["d"], "M1.23 5.68")
+        mock_file.assert_not_called()
+        mock_doc.close.assert_called_once()
+
+    @patch("src.pdf_tools.extract_svg.fitz")
+    @patch("pathlib.Path.mkdir")
+    def test_render_pages_fixed_point(self, mock_mkdir, mock_fitz):
+        mock_doc = MagicMock()
+        mock_page = MagicMock()
+        mock_page.get_svg_image.return_value = (
+            '<svg width="10" height="20" viewBox="0 0 10 20">'
+            '<path d="M1.234 5.678L2 3"/></svg>'
+        )
+        link_area = MagicMock(x0=1.5, y0=2.25, width=3, height=0.5)
+        mock_page.get_links.return_value = [
+            {"kind": 2, "uri": "https://example.com", "from": link_area}
+        ]
+        mock_doc.__len__.return_value = 1
+        mock_doc.__getitem__.return_value = mock_page
+        mock_fitz.open.return_value = mock_doc
+
+        extractor = PDFSVGExtractor(
+            pdf_dir="test_pdfs", output_dir="test_output", fixed_point=True
+        )
+        (page,) = extractor.render_pages("letter.pdf")
+
+        svg = page.soup.find("svg")
+        self.assertEqual((svg["width"], svg["viewBox"]), ("10", "0 0 1000 2000"))
+        self.assertEqual(page.soup.find("path")["d"], "M123 568l77-268")
+        self.assertEqual(
+            page.hyperlinks[0]["bbox"],
+            {"x": 150, "y": 225, "width": 300, "height": 50},
+        )
+
+    @patch("src.pdf_tools.extract_svg._raster_page_svg")
+    @patch("src.pdf_tools.extract_svg.fitz")
+    @patch("pathlib.Path.mkdir")
+    def test_render_pages_raster_fallback(self, mock_mkdir, mock_fitz, mock_raster):
+        shading = "".join(
+            f'<path d="M{i}.5 {i}h1v1h-1z" fill="#{i:06x}"/>' for i in range(500)
+        )
+        mock_doc = MagicMock()
+        mock_page = MagicMock()
+        mock_page.get_svg_image.side_effect = [
+            f'<svg width="10" height="20" viewBox="0 0 10 20">{shading}</svg>',
+            '<svg width="10" height="20" viewBox="0 0 10 20"><path d="M1 2"/></svg>',
+        ]
+        mock_page.get_links.return_value = []
+        mock_doc.__len__.return_value = 2
+        mock_doc.__getitem__.return_value = mock_page
+        mock_fitz.open.return_value = mock_doc
+        mock_raster.return_value = (
+            '<svg width="10" height="20" viewBox="0 0 10 20">'
+            '<image width="10" height="20" xlink:href="data:image/png;base64,AA=="'
+            ' xmlns:xlink="http://www.w3.org/1999/xlink"/></svg>',
+            "PNG",
+        )
+
+        extractor = PDFSVGExtractor(
+            pdf_dir="test_pdfs",
+            output_dir="test_output",
+            fixed_point=True,
+            raster_dpi=150,
+        )
+        shaded, plain = extractor.render_pages("letter.pdf")
+
+        image = shaded.soup.find("image")
+        self.assertEqual((image["width"], image["height"]), ("1000", "2000"))
+        self.assertIsNone(shaded.soup.find("path"))
+        self.assertIsNone(plain.soup.find("image"))
+        mock_raster.assert_called_with(mock_page, 150)
+
+    @patch("src.pdf_tools.extract_svg.ProcessPoolExecutor", ThreadPoolExecutor)
+    @patch("src.pdf_tools.extract_svg.fitz")
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("pathlib.Path.mkdir")
+    def test_extract_svg_from_pdf_parallel(self, mock_mkdir, mock_file, mock_fitz):
+        mock_doc = MagicMock()
+        mock_doc.__len__.return_value = 3
+        mock_doc.__getitem__.side_effect = lambda page_num: MagicMock(
+            get_svg_image=MagicMock(return_value=f"<svg>{page_num}</svg>"),
+            get_links=MagicMock(return_value=[]),
+        )
+        mock_fitz.open.return_value = mock_doc
+
+        extractor = PDFSVGExtractor(
+            pdf_dir="test_pdfs", output_dir="test_output", jobs=3
+        )
+        result = extractor.extract_svg_from_pdf("test.pdf")
+
+        # Pages come back in page order, one private document per worker task
+        self.assertEqual(
+            [path.name for path in result],
+            ["test_page_1.svg", "test_page_2.svg", "test_page_3.svg"],
+        )
+        self.assertEqual(mock_fitz.open.call_count, 4)
+        # Three page SVGs and one manifest for the PDF
+        self.assertEqual(mock_file.call_count, 4)
+
     @patch("pathlib.Path.exists")
     @patch("pathlib.Path.glob")
     def test_extract_all_pdfs_no_directory(self, mock_glob, mock_exists):
@@ -0,0 +1,90 @@
+import os
+import shutil
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.publish import Publisher, published_files
+
+
+class TestPublisher(unittest.TestCase):
+    def setUp(self):
+        self.html_dir = Path("test_html")
+        self.publish_dir = Path("test_publish")
+        (self.html_dir / "images").mkdir(parents=True, exist_ok=True)
+        self.publish_dir.mkdir(exist_ok=True)
+        for name, content in [
+            ("2025-09-28.html", "letter"),
+            ("2025-09-28.html.gz", "compressed"),
+            ("index.html", "index"),
+            ("notes.html", "draft"),
+            ("images/2025-09-28-beach.jpg", "photo"),
+        ]:
+            (self.html_dir / name).write_text(content, encoding="utf-8")
+        self.publisher = Publisher(html_dir=self.html_dir, publish_dir=self.publish_dir)
+
+    def tearDown(self):
+        for dir_name in [self.html_dir, self.publish_dir]:
+            if dir_name.exists():
+                shutil.rmtree(dir_name)
+
+    def test_published_files(self):
+        self.assertEqual(
+            published_files(self.html_dir),
+            [
+                "2025-09-28.html",
+                "2025-09-28.html.gz",
+                "images/2025-09-28-beach.jpg",
+                "index.html",
+            ],
+        )
+
+    def test_only_new_and_changed_files_are_copied(self):
+        changes = self.publisher.publish()
+        self.assertEqual(len(changes["added"]), 4)
+        self.assertEqual(
+            (self.publish_dir / "images" / "2025-09-28-beach.jpg").read_text(),
+            "photo",
+        )
+
+        (self.html_dir / "index.html").write_text("new index", encoding="utf-8")
+        changes = self.publisher.publish()
+
+        self.assertEqual(
+            changes, {"added": [], "updated": ["index.html"], "unchanged": 3}
+        )
+        self.assertEqual((self.publish_dir / "index.html").read_text(), "new index")
+        self.assertEqual(list(self.publish_dir.glob("*.tmp")), [])
+
+    def test_missing_published_copy_is_restored(self):
+        self.publisher.publish()
+        (self.publish_dir / "2025-09-28.html").unlink()
+
+        changes = self.publisher.publish(dry_run=True)
+
+        self.assertEqual(changes["added"], ["2025-09-28.html"])
+        self.assertFalse((self.publish_dir / "2025-09-28.html").exists())
+
+    def test_unmodified_sources_are_not_hashed_again(self):
+        self.publisher.publish()
+
+        with mock.patch("src.publish.hash_file") as hash_file:
+            changes = self.publisher.publish()
+        self.assertEqual(changes["unchanged"], 4)
+        hash_file.assert_not_called()
+
+        # Touched but unchanged: hashed again, and still not copied
+        index = self.html_dir / "index.html"
+        stat = index.stat()
+        os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        changes = self.publisher.publish()
+        self.assertEqual(changes["unchanged"], 4)
+
+        index.write_text("INDEX", encoding="utf-8")
+        os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        changes = self.publisher.publish()
+        self.assertEqual(changes["updated"], ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
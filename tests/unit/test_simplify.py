@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from src.pdf_tools.simplify import (
+    douglas_peucker,
+    merge_curves,
+    simplify_path_data,
+    simplify_svg,
+)
+
+# M0 0C10 30 40 30 50 0 split at t = 0.5 (de Casteljau)
+SPLIT_CURVE = "M0 0C5 15 15 22.5 25 22.5C35 22.5 45 15 50 0"
+WIGGLE = "M0 0L1 0.02L2 -0.02L3 0.01L4 0L5 3L6 6"
+
+
+def _svg(body):
+    return f'<svg xmlns="http://www.w3.org/2000/svg">{body}</svg>'
+
+
+class TestSimplify(unittest.TestCase):
+    def test_douglas_peucker_drops_nearly_collinear_points(self):
+        points = np.array([[0, 0], [1, 0.02], [2, -0.02], [3, 0], [4, 4]])
+
+        self.assertEqual(douglas_peucker(points, 0.1), [0, 3, 4])
+        self.assertEqual(douglas_peucker(points, 0.01), [0, 1, 2, 3, 4])
+
+    def test_split_curves_merge_back(self):
+        merged = merge_curves(
+            (0, 0), [(5, 15, 15, 22.5, 25, 22.5), (35, 22.5, 45, 15, 50, 0)], 0.05
+        )
+
+        self.assertEqual(len(merged), 1)
+        np.testing.assert_allclose(merged[0], (10, 30, 40, 30, 50, 0), atol=0.05)
+        self.assertEqual(simplify_path_data(SPLIT_CURVE, 0.05), "M0 0C10 30 40 30 50 0")
+
+    def test_unsupported_or_unchanged_data_is_kept(self):
+        arc = "M0 0A5 5 0 0 1 10 10"
+        short = "M0 0L10 10"
+
+        self.assertIs(simplify_path_data(arc, 1), arc)
+        self.assertIs(simplify_path_data(short, 1), short)
+
+    def test_only_painted_strokes_are_simplified(self):
+        svg = _svg(
+            f'<defs><clipPath id="c"><path d="{WIGGLE}"/></clipPath></defs>'
+            f'<path d="{WIGGLE}" fill="#000000"/>'
+            f'<g stroke="#000000"><path d="{WIGGLE}" fill="none"/></g>'
+        )
+
+        result, stats = simplify_svg(svg, 0.1)
+
+        self.assertEqual(result.count(WIGGLE), 2)
+        self.assertIn('d="M0 0 4 0 6 6"', result)
+        self.assertEqual(stats["paths"], 1)
+        self.assertEqual(stats["bytes_before"], len(WIGGLE))
+        self.assertEqual(stats["bytes_after"], len("M0 0 4 0 6 6"))
+
+    def test_tolerance_is_in_page_units(self):
+        # Scaled up 10x, the 0.02 wiggles are 0.2 points on the page
+        svg = _svg(
+            f'<path d="{WIGGLE}" fill="none" stroke="#000000"'
+            ' transform="matrix(10,0,0,-10,0,842)"/>'
+        )
+
+        self.assertIn('d="M0 0 4 0 6 6"', simplify_svg(svg, 0.5)[0])
+        self.assertIn(
+            'd="M0 0 1 0.02 2 -0.02 3 0.01 4 0 6 6"', simplify_svg(svg, 0.1)[0]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from src.html_gen.spatial_index import GridIndex, stroke_bbox
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_stroke_bbox_pads_stroke_and_applies_transform(self):
+        bbox = stroke_bbox(
+            {
+                "d": "M10 10L20 20",
+                "stroke-width": "2",
+                "stroke-linejoin": "round",
+                "transform": "matrix(1,0,0,-1,0,100)",
+            }
+        )
+        self.assertEqual(bbox, {"x1": 9, "y1": 79, "x2": 21, "y2": 91})
+
+        # Mitred joins can reach out to the miter limit
+        mitred = stroke_bbox({"d": "M10 10L20 20", "stroke-miterlimit": "10"})
+        self.assertEqual(mitred, {"x1": 5, "y1": 5, "x2": 25, "y2": 25})
+
+    def test_stroke_bbox_unbounded_paths(self):
+        self.assertIsNone(stroke_bbox({"d": "M0 0A5 5 0 0 1 10 10"}))
+        self.assertIsNone(stroke_bbox({"d": "M0 0L1 1", "transform": "skewX(30)"}))
+
+    def test_grid_index_query(self):
+        index = GridIndex(cell_size=10)
+        index.insert("a", {"x1": 0, "y1": 0, "x2": 5, "y2": 5})
+        index.insert("unbounded", None)
+        index.insert("b", {"x1": 50, "y1": 50, "x2": 80, "y2": 60})
+        index.insert("c", {"x1": 12, "y1": 12, "x2": 18, "y2": 18})
+
+        self.assertEqual(
+            index.query({"x1": 4, "y1": 4, "x2": 13, "y2": 13}),
+            ["a", "unbounded", "c"],
+        )
+        self.assertEqual(
+            index.query({"x1": 70, "y1": 0, "x2": 90, "y2": 55}), ["unbounded", "b"]
+        )
@@ -1,22 +1,25 @@
 import pytest
+from src.path_geometry import path_geometry
 from src.pdf_tools.extract_svg import optimize_svg_precision
+from src.pdf_tools.path_data import _parse_segments, compact_path_data
+from src.pdf_tools.svg_precision import round_numbers_in_string
 
 
 def test_optimize_svg_precision_basic():
     """Test basic coordinate rounding."""
     svg_input = '<path d="M0.123456789 1.987654321L2.5 3.0"/>'
     result = optimize_svg_precision(svg_input, precision=2)
-    assert 'M0.12 1.99L2.5 3' in result
-    assert '0.123456789' not in result
+    assert "M0.12 1.99L2.5 3" in result
+    assert "0.123456789" not in result
 
 
 def test_optimize_svg_precision_matrix():
     """Test matrix transformation rounding."""
     svg_input = '<g transform="matrix(1,0,0,-.99999997,37.5427,127.518009)"/>'
     result = optimize_svg_precision(svg_input, precision=2)
-    assert 'matrix(1,0,0,-1,37.54,127.52)' in result
-    assert '.99999997' not in result
-    assert '127.518009' not in result
+    assert "matrix(1,0,0,-1,37.54,127.52)" in result
+    assert ".99999997" not in result
+    assert "127.518009" not in result
 
 
 def test_optimize_svg_precision_preserves_integers():
@@ -33,8 +36,8 @@ def test_optimize_svg_precision_negative_numbers():
     """Test negative number handling."""
     svg_input = '<path d="M-12.3456 -7.8901"/>'
     result = optimize_svg_precision(svg_input, precision=2)
-    assert 'M-12.35 -7.89' in result
-    assert '-12.3456' not in result
+    assert "M-12.35 -7.89" in result
+    assert "-12.3456" not in result
 
 
 def test_optimize_svg_precision_custom_precision():
@@ -42,11 +45,11 @@ def test_optimize_svg_precision_custom_precision():
     svg_input = '<path d="M1.23456789 2.98765432"/>'
 
     result_1 = optimize_svg_precision(svg_input, precision=1)
-    assert 'M1.2 3' in result_1
-    assert '1.23456789' not in result_1
+    assert "M1.2 3" in result_1
+    assert "1.23456789" not in result_1
 
     result_3 = optimize_svg_precision(svg_input, precision=3)
-    assert 'M1.235 2.988' in result_3
+    assert "M1.235 2.988" in result_3
 
 
 def test_optimize_svg_precision_preserves_ids():
@@ -54,5 +57,124 @@ def test_optimize_svg_precision_preserves_ids():
     svg_input = '<clipPath id="clip_123"><path d="M1.123456 2.987654"/></clipPath>'
     result = optimize_svg_precision(svg_input, precision=2)
     assert 'id="clip_123"' in result
-    assert 'M1.12 2.99' in result
-    assert '1.123456' not in result
+    assert "M1.12 2.99" in result
+    assert "1.123456" not in result
+
+
+def test_optimize_svg_precision_pymupdf_page_exact_output():
+    """Test the full serialized output for a PyMuPDF-style page."""
+    svg_input = (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1" '
+        'width="595.276" height="841.89" viewBox="0 0 595.276 841.89">\n'
+        '<path transform="matrix(1,0,0,-1,0,842)" stroke-width="1.4638386" '
+        'fill="none" d="M475.9878 230.7956C476.49909 230.39063 474.72743 '
+        '232.24207 475.51124 232.24207"/>\n'
+        '<use xlink:href="#a" x="1.005"/>\n'
+        "</svg>\n"
+    )
+    expected = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<svg height="841.89" version="1.1" viewBox="0 0 595.28 841.89" '
+        'width="595.28" xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink">\n'
+        '<path d="M475.99 230.8C476.5 230.39 474.73 232.24 475.51 232.24" '
+        'fill="none" stroke-width="1.46" transform="matrix(1,0,0,-1,0,842)"/>\n'
+        '<use x="1" xlink:href="#a"/>\n'
+        "</svg>"
+    )
+    assert optimize_svg_precision(svg_input, precision=2) == expected
+
+
+def test_optimize_svg_precision_escaping_and_whitespace():
+    """Test text escaping, attribute quoting and whitespace collapsing."""
+    svg_input = (
+        '<svg>\n  <g title="a &amp; &quot;b&quot;">'
+        "<text>x &lt; y</text><g></g></g>\n</svg>"
+    )
+    expected = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        "<svg>\n<g title='a &amp; \"b\"'><text>x &lt; y</text><g/></g>\n</svg>"
+    )
+    assert optimize_svg_precision(svg_input, precision=2) == expected
+
+
+def test_optimize_svg_precision_keeps_negative_zero():
+    """Test that numbers rounding to zero keep their sign, as they always did."""
+    svg_input = '<rect width="-0.004" height="0.004" transform="scale(-0.004)"/>'
+    result = optimize_svg_precision(svg_input, precision=2)
+    assert 'width="-0"' in result
+    assert 'height="0"' in result
+    assert 'transform="scale(-0)"' in result
+
+
+def test_round_numbers_in_string_leaves_integers_alone():
+    """Test that integer tokens keep their original spelling."""
+    assert round_numbers_in_string("M007 -0L1.005 2.5e-3", 2) == "M007 -0L1 2.5e-3"
+
+
+def test_compact_path_data_shortest_spelling():
+    """Test relative commands, H/V, S and dropped letters and separators."""
+    assert compact_path_data("M10 10L20 10L20 20L10 20Z") == "M10 10H20V20H10z"
+    assert compact_path_data("M0.5 -0.5L-0.25 0.75L-0.35 0.95") == "M.5-.5-.25.75l-.1.2"
+    assert (
+        compact_path_data("M100 100C101 102 103 104 105 106C107 108 109 110 111 112")
+        == "M100 100c1 2 3 4 5 6s4 4 6 6"
+    )
+
+
+def test_compact_path_data_rounds_without_drift():
+    """Test that relative values come from rounded absolute points."""
+    path = "M0 0" + "".join(f"L{i * 10.004} {i * 0.333}" for i in range(1, 40))
+    compacted = compact_path_data(path, precision=2)
+    assert "l10 .33" in compacted
+    end = path_geometry(compacted).points[-1]
+    assert abs(end[0] - 390.16) < 1e-9 and abs(end[1] - 12.99) < 1e-9
+
+
+def test_compact_path_data_zero_length_segments():
+    """Test that zero-length segments go unless they are a dot."""
+    assert compact_path_data("M5 5L5 5L6 6L6.001 6") == "M5 5 6 6"
+    assert compact_path_data("M5 5L5 5") == "M5 5H5"
+
+
+def test_compact_path_data_reflects_after_skipped_segment():
+    """Test that S after a dropped segment reflects the last one written."""
+    path = (
+        "M10 10C12 14 16 14 20 10C20.001 10 20 10.001 20.001 10C20.001 10 25 20 30 10"
+    )
+    compacted = compact_path_data(path, precision=2)
+    assert compacted == "M10 10c2 4 6 4 10 0 0 0 5 10 10 0"
+    rounded = [
+        (command, [round(value, 2) for value in args])
+        for command, args in _parse_segments(path)
+    ]
+    del rounded[2]
+    assert _parse_segments(compacted) == rounded
+
+
+def test_optimize_svg_precision_compact_paths():
+    """Test that compaction only applies when asked, and keeps bad data."""
+    svg_input = '<g><path d="M1 1L2 1"/><path d="M1 1L2"/></g>'
+    assert 'd="M1 1L2 1"' in optimize_svg_precision(svg_input)
+    result = optimize_svg_precision(svg_input, compact_paths=True)
+    assert 'd="M1 1H2"' in result
+    assert 'd="M1 1L2"' in result
+
+
+def test_optimize_svg_precision_fixed_point():
+    """Test integer coordinates in a viewBox scaled by 10 ** precision."""
+    svg_input = (
+        '<svg width="595.276" height="841.89" viewBox="0 0 595.276 841.89">'
+        '<path transform="matrix(1,0,0,-1,0,842)" stroke-width=".8" '
+        'd="M10.123 20.456L30.5 40"/>'
+        '<g transform="skewX(10)"><use x="1.234" y="-2"/></g></svg>'
+    )
+    result = optimize_svg_precision(svg_input, precision=2, fixed_point=True)
+    assert 'width="595.28"' in result
+    assert 'viewBox="0 0 59528 84189"' in result
+    assert 'transform="matrix(1,0,0,-1,0,84200)"' in result
+    assert 'stroke-width="80"' in result
+    assert 'd="M1012 2046 3050 4000"' in result
+    assert 'transform="scale(100) skewX(10) scale(0.01)"' in result
+    assert 'x="123"' in result and 'y="-200"' in result
@@ -0,0 +1,51 @@
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.watch import LetterWatcher, changed_files
+
+
+class TestLetterWatcher(unittest.TestCase):
+    def setUp(self):
+        self.pdf_dir = Path("test_pdfs")
+        self.template_dir = Path("test_templates")
+        self.pdf_dir.mkdir(exist_ok=True)
+        for name in ["2025-09-28.pdf", "2025-09-28-2.pdf"]:
+            (self.pdf_dir / name).write_bytes(b"%PDF")
+        pipeline = MagicMock()
+        pipeline.extractor.pdf_dir = self.pdf_dir
+        pipeline.generator.template_dir = self.template_dir
+        self.watcher = LetterWatcher(pipeline)
+
+    def tearDown(self):
+        if self.pdf_dir.exists():
+            shutil.rmtree(self.pdf_dir)
+
+    def test_changed_files(self):
+        before = {Path("a"): (1, 10), Path("b"): (1, 10)}
+        after = {Path("a"): (2, 10), Path("c"): (1, 10)}
+
+        self.assertEqual(
+            changed_files(before, after), {Path("a"), Path("b"), Path("c")}
+        )
+
+    def test_affected_letters(self):
+        photo = self.pdf_dir / "2025-09-28-beach.jpg"
+        letter = self.pdf_dir / "2025-09-28.pdf"
+
+        self.assertEqual(self.watcher.affected_letters({photo}), {letter})
+        self.assertEqual(
+            self.watcher.affected_letters({letter, self.pdf_dir / "gone.pdf"}),
+            {letter},
+        )
+        self.assertEqual(
+            self.watcher.affected_letters({self.template_dir / "index.html"}), set()
+        )
+        self.assertIsNone(
+            self.watcher.affected_letters({self.template_dir / "base.html"})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()